@@ -0,0 +1,58 @@
+import multiprocessing
+
+from twitter_bot.archive import TweetArchive
+from twitter_bot.trends import Trend
+
+DAY = 86400
+
+
+def tweet(tweet_id, author_id=1, created_at='2026-01-01T00:00:00Z', text='text'):
+    return {'id': str(tweet_id), 'author_id': str(author_id), 'created_at': created_at, 'text': text}
+
+
+def append_many(path, start, count):
+    archive = TweetArchive(path)
+    for tweet_id in range(start, start + count):
+        archive.append([tweet(tweet_id)], now=tweet_id)
+
+
+def test_append_skips_known_tweets_and_queries_by_filter(tmp_path):
+    archive = TweetArchive(str(tmp_path))
+    trends = [Trend('#Python', 'python', ['1'], 0, 1.0, 2.5)]
+    assert archive.append([tweet(1), tweet(2, author_id=7)], {1: 'python', 2: 'python'}, trends, now=100) == 2
+    assert archive.append([tweet(2, author_id=7), tweet(3, created_at='2026-01-02T00:00:00Z')], now=200) == 1
+    newest_first = [payload['id'] for payload in archive.query()]
+    assert newest_first[0] == '3' and set(newest_first) == {'1', '2', '3'}
+    assert {payload['id'] for payload in archive.query(trend='python')} == {'1', '2'}
+    assert [payload['id'] for payload in archive.query(author_id=7)] == ['2']
+    assert archive.trend_history('python') == [(100, 0, 1.0, 2.5, ['1'])]
+    assert archive.stats()['tweets'] == 3
+
+
+def test_compact_drops_expired_batches_and_rewrites_sparse_segments(tmp_path):
+    archive = TweetArchive(str(tmp_path), retention_days=1, segment_bytes=1)
+    for tweet_id in range(1, 5):
+        # Her batch ayrı segmentte: segment_bytes=1 her yazımdan sonra yeni segment açar
+        archive.append([tweet(tweet_id, created_at=None)], now=tweet_id * DAY)
+    assert archive.stats()['segments'] == 4
+    dropped, rewritten = archive.compact(now=4 * DAY + 1)
+    assert dropped == 3
+    assert rewritten == 3
+    assert [payload['id'] for payload in archive.query()] == ['4']
+    assert archive.stats()['segments'] == 1
+
+
+def test_processes_appending_to_one_archive_do_not_interleave(tmp_path):
+    path = str(tmp_path)
+    TweetArchive(path)
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=append_many, args=(path, start, 20)) for start in (1, 1001, 2001)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert all(process.exitcode == 0 for process in processes)
+    archive = TweetArchive(path)
+    # Her kayıt okunabiliyorsa ofsetler üst üste binmemiştir
+    assert len(archive.query()) == 60
+    assert archive.stats()['batches'] == 60
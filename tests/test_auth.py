@@ -0,0 +1,92 @@
+import base64
+
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from twitter_bot import auth
+from twitter_bot.auth import SessionCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('ADMIN_USERNAME', 'admin')
+    monkeypatch.setenv('ADMIN_PASSWORD_HASH', generate_password_hash('secret'))
+    monkeypatch.setattr(auth, 'sessions', SessionCache(ttl=900))
+    checks = []
+    check_password_hash = auth.check_password_hash
+    monkeypatch.setattr(auth, 'check_password_hash', lambda *args: checks.append(1) or check_password_hash(*args))
+
+    app = Flask(__name__)
+    app.secret_key = 'test'
+
+    @app.route('/private')
+    @auth.requires_auth
+    def private():
+        return 'ok'
+
+    @app.route('/logout')
+    def logout():
+        auth.logout()
+        return 'bye'
+
+    client = app.test_client()
+    client.checks = checks
+    return client
+
+
+def basic(username, password):
+    return {'Authorization': 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()}
+
+
+def test_token_expires_after_ttl(clock):
+    sessions = SessionCache(ttl=60)
+    token = sessions.issue('admin', 'v1')
+    clock.now += 59
+    assert sessions.verify(token, 'v1') == 'admin'
+    clock.now += 1
+    assert sessions.verify(token, 'v1') is None
+
+
+def test_changed_credentials_and_eviction_invalidate_tokens(clock):
+    sessions = SessionCache(ttl=60, max_entries=2)
+    first = sessions.issue('admin', 'v1')
+    assert sessions.verify(first, 'v2') is None
+    tokens = [sessions.issue('admin', 'v1') for _ in range(3)]
+    assert sessions.verify(tokens[0], 'v1') is None
+    assert sessions.verify(tokens[2], 'v1') == 'admin'
+
+
+def test_password_hash_is_checked_once_per_login(client):
+    assert client.get('/private').status_code == 401
+    assert client.get('/private', headers=basic('admin', 'wrong')).status_code == 401
+    assert client.get('/private', headers=basic('admin', 'secret')).status_code == 200
+    checks = len(client.checks)
+    for _ in range(3):
+        assert client.get('/private').status_code == 200
+    assert len(client.checks) == checks
+
+
+def test_logout_revokes_the_session(client):
+    client.get('/private', headers=basic('admin', 'secret'))
+    cookie = client.get_cookie('session').value
+    assert client.get('/logout').data == b'bye'
+    assert client.get('/private').status_code == 401
+    # Çıkıştan önce kopyalanan çerez de artık geçersiz
+    client.set_cookie('session', cookie)
+    assert client.get('/private').status_code == 401
@@ -0,0 +1,101 @@
+import pytest
+
+from twitter_bot import cache as cache_module
+from twitter_bot.cache import DiskBackend, MemoryBackend, ResponseCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'disk'])
+def backend(request, tmp_path):
+    if request.param == 'disk':
+        return DiskBackend(str(tmp_path / 'responses.db'), max_entries=2)
+    return MemoryBackend(max_entries=2)
+
+
+def counting_fetch(values):
+    calls = []
+
+    def fetch():
+        calls.append(len(calls))
+        return values[len(calls) - 1]
+    return fetch, calls
+
+
+def test_fresh_entry_is_served_without_fetching(backend, clock):
+    cache = ResponseCache(backend, ttls={'get_trends': 60})
+    fetch, calls = counting_fetch([['a', 'b']])
+    assert cache.get_or_fetch('get_trends', {'id': 1}, fetch) == (['a', 'b'], False)
+    clock.now += 59
+    assert cache.get_or_fetch('get_trends', {'id': 1}, fetch) == (['a', 'b'], True)
+    assert len(calls) == 1
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+
+def test_expired_entry_is_fetched_again(backend, clock):
+    cache = ResponseCache(backend, ttls={'get_trends': 60})
+    fetch, calls = counting_fetch([['old'], ['new']])
+    cache.get_or_fetch('get_trends', {'id': 1}, fetch)
+    clock.now += 61
+    assert cache.get_or_fetch('get_trends', {'id': 1}, fetch) == (['new'], False)
+    assert len(calls) == 2
+
+
+def test_key_ignores_parameter_order():
+    assert ResponseCache.make_key('e', {'a': 1, 'b': 2}) == ResponseCache.make_key('e', {'b': 2, 'a': 1})
+
+
+def test_endpoint_without_ttl_is_not_cached(backend, clock):
+    cache = ResponseCache(backend, ttls={'get_trends': 0})
+    fetch, calls = counting_fetch([1, 2])
+    cache.get_or_fetch('get_trends', {}, fetch)
+    assert cache.get_or_fetch('get_trends', {}, fetch) == (2, False)
+    assert len(backend) == 0
+
+
+def test_backend_evicts_least_recently_used(backend, clock):
+    backend.set('a', clock.now + 60, 1)
+    clock.now += 1
+    backend.set('b', clock.now + 60, 2)
+    clock.now += 1
+    backend.get('a')
+    clock.now += 1
+    backend.set('c', clock.now + 60, 3)
+    assert len(backend) == 2
+    assert backend.get('b') is None
+    assert backend.get('a')[1] == 1
+
+
+def test_recently_expired_entry_is_served_when_fetch_fails(backend, clock):
+    cache = ResponseCache(backend, ttls={'get_trends': 60}, max_stale=600)
+    cache.get_or_fetch('get_trends', {}, lambda: ['cached'])
+    clock.now += 300
+
+    def failing():
+        raise ConnectionError("down")
+    assert cache.get_or_fetch('get_trends', {}, failing) == (['cached'], True)
+    assert cache.stats()['stale_hits'] == 1
+
+
+def test_entry_past_max_stale_is_not_served(backend, clock):
+    cache = ResponseCache(backend, ttls={'get_trends': 60}, max_stale=600)
+    cache.get_or_fetch('get_trends', {}, lambda: ['cached'])
+    clock.now += 700
+
+    def failing():
+        raise ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch('get_trends', {}, failing)
@@ -0,0 +1,43 @@
+from twitter_bot.completion_cache import CompletionCache, TrendSnapshot
+
+PROFILE = ('Witty', 'English', 'gpt-4')
+
+
+def test_snapshot_ignores_less_engaging_new_tweets():
+    snapshot = TrendSnapshot(sample_size=2)
+    snapshot.observe('trend', [(1, 50, 'first'), (2, 40, 'second')])
+    before = snapshot.content(['trend'])
+    # Sonraki döngü sadece since_id'den yeni, etkileşimi düşük tweetleri getirir
+    snapshot.observe('trend', [(3, 1, 'third'), (4, 0, 'fourth')])
+    assert snapshot.content(['trend']) == before == 'trend: trend\nfirst\nsecond'
+
+
+def test_snapshot_changes_when_a_top_tweet_arrives():
+    snapshot = TrendSnapshot(sample_size=2)
+    snapshot.observe('trend', [(1, 50, 'first'), (2, 40, 'second')])
+    snapshot.observe('trend', [(3, 90, 'viral')])
+    assert snapshot.content(['trend']) == 'trend: trend\nviral\nfirst'
+
+
+def test_snapshot_lists_requested_trends_in_order_and_evicts_old_ones():
+    snapshot = TrendSnapshot(sample_size=1, max_trends=2)
+    for key in ('a', 'b', 'c'):
+        snapshot.observe(key, [(1, 1, f'{key} tweet')])
+    assert snapshot.content(['c', 'a', 'b']) == 'trend: c\nc tweet\ntrend: a\ntrend: b\nb tweet'
+
+
+def test_cache_hits_for_unchanged_snapshot_across_incremental_fetches():
+    snapshot = TrendSnapshot(sample_size=2)
+    cache = CompletionCache()
+    snapshot.observe('trend', [(1, 10, 'big news'), (2, 5, 'more news')])
+    cache.put(snapshot.content(['trend']), PROFILE, 'cached reply')
+    snapshot.observe('trend', [(3, 0, 'a brand new tweet nobody liked yet')])
+    assert cache.get(snapshot.content(['trend']), PROFILE) == 'cached reply'
+    assert cache.get(snapshot.content(['trend']), ('Silly', 'English', 'gpt-4')) is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_cache_misses_below_similarity_threshold():
+    cache = CompletionCache(similarity_threshold=0.8)
+    cache.put('trend: a\none\ntwo', PROFILE, 'reply')
+    assert cache.get('trend: b\nthree\nfour', PROFILE) is None
@@ -0,0 +1,34 @@
+import pytest
+
+from twitter_bot.config import Config, TwitterAccount
+
+
+def account(role):
+    return TwitterAccount('fake', 'fake', 'fake', 'fake', 'fake', role=role)
+
+
+@pytest.fixture
+def persona_env(monkeypatch):
+    monkeypatch.setenv('PERSONAS', 'news,fun')
+    monkeypatch.setenv('BOT_NAME', '@bot')
+    monkeypatch.setenv('BOT_PERSONALITY', 'Witty')
+    monkeypatch.setenv('BOT_LANGUAGE', 'English')
+    monkeypatch.setenv('PERSONA_FUN_LANGUAGE', 'Turkish')
+    monkeypatch.setenv('PERSONA_FUN_ACCOUNTS', '2')
+    return monkeypatch
+
+
+def test_personas_fall_back_to_bot_settings(persona_env):
+    news, fun = Config.personas_from_env([account('both'), account('post')])
+    assert (news.name, news.bot_language, news.account_indexes) == ('news', 'English', None)
+    assert (fun.name, fun.bot_name, fun.bot_language, fun.account_indexes) == ('fun', '@bot', 'Turkish', {1})
+
+
+def test_persona_account_must_exist(persona_env):
+    with pytest.raises(ValueError, match='account 2 is not configured'):
+        Config.personas_from_env([account('both')])
+
+
+def test_persona_account_must_be_able_to_post(persona_env):
+    with pytest.raises(ValueError, match="TWITTER2_ROLE is 'read'"):
+        Config.personas_from_env([account('both'), account('read')])
@@ -0,0 +1,40 @@
+from twitter_bot.generation import TWEET_MAX_CHARS, trim_to_sentence, trim_to_words, tweet_length
+
+
+def test_latin_text_counts_one_per_character():
+    assert tweet_length('Hello, world — “quoted”') == len('Hello, world — “quoted”')
+
+
+def test_emoji_and_cjk_count_double():
+    assert tweet_length('🔥') == 2
+    assert tweet_length('日本語') == 6
+    assert tweet_length('ok 🚀') == 5
+
+
+def test_links_count_as_23():
+    assert tweet_length('see https://example.com/a/very/long/path?with=query') == 4 + 23
+    assert tweet_length('see example.com') == 4 + 23
+
+
+def test_trim_to_words_fits_emoji_heavy_text():
+    text = ' '.join(['fire 🔥'] * 60)
+    assert len(text) < 2 * TWEET_MAX_CHARS
+    trimmed = trim_to_words(text)
+    assert trimmed.endswith('…')
+    assert tweet_length(trimmed) <= TWEET_MAX_CHARS
+
+
+def test_trim_to_words_never_splits_a_link():
+    text = 'a' * 270 + ' https://example.com/path'
+    trimmed = trim_to_words(text)
+    assert 'https' not in trimmed
+    assert tweet_length(trimmed) <= TWEET_MAX_CHARS
+
+
+def test_trim_to_sentence_uses_weighted_length():
+    first = 'Big news today 🎉🎉. '
+    text = first * 14
+    assert len(text) <= TWEET_MAX_CHARS < tweet_length(text)
+    trimmed = trim_to_sentence(text)
+    assert trimmed.endswith('.')
+    assert tweet_length(trimmed) <= TWEET_MAX_CHARS
@@ -0,0 +1,59 @@
+import os
+
+from twitter_bot.logs import tail_lines
+
+
+def write(path, lines, mode='a'):
+    with open(path, mode) as f:
+        f.writelines(f'{line}\n' for line in lines)
+
+
+def test_tail_without_cursor_returns_last_lines(tmp_path):
+    path = tmp_path / 'bot.log'
+    write(path, [f'line {i}' for i in range(50)])
+    tail = tail_lines(str(path), limit=3)
+    assert tail.text == 'line 47\nline 48\nline 49\n'
+    assert tail.reset and not tail.more
+
+
+def test_cursor_reads_forward_in_order_without_dropping_lines(tmp_path):
+    path = tmp_path / 'bot.log'
+    write(path, ['old'])
+    cursor = tail_lines(str(path)).cursor
+    write(path, [f'new {i}' for i in range(5)])
+    first = tail_lines(str(path), limit=3, cursor=cursor)
+    assert first.text == 'new 0\nnew 1\nnew 2\n'
+    assert not first.reset and first.more
+    second = tail_lines(str(path), limit=3, cursor=first.cursor)
+    assert second.text == 'new 3\nnew 4\n'
+    assert not second.more
+
+
+def test_partial_line_waits_for_the_next_read(tmp_path):
+    path = tmp_path / 'bot.log'
+    write(path, ['done'])
+    cursor = tail_lines(str(path)).cursor
+    with open(path, 'a') as f:
+        f.write('half')
+    tail = tail_lines(str(path), cursor=cursor)
+    assert tail.text == '' and tail.cursor == cursor
+
+
+def test_rotation_resets_even_when_new_file_is_larger(tmp_path):
+    path = tmp_path / 'bot.log'
+    write(path, ['before rotation'])
+    cursor = tail_lines(str(path)).cursor
+    # RotatingFileHandler gibi: eski dosya yeniden adlandırılır, yenisi açılır
+    os.rename(path, tmp_path / 'bot.log.1')
+    write(path, [f'after {i}' for i in range(10)], mode='w')
+    tail = tail_lines(str(path), limit=2, cursor=cursor)
+    assert tail.reset
+    assert tail.text == 'after 8\nafter 9\n'
+    assert tail.cursor != cursor
+
+
+def test_malformed_cursor_falls_back_to_tail(tmp_path):
+    path = tmp_path / 'bot.log'
+    write(path, ['a', 'b'])
+    tail = tail_lines(str(path), limit=1, cursor='garbage')
+    assert tail.reset and tail.text == 'b\n'
@@ -0,0 +1,173 @@
+import logging
+
+import pytest
+import requests
+import tweepy
+
+from twitter_bot.accounts import QuotaExhaustedError
+from twitter_bot.benchmark import benchmark_config, build_bot
+from twitter_bot.config import Persona
+from twitter_bot.fakes import FakeProfile, http_error
+from twitter_bot.outbox import Outbox, idempotency_key
+
+
+def duplicate_error():
+    response = requests.Response()
+    response.status_code = 403
+    response.reason = "Forbidden"
+    response._content = b'{"detail": "You are not allowed to create a Tweet with duplicate content."}'
+    return tweepy.Forbidden(response)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / 'outbox.db'), lease_seconds=60)
+
+
+@pytest.fixture
+def bot(tmp_path):
+    config = benchmark_config()
+    config.outbox_path = str(tmp_path / 'bot_outbox.db')
+    config.outbox_min_spacing = 0
+    bot = build_bot(FakeProfile(latency=0, jitter=0), FakeProfile(latency=0, jitter=0), config)
+    bot.resilience.sleep = lambda seconds: None
+    return bot
+
+
+def patch_create_tweet(bot, func):
+    calls = []
+
+    def create_tweet(text, **kwargs):
+        calls.append(text)
+        return func(text)
+    for index in range(len(bot.config.accounts)):
+        bot.twitter_client(index).create_tweet = create_tweet
+    return calls
+
+
+def row(outbox, entry_id):
+    return outbox._conn().execute(
+        "SELECT status, attempts, not_before, account, last_error FROM outbox WHERE id = ?", (entry_id,)
+    ).fetchone()
+
+
+def test_enqueue_rejects_the_same_text_twice(outbox):
+    assert outbox.enqueue('hello  world', now=0)
+    assert not outbox.enqueue('hello world', now=1)
+    assert outbox.enqueue('hello world', persona='fun', now=1)
+    assert idempotency_key('hello world') != idempotency_key('hello world', 'fun')
+
+
+def test_claim_takes_oldest_due_entry_once(outbox):
+    outbox.enqueue('first', now=0)
+    outbox.enqueue('second', now=0)
+    outbox.enqueue('later', now=0, not_before=40)
+    first = outbox.claim(now=1)
+    second = outbox.claim(now=1)
+    assert (first.text, first.attempts) == ('first', 1)
+    assert second.text == 'second'
+    assert outbox.claim(now=1) is None
+    assert outbox.claim(now=40).text == 'later'
+
+
+def test_claim_is_scoped_to_persona(outbox):
+    outbox.enqueue('news tweet', persona='news', now=0)
+    assert outbox.claim(now=1) is None
+    assert outbox.claim('news', now=1).text == 'news tweet'
+
+
+def test_stale_posting_entry_is_reclaimed_after_lease(outbox):
+    outbox.enqueue('crash', now=0)
+    entry = outbox.claim(now=1)
+    assert outbox.claim(now=30) is None
+    reclaimed = outbox.claim(now=62)
+    assert reclaimed.id == entry.id
+    assert reclaimed.attempts == 2
+
+
+def test_release_returns_entry_without_counting_an_attempt(outbox):
+    outbox.enqueue('no budget', now=0)
+    entry = outbox.claim(now=1)
+    outbox.release(entry.id, at=50, now=1)
+    assert row(outbox, entry.id)[:3] == ('pending', 0, 50)
+    assert outbox.claim(now=49) is None
+    assert outbox.claim(now=50).attempts == 1
+
+
+def test_expire_and_stats(outbox):
+    outbox.enqueue('old', now=0)
+    outbox.enqueue('new', now=90)
+    assert outbox.expire(60, now=100) == 1
+    assert outbox.stats()['expired'] == 1
+    assert outbox.pending() == 1
+
+
+def test_expire_is_scoped_to_persona(outbox):
+    outbox.enqueue('old news', persona='news', now=0)
+    outbox.enqueue('old joke', persona='fun', now=0)
+    assert outbox.expire(60, 'news', now=100) == 1
+    assert outbox.pending('news') == 0
+    assert outbox.pending('fun') == 1
+
+
+def test_drain_posts_and_records_account(bot):
+    calls = patch_create_tweet(bot, lambda text: tweepy.Response({'id': '42'}, {}, [], {}))
+    bot.outbox.enqueue('hello')
+    bot.drain_outbox()
+    assert calls == ['hello']
+    entry_id = bot.outbox._conn().execute("SELECT id FROM outbox").fetchone()[0]
+    status, attempts, _, account, _ = row(bot.outbox, entry_id)
+    assert (status, attempts) == ('posted', 1)
+    assert account in {bot.scheduler.account_key(index) for index in range(len(bot.config.accounts))}
+    assert 'hello' in bot.recent_posts
+
+
+@pytest.mark.parametrize('error', [http_error(503), requests.Timeout('read timed out')])
+def test_drain_calls_create_tweet_once_and_reschedules(bot, error):
+    def fail(text):
+        raise error
+    calls = patch_create_tweet(bot, fail)
+    bot.outbox.enqueue('flaky')
+    bot.drain_outbox()
+    assert calls == ['flaky']
+    entry_id = bot.outbox._conn().execute("SELECT id FROM outbox").fetchone()[0]
+    status, attempts, not_before, _, last_error = row(bot.outbox, entry_id)
+    assert (status, attempts) == ('pending', 1)
+    assert not_before > bot.outbox._conn().execute("SELECT created_at FROM outbox").fetchone()[0]
+    assert last_error
+
+
+def test_drain_settles_duplicate_content_as_posted(bot):
+    def fail(text):
+        raise duplicate_error()
+    calls = patch_create_tweet(bot, fail)
+    bot.outbox.enqueue('already out')
+    bot.drain_outbox()
+    assert calls == ['already out']
+    assert bot.outbox.stats()['posted'] == 1
+    assert 'already out' in bot.recent_posts
+
+
+def test_drain_releases_entry_when_no_account_can_post(bot):
+    def exhausted(*args, **kwargs):
+        raise QuotaExhaustedError("No account available for create_tweet")
+    bot.scheduler.acquire_poster = exhausted
+    bot.outbox.enqueue('wait for quota')
+    bot.drain_outbox()
+    entry_id = bot.outbox._conn().execute("SELECT id FROM outbox").fetchone()[0]
+    assert row(bot.outbox, entry_id)[:2] == ('pending', 0)
+
+
+def test_drain_warns_once_when_persona_has_no_posting_budget(tmp_path, caplog):
+    config = benchmark_config()
+    config.outbox_path = str(tmp_path / 'bot_outbox.db')
+    config.accounts[1].role = 'read'
+    config.personas = [Persona('fun', '@fun', 'Silly', 'English', accounts=[2])]
+    bot = build_bot(FakeProfile(latency=0, jitter=0), FakeProfile(latency=0, jitter=0), config)
+    bot.outbox.enqueue('stuck', persona='fun')
+    with caplog.at_level(logging.WARNING):
+        bot.drain_outbox()
+        bot.drain_outbox()
+    warnings = [record for record in caplog.records if 'No posting budget' in record.getMessage()]
+    assert len(warnings) == 1
+    assert bot.outbox.pending('fun') == 1
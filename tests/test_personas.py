@@ -0,0 +1,32 @@
+from twitter_bot.benchmark import benchmark_config, build_bot
+from twitter_bot.config import Persona
+from twitter_bot.fakes import FakeProfile
+
+
+def persona_bot(*personas):
+    config = benchmark_config()
+    config.personas = list(personas)
+    config.outbox_path = None
+    config.generation_concurrency = 1  # Personalar sırayla üretir: ikincisi birincinin önbelleğini görebilir
+    return build_bot(FakeProfile(latency=0, jitter=0), FakeProfile(latency=0, jitter=0), config)
+
+
+def test_personas_with_the_same_voice_do_not_share_cached_completions():
+    bot = persona_bot(
+        Persona('news', '@news_bot', 'Witty', 'English'),
+        Persona('daily', '@daily_bot', 'Witty', 'English'),
+    )
+    responses = bot.analyze_and_respond(bot.get_trending_tweets())
+    assert set(responses) == {'news', 'daily'}
+    assert all(responses.values())
+    # Her persona kendi adıyla üretir; biri diğerinin önbelleğe alınmış yanıtını almaz
+    assert bot.openai_client.calls == 2
+    assert bot.completion_cache.stats()['hits'] == 0
+
+
+def test_persona_reuses_its_own_completion_for_an_unchanged_snapshot():
+    bot = persona_bot(Persona('news', '@news_bot', 'Witty', 'English'))
+    tweets = bot.get_trending_tweets()
+    bot.analyze_and_respond(tweets)
+    bot.analyze_and_respond(tweets)
+    assert bot.openai_client.calls == 1
@@ -0,0 +1,79 @@
+import pytest
+
+from twitter_bot.ratelimit import MemoryBackend, RateLimiter, SQLiteBackend, gcra
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'rate_limits.db'))
+    return MemoryBackend()
+
+
+def test_one_per_second_allows_requests_just_over_a_second_apart(backend):
+    # Pencere sınırını geçen iki istek: eski sayaç tabanlı limitin reddettiği durum
+    assert backend.hit('k', 1, 1.0, 0.9)[0]
+    assert backend.hit('k', 1, 1.0, 1.95)[0]
+
+
+def test_one_per_second_allows_exactly_one_interval_later(backend):
+    assert backend.hit('k', 1, 1.0, 0.5)[0]
+    assert backend.hit('k', 1, 1.0, 1.5)[0]
+
+
+def test_one_per_second_refuses_early_request_with_exact_retry_after(backend):
+    assert backend.hit('k', 1, 1.0, 0.25)[0]
+    allowed, retry_after = backend.hit('k', 1, 1.0, 1.0)
+    assert not allowed
+    assert retry_after == pytest.approx(0.25)
+
+
+def test_refused_requests_do_not_extend_the_wait(backend):
+    assert backend.hit('k', 1, 1.0, 0.0)[0]
+    for now in (0.25, 0.5, 0.75):
+        assert not backend.hit('k', 1, 1.0, now)[0]
+    assert backend.hit('k', 1, 1.0, 1.0)[0]
+
+
+def test_burst_up_to_limit_then_spaced(backend):
+    assert all(backend.hit('k', 3, 3.0, 10.0)[0] for _ in range(3))
+    allowed, retry_after = backend.hit('k', 3, 3.0, 10.0)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+    assert backend.hit('k', 3, 3.0, 11.0)[0]
+
+
+def test_keys_are_limited_independently(backend):
+    assert backend.hit('a', 1, 1.0, 0.0)[0]
+    assert backend.hit('b', 1, 1.0, 0.0)[0]
+    assert not backend.hit('a', 1, 1.0, 0.5)[0]
+
+
+def test_memory_backend_evicts_least_recently_seen_keys():
+    backend = MemoryBackend(max_keys=2)
+    for key in ('a', 'b', 'c'):
+        backend.hit(key, 1, 1.0, 0.0)
+    assert len(backend) == 2
+    # 'a' unutuldu, hemen tekrar izin verilir
+    assert backend.hit('a', 1, 1.0, 0.1)[0]
+
+
+def test_gcra_new_key_is_allowed():
+    allowed, retry_after, tat = gcra(None, 5.0, 1.0, 1)
+    assert allowed and retry_after == 0.0 and tat == 6.0
+
+
+def test_limiter_rounds_retry_after_up_to_whole_seconds():
+    clock = Clock()
+    limiter = RateLimiter(MemoryBackend(), clock=clock)
+    assert limiter.hit('k', 1, 1.0) == (True, 0)
+    clock.now = 0.9
+    assert limiter.hit('k', 1, 1.0) == (False, 1)
@@ -0,0 +1,50 @@
+import pytest
+import requests
+
+from twitter_bot.fakes import http_error
+from twitter_bot.resilience import Resilience
+
+
+def flaky(*errors, result='ok'):
+    """Callable raising the given errors in turn, then returning result"""
+    calls = []
+
+    def func():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return func, calls
+
+
+@pytest.fixture
+def resilience():
+    return Resilience(max_attempts=3, base_delay=0, sleep=lambda seconds: None)
+
+
+def test_idempotent_call_retries_timeouts_and_5xx(resilience):
+    func, calls = flaky(requests.Timeout(), http_error(503))
+    assert resilience.call('get_trends', func) == 'ok'
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize('error', [requests.Timeout(), requests.ConnectionError(), http_error(500)])
+def test_non_idempotent_call_is_not_retried_on_ambiguous_failures(resilience, error):
+    func, calls = flaky(error)
+    with pytest.raises(type(error)):
+        resilience.call('create_tweet', func, idempotent=False)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('error', [http_error(429), requests.ConnectTimeout()])
+def test_non_idempotent_call_is_retried_when_not_processed(resilience, error):
+    func, calls = flaky(error)
+    assert resilience.call('create_tweet', func, idempotent=False) == 'ok'
+    assert len(calls) == 2
+
+
+def test_max_attempts_overrides_the_default(resilience):
+    func, calls = flaky(http_error(429))
+    with pytest.raises(Exception):
+        resilience.call('create_tweet', func, max_attempts=1)
+    assert len(calls) == 1
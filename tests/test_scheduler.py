@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from twitter_bot.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler()
+    yield scheduler
+    scheduler.stop(timeout=1)
+
+
+def recorder(calls, name):
+    return lambda: calls.append(name)
+
+
+def test_jobs_run_in_due_order(scheduler):
+    calls = []
+    scheduler.every(0.3, recorder(calls, 'slow'), name='slow')
+    scheduler.every(0.1, recorder(calls, 'fast'), name='fast')
+    scheduler.every(0.2, recorder(calls, 'medium'), name='medium')
+    scheduler.start()
+    time.sleep(0.45)
+    assert list(dict.fromkeys(calls)) == ['fast', 'medium', 'slow']
+    assert scheduler.jobs['fast'].runs >= 3
+
+
+def test_cancelled_job_never_runs_and_its_name_can_be_reused(scheduler):
+    calls = []
+    scheduler.every(0.1, recorder(calls, 'old'), name='job')
+    scheduler.start()
+    assert scheduler.cancel('job')
+    assert not scheduler.cancel('job')
+    time.sleep(0.2)
+    assert calls == []
+    scheduler.every(0.05, recorder(calls, 'new'), name='job')
+    time.sleep(0.15)
+    assert calls and set(calls) == {'new'}
+
+
+def test_stop_wakes_the_loop_immediately(scheduler):
+    scheduler.every(3600, lambda: None)
+    scheduler.start()
+    started = time.monotonic()
+    assert scheduler.stop(timeout=1)
+    assert time.monotonic() - started < 0.5
+
+
+def test_running_job_is_not_started_twice(scheduler):
+    release = threading.Event()
+    job = scheduler.every(3600, release.wait, name='slow', run_now=True)
+    scheduler.start()
+    while not job.running.locked():
+        time.sleep(0.01)
+    assert not scheduler.trigger('slow')
+    assert job.skipped == 1
+    release.set()
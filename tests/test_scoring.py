@@ -0,0 +1,50 @@
+import pytest
+
+from twitter_bot.scoring import TrendScorer
+from twitter_bot.trends import Trend
+
+HOUR = 3600
+
+
+def trends(*keys):
+    return [Trend(key, key) for key in keys]
+
+
+def observe_window(scorer, series, start=0):
+    """Feed one observation per hour; ``series`` maps trend key -> volumes"""
+    for step in range(len(next(iter(series.values())))):
+        keys = list(series)
+        scorer.observe(keys, [series[key][step] for key in keys], now=start + step * HOUR)
+
+
+def test_top_k_ranks_growing_trends_first():
+    scorer = TrendScorer(capacity=10, window=6, weights={'novelty': 0, 'tweet_rate': 0})
+    observe_window(scorer, {
+        'rising': [100, 200, 400, 800, 1600, 3200],
+        'steady': [3000, 3000, 3000, 3000, 3000, 3000],
+        'fading': [5000, 4000, 3000, 2000, 1000, 500],
+    })
+    best = scorer.top(trends('fading', 'steady', 'rising'), 2, now=5 * HOUR)
+    assert [trend.key for trend in best] == ['rising', 'steady']
+    assert best[0].score > best[1].score
+
+
+def test_unknown_trends_score_zero_and_ties_keep_merge_order():
+    scorer = TrendScorer(capacity=4, window=3)
+    assert list(scorer.score(['new'])) == [0.0]
+    best = scorer.top(trends('b', 'a', 'c'), 3)
+    assert [trend.key for trend in best] == ['b', 'a', 'c']
+
+
+def test_capacity_evicts_least_recently_seen_trend():
+    scorer = TrendScorer(capacity=2, window=3)
+    scorer.observe(['a', 'b'], [1, 1], now=0)
+    scorer.observe(['b'], [1], now=10)
+    scorer.observe(['c'], [1], now=20)
+    assert len(scorer) == 2
+    assert list(scorer.score(['a', 'b', 'c'], now=20) > 0) == [False, True, True]
+
+
+def test_window_must_hold_three_observations():
+    with pytest.raises(ValueError):
+        TrendScorer(window=2)
@@ -0,0 +1,36 @@
+from twitter_bot.seen import SeenTweetIndex
+from twitter_bot.tweets import TweetBatch
+
+
+def batch(*ids):
+    return TweetBatch.from_payloads([{'id': str(tweet_id), 'text': f'tweet {tweet_id}'} for tweet_id in ids])
+
+
+def test_filter_new_keeps_order_and_drops_seen_ids():
+    index = SeenTweetIndex()
+    assert list(index.filter_new(batch(30, 10, 20)).ids) == [30, 10, 20]
+    assert list(index.filter_new(batch(20, 40, 10, 5)).ids) == [40, 5]
+    assert 40 in index and 41 not in index
+    assert len(index) == 5
+
+
+def test_full_index_evicts_oldest_ids_and_treats_older_ones_as_seen():
+    index = SeenTweetIndex(max_ids=3)
+    index.filter_new(batch(10, 20, 30))
+    assert list(index.filter_new(batch(40, 50)).ids) == [40, 50]
+    # En küçük id'ler atıldı; onlardan da eski tweetler yeniden analiz edilmez
+    assert len(index) == 3
+    assert 10 not in index and 30 in index
+    assert len(index.filter_new(batch(5, 10))) == 0
+
+
+def test_since_id_only_moves_forward_and_forgets_least_recent_trends():
+    index = SeenTweetIndex(max_trends=2)
+    index.update_since_id('a', batch(5, 9))
+    index.update_since_id('a', batch(7))
+    assert index.since_id('a') == 9
+    index.update_since_id('b', batch(1))
+    index.since_id('a')
+    index.update_since_id('c', batch(2))
+    assert index.since_id('b') is None
+    assert index.since_id('a') == 9
@@ -0,0 +1,58 @@
+import threading
+from datetime import date
+
+from twitter_bot.accounts import AccountScheduler
+from twitter_bot.config import TwitterAccount
+from twitter_bot.state import StateStore
+
+
+def account(token, tweets=10):
+    return TwitterAccount(
+        'bearer', 'key', 'secret', token, 'token-secret',
+        daily_tweet_limit=tweets, daily_view_limit=100, remaining_tweets=tweets
+    )
+
+
+def scheduler(store, *accounts):
+    return AccountScheduler(list(accounts), store=store, today=lambda: date(2026, 1, 1))
+
+
+def test_concurrent_consume_never_overdraws(tmp_path):
+    path = str(tmp_path / 'state.db')
+    StateStore(path).ensure_account('a', 100, 0, '2026-01-01')
+    granted = []
+
+    def worker():
+        # Her iş parçacığı ayrı bir süreç gibi kendi store nesnesini kullanır
+        store = StateStore(path)
+        granted.extend(store.consume('a', 'remaining_views') for _ in range(30))
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert granted.count(True) == 100
+    assert StateStore(path).get_quotas()['a']['remaining_views'] == 0
+
+
+def test_quotas_follow_the_account_not_its_position(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    first = scheduler(store, account('alice'), account('bob'))
+    first.charge_tweet(1)
+    # Hesap sırası değişse de bob'un harcadığı kota bob'da kalır
+    second = scheduler(store, account('bob'), account('carol'))
+    assert [a.remaining_tweets for a in second.accounts] == [9, 10]
+    assert first.account_key(1) == second.account_key(0)
+
+
+def test_charge_tweet_reflects_spending_by_other_processes(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    mine = scheduler(store, account('alice', tweets=3))
+    other = scheduler(store, account('alice', tweets=3))
+    other.charge_tweet(0)
+    other.charge_tweet(0)
+    mine.charge_tweet(0)
+    assert mine.accounts[0].remaining_tweets == 0
+    # Store'da kalmadığında yerel sayı eksiye düşmez
+    mine.charge_tweet(0)
+    assert mine.accounts[0].remaining_tweets == 0
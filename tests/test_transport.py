@@ -0,0 +1,62 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from twitter_bot.transport import HttpTransport, PoolStats
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_stats_are_consistent_under_concurrent_requests():
+    stats = PoolStats('test', max_per_host=4)
+
+    def worker():
+        for _ in range(500):
+            stats.begin('api.example.com')
+            stats.connection_opened()
+            stats.end('api.example.com')
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = stats.stats()
+    assert result['requests'] == result['connections_opened'] == 4000
+    assert result['in_flight'] == 0
+    assert 1 <= result['peak_in_flight'] <= 8
+
+
+def test_session_reuses_one_connection_for_sequential_requests(server):
+    transport = HttpTransport()
+    try:
+        for _ in range(5):
+            assert transport.session.get(server).text == 'ok'
+        stats = transport.stats()['twitter']
+        assert stats['requests'] == 5
+        assert stats['connections_opened'] == 1
+        assert stats['reused'] == 4
+        assert stats['in_flight'] == 0
+    finally:
+        transport.close()
@@ -0,0 +1,32 @@
+from twitter_bot.trends import merge_trends, normalize_trend
+
+
+def test_normalize_folds_hashtags_case_accents_and_spaces():
+    assert normalize_trend('#Café  Müller') == normalize_trend('cafe muller') == 'cafe muller'
+    assert normalize_trend('＃Python') == 'python'
+    assert normalize_trend('#') == ''
+
+
+def test_merge_dedups_variants_across_regions():
+    trends = merge_trends([
+        ('1', ['#Python', 'Rust', 'Go']),
+        ('2', ['Go', 'python', '#Zig']),
+    ])
+    # Önce daha çok bölgede görülenler, sonra en iyi sıra; eşitlikte ilk görülen önde
+    assert [trend.key for trend in trends] == ['python', 'go', 'rust', 'zig']
+    python = trends[0]
+    assert python.name == '#Python'
+    assert python.regions == ['1', '2']
+    assert python.rank == 0
+
+
+def test_merge_respects_per_region_and_limit():
+    region_trends = [('1', ['a', 'b', 'c']), ('2', ['c', 'd', '#'])]
+    assert [trend.key for trend in merge_trends(region_trends, per_region=2)] == ['a', 'c', 'b', 'd']
+    assert [trend.key for trend in merge_trends(region_trends, per_region=3, limit=2)] == ['c', 'a']
+
+
+def test_weight_sums_region_ranks():
+    trends = merge_trends([('1', ['x', 'y']), ('2', ['y'])])
+    weights = {trend.key: trend.weight for trend in trends}
+    assert weights == {'y': 1 / 2 + 1, 'x': 1.0}
@@ -0,0 +1,38 @@
+from twitter_bot.tweets import METRIC_FIELDS, TweetBatch
+
+PAYLOADS = [
+    {'id': '3', 'text': 'üç 🚀', 'author_id': '30', 'created_at': '2026-01-01T00:00:03Z',
+     'public_metrics': {'like_count': 3, 'retweet_count': 1}},
+    {'id': '1', 'text': 'bir'},
+    {'id': '2', 'text': 'iki', 'author_id': '20', 'created_at': '2026-01-01T00:00:02Z',
+     'public_metrics': {'like_count': 2, 'reply_count': 5}},
+]
+
+
+def test_records_expose_payload_fields_and_missing_values():
+    batch = TweetBatch.from_payloads(PAYLOADS, rank=4)
+    first, second = batch[0], batch[1]
+    assert (first.id, first.text, first.author_id, first.rank) == (3, 'üç 🚀', 30, 4)
+    assert first.public_metrics == {'like_count': 3, 'retweet_count': 1, 'reply_count': 0, 'quote_count': 0}
+    assert second.author_id is None and second.timestamp is None
+    assert batch[-1].id == 2
+
+
+def test_select_keeps_columns_aligned_in_the_given_order():
+    batch = TweetBatch.from_payloads(PAYLOADS, rank=1)
+    selected = batch.select([2, 0])
+    assert list(selected.ids) == [2, 3]
+    assert [record.text for record in selected] == ['iki', 'üç 🚀']
+    assert selected[0].public_metrics['reply_count'] == 5
+    assert len(selected.metrics) == 2 * len(METRIC_FIELDS)
+    assert list(batch.select([]).ids) == []
+
+
+def test_columns_round_trip_and_concat():
+    batch = TweetBatch.from_payloads(PAYLOADS)
+    rebuilt = TweetBatch.from_columns(batch.to_columns(), rank=2)
+    assert rebuilt.payloads() == batch.payloads()
+    assert set(rebuilt.ranks) == {2}
+    joined = TweetBatch.concat([rebuilt.select([1]), batch.select([0])])
+    assert [record.text for record in joined] == ['bir', 'üç 🚀']
+    assert list(joined.ranks) == [2, -1]
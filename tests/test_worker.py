@@ -0,0 +1,43 @@
+import pytest
+
+from twitter_bot.supervisor import check_worker_paths
+from twitter_bot.worker import worker_paths
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for var in ('STATE_PATH', 'ARCHIVE_PATH', 'OUTBOX_PATH'):
+        monkeypatch.delenv(var, raising=False)
+
+
+def test_default_worker_keeps_shared_paths():
+    assert worker_paths('default') == {
+        'STATE_PATH': 'state/bot_state.db', 'ARCHIVE_PATH': 'archive', 'OUTBOX_PATH': 'state/outbox.db'
+    }
+
+
+def test_named_worker_gets_its_own_subdirectory(monkeypatch):
+    monkeypatch.setenv('OUTBOX_PATH', 'data/queue.db')
+    assert worker_paths('news') == {
+        'STATE_PATH': 'state/news/bot_state.db', 'ARCHIVE_PATH': 'archive/news', 'OUTBOX_PATH': 'data/news/queue.db'
+    }
+
+
+def test_worker_env_file_paths_are_used_as_is(tmp_path):
+    env_file = tmp_path / '.env.news'
+    env_file.write_text('STATE_PATH=state/shared.db\nARCHIVE_PATH=\n')
+    paths = worker_paths('news', str(env_file))
+    assert paths['STATE_PATH'] == 'state/shared.db'
+    assert paths['ARCHIVE_PATH'] == ''
+    assert paths['OUTBOX_PATH'] == 'state/news/outbox.db'
+
+
+def test_workers_may_share_state_but_not_outbox(tmp_path):
+    news, fun = tmp_path / '.env.news', tmp_path / '.env.fun'
+    news.write_text('STATE_PATH=state/shared.db\n')
+    fun.write_text('STATE_PATH=state/shared.db\n')
+    check_worker_paths({'news': str(news), 'fun': str(fun)})
+
+    fun.write_text('OUTBOX_PATH=state/news/outbox.db\n')
+    with pytest.raises(ValueError, match='OUTBOX_PATH'):
+        check_worker_paths({'news': str(news), 'fun': str(fun)})
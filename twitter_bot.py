@@ -1,14 +1,12 @@
-import tweepy
-import schedule
-import time
-from openai import OpenAI
 from datetime import datetime
 import json
 import os
 import logging
-from dotenv import load_dotenv
-from flask import Flask, render_template, jsonify
 import threading
+from dotenv import load_dotenv
+from twitter_bot.scheduler import Scheduler
+from twitter_bot.trends import merge_trends
+from concurrent.futures import ThreadPoolExecutor
 
 # Logging dizinini kontrol et ve oluştur
 log_directory = "logs"
@@ -25,54 +23,109 @@ logging.basicConfig(
 # Çevre değişkenlerini yükle
 load_dotenv()
 
-# API anahtarlarının varlığını kontrol et
-required_env_vars = [
+# İstemcilerin ihtiyaç duyduğu çevre değişkenleri; ilk kullanımda kontrol edilir
+TWITTER_ENV_VARS = [
     'TWITTER_BEARER_TOKEN',
     'TWITTER_API_KEY',
     'TWITTER_API_SECRET',
     'TWITTER_ACCESS_TOKEN',
-    'TWITTER_ACCESS_TOKEN_SECRET',
-    'OPENAI_API_KEY'
+    'TWITTER_ACCESS_TOKEN_SECRET'
 ]
+OPENAI_ENV_VARS = ['OPENAI_API_KEY']
+
+# API istemcileri ilk kullanımda oluşturulur; modül kimlik bilgisi olmadan da içe aktarılabilir
+_client = None
+_openai_client = None
+_clients_lock = threading.Lock()
+
+def require_env(names):
+    """Eksik çevre değişkeni varsa hata verir"""
+    for var in names:
+        if not os.getenv(var):
+            logging.error(f"Eksik çevre değişkeni: {var}")
+            raise EnvironmentError(f"{var} çevre değişkeni bulunamadı")
+
+def get_client():
+    """Twitter API istemcisi; ilk çağrıda oluşturulur"""
+    global _client
+    with _clients_lock:
+        if _client is None:
+            require_env(TWITTER_ENV_VARS)
+            import tweepy
+            try:
+                _client = tweepy.Client(
+                    bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
+                    consumer_key=os.getenv('TWITTER_API_KEY'),
+                    consumer_secret=os.getenv('TWITTER_API_SECRET'),
+                    access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
+                    access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
+                )
+            except Exception as e:
+                logging.error(f"Twitter istemcisi oluşturulurken hata: {e}")
+                raise
+        return _client
+
+def get_openai_client():
+    """OpenAI istemcisi; ilk çağrıda oluşturulur"""
+    global _openai_client
+    with _clients_lock:
+        if _openai_client is None:
+            require_env(OPENAI_ENV_VARS)
+            from openai import OpenAI
+            try:
+                _openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            except Exception as e:
+                logging.error(f"OpenAI istemcisi oluşturulurken hata: {e}")
+                raise
+        return _openai_client
 
-for var in required_env_vars:
-    if not os.getenv(var):
-        logging.error(f"Eksik çevre değişkeni: {var}")
-        raise EnvironmentError(f"{var} çevre değişkeni bulunamadı")
-
-try:
-    # Twitter API kimlik bilgileri
-    client = tweepy.Client(
-        bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
-        consumer_key=os.getenv('TWITTER_API_KEY'),
-        consumer_secret=os.getenv('TWITTER_API_SECRET'),
-        access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-        access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-    )
+# Aynı anda yapılacak trend araması sayısı
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', 8))
+
+# Trendleri alınacak bölgeler (WOEID): varsayılan ABD ve dünya geneli
+TREND_REGIONS = [woeid.strip() for woeid in os.getenv('TREND_REGIONS', '23424977,1').split(',') if woeid.strip()]
+TRENDS_PER_REGION = int(os.getenv('TRENDS_PER_REGION', 50))
+MAX_TRENDS = int(os.getenv('MAX_TRENDS', 5))
 
-    # OpenAI istemcisi
-    openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-except Exception as e:
-    logging.error(f"API istemcileri oluşturulurken hata: {e}")
-    raise
+def fetch_region(woeid):
+    """Tek bir bölgenin trend isimlerini çeker; hata sadece o bölgeyi atlar"""
+    try:
+        trends = get_client().get_trends(id=woeid)
+        return woeid, [trend.name for trend in trends.data]
+    except Exception as e:
+        logging.warning(f"{woeid} bölgesinin trendleri alınamadı: {str(e)}")
+        return woeid, []
+
+def search_trend(trend_name):
+    """Tek bir trend için son tweetleri arar"""
+    logging.info(f"'{trend_name}' trendi için tweetler aranıyor")
+    tweets = get_client().search_recent_tweets(
+        query=trend_name,
+        max_results=10,
+        tweet_fields=['author_id', 'created_at', 'text']
+    )
+    return tweets.data or []
 
 def get_trending_tweets():
     """Trend olan tweetleri çeker"""
     try:
         logging.info("Trend tweetler alınıyor...")
-        us_trends = client.get_trends(id="23424977")
-        world_trends = client.get_trends(id="1")
+        workers = max(1, min(FETCH_CONCURRENCY, len(TREND_REGIONS)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            region_trends = list(executor.map(fetch_region, TREND_REGIONS))
+        
+        # Birden fazla bölgede görülen trend sadece bir kez aranır
+        trends = merge_trends(region_trends, TRENDS_PER_REGION, MAX_TRENDS)
+        for trend in trends:
+            if len(trend.regions) > 1:
+                logging.info(f"'{trend.name}' trendi {', '.join(trend.regions)} bölgelerinde ortak")
         
+        # Aramaları paralel yap; map() sonuçları trend sırasıyla döndürür
         all_tweets = []
-        for trend in us_trends.data + world_trends.data:
-            logging.info(f"'{trend.name}' trendi için tweetler aranıyor")
-            tweets = client.search_recent_tweets(
-                query=trend.name,
-                max_results=10,
-                tweet_fields=['author_id', 'created_at', 'text']
-            )
-            if tweets.data:
-                all_tweets.extend(tweets.data)
+        workers = max(1, min(FETCH_CONCURRENCY, len(trends)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for tweets in executor.map(search_trend, [trend.name for trend in trends]):
+                all_tweets.extend(tweets)
         
         logging.info(f"Toplam {len(all_tweets)} tweet toplandı")
         return all_tweets
@@ -98,7 +151,7 @@ def analyze_and_respond(tweets):
         {tweet_content}
         """
         
-        response = openai_client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-4",
             messages=[{"role": "user", "content": prompt}]
         )
@@ -113,7 +166,7 @@ def analyze_and_respond(tweets):
 def post_tweet(response):
     """Oluşturulan yanıtı tweet olarak paylaşır"""
     try:
-        client.create_tweet(text=response)
+        get_client().create_tweet(text=response)
         logging.info(f"Tweet başarıyla paylaşıldı: {response}")
     except Exception as e:
         logging.error(f"Tweet paylaşırken hata: {str(e)}", exc_info=True)
@@ -132,49 +185,45 @@ def run_bot():
     except Exception as e:
         logging.error(f"Bot çalışması sırasında beklenmeyen hata: {str(e)}", exc_info=True)
 
-app = Flask(__name__)
-bot_thread = None
-is_bot_running = False
+job_scheduler = None
 
 def start_bot():
-    global is_bot_running
+    """Zamanlayıcıyı başlatır; ilk çalıştırma hemen yapılır"""
+    global job_scheduler
+    job_scheduler = Scheduler()
+    job_scheduler.every(
+        int(os.getenv('CHECK_INTERVAL', 3)) * 3600,
+        run_bot,
+        jitter=float(os.getenv('SCHEDULE_JITTER', 0)),
+        run_now=True
+    )
+    job_scheduler.start()
     logging.info("Bot başlatıldı")
-    try:
-        schedule.every(3).hours.do(run_bot)
-        is_bot_running = True
-        
-        run_bot()  # İlk çalıştırma
-        
-        while is_bot_running:
-            try:
-                schedule.run_pending()
-                time.sleep(60)
-            except Exception as e:
-                logging.error(f"Zamanlayıcı döngüsünde hata: {str(e)}", exc_info=True)
-                time.sleep(300)
-    except Exception as e:
-        logging.error(f"Kritik hata: {str(e)}", exc_info=True)
-    
-    is_bot_running = False
-
-@app.route('/')
-def index():
-    return render_template('index.html', is_running=is_bot_running)
-
-@app.route('/toggle_bot')
-def toggle_bot():
-    global bot_thread, is_bot_running
-    
-    if not is_bot_running:
-        # Botu başlat
-        is_bot_running = True
-        bot_thread = threading.Thread(target=start_bot)
-        bot_thread.start()
-        return jsonify({"status": "started"})
-    else:
-        # Botu durdur
-        is_bot_running = False
-        return jsonify({"status": "stopped"})
+
+def is_bot_running():
+    return job_scheduler is not None and job_scheduler.is_running()
+
+def create_app():
+    """Web arayüzünü oluşturur; flask yalnızca arayüz gerektiğinde yüklenir"""
+    from flask import Flask, render_template, jsonify
+    app = Flask(__name__)
+
+    @app.route('/')
+    def index():
+        return render_template('index.html', is_running=is_bot_running())
+
+    @app.route('/toggle_bot')
+    def toggle_bot():
+        if not is_bot_running():
+            # Botu başlat
+            start_bot()
+            return jsonify({"status": "started"})
+        else:
+            # Botu durdur; devam eden döngü varsa bitmesini bekle
+            stopped = job_scheduler.stop(timeout=float(os.getenv('BOT_STOP_TIMEOUT', 30)))
+            return jsonify({"status": "stopped" if stopped else "stopping"})
+
+    return app
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    create_app().run(debug=True, port=5000)
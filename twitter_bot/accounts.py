@@ -0,0 +1,218 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+# Endpoint başına (istek sayısı, pencere saniyesi) - Twitter v2 kullanıcı limitleri
+DEFAULT_ENDPOINT_LIMITS = {
+    'get_trends': (75, 15 * 60),
+    'search_recent_tweets': (180, 15 * 60),
+    'create_tweet': (100, 15 * 60),
+}
+
+READ_ROLES = ('read', 'both')
+POST_ROLES = ('post', 'both')
+
+
+class QuotaExhaustedError(Exception):
+    """No account has quota or rate budget left for the request"""
+
+
+def account_identity(account):
+    """Stable key of an account's shared state: a hash of its user access token, never its position"""
+    token = account.access_token or account.bearer_token or ''
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at capacity / window"""
+
+    def __init__(self, capacity, window, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, cost=1):
+        self._refill()
+        return self.tokens >= cost
+
+    def consume(self, cost=1):
+        self._refill()
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class AccountScheduler:
+    """Quota-aware selection among any number of Twitter accounts.
+
+    Reads go to the reading account with the most remaining views whose
+    endpoint bucket still has tokens; posts go to the posting account with
+    the most remaining tweets. Daily quotas reset at UTC midnight. With a
+    StateStore the quotas live in the store, so every process sharing it
+    draws from the same budget.
+    """
+
+    def __init__(self, accounts, endpoint_limits=None, clock=time.monotonic, today=None, store=None):
+        self.accounts = accounts
+        self.endpoint_limits = dict(DEFAULT_ENDPOINT_LIMITS)
+        self.endpoint_limits.update(endpoint_limits or {})
+        self.clock = clock
+        self.today = today or (lambda: datetime.now(timezone.utc).date())
+        self.store = store
+        self.disabled = set()
+        self._buckets = {}
+        self._keys = [account_identity(account) for account in accounts]
+        self._reset_day = self.today()
+        self._lock = threading.Lock()
+        if store is not None:
+            for index, account in enumerate(accounts):
+                key = self.account_key(index)
+                store.ensure_account(key, account.remaining_views, account.remaining_tweets, self._reset_day.isoformat())
+                store.reset_quotas(key, account.daily_view_limit, account.daily_tweet_limit, self._reset_day.isoformat())
+            self._load_quotas()
+
+    def account_key(self, index):
+        """Key of the account's rows in the store; unchanged when accounts are reordered or added"""
+        return self._keys[index]
+
+    def _load_quotas(self):
+        """Copy the shared quotas from the store into the account objects"""
+        quotas = self.store.get_quotas()
+        for index, account in enumerate(self.accounts):
+            quota = quotas.get(self.account_key(index))
+            if quota:
+                account.remaining_views = quota['remaining_views']
+                account.remaining_tweets = quota['remaining_tweets']
+
+    def _bucket(self, index, endpoint):
+        key = (index, endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            capacity, window = self.endpoint_limits.get(endpoint, (1, 1))
+            bucket = self._buckets[key] = TokenBucket(capacity, window, clock=self.clock)
+        return bucket
+
+    def _reset_if_new_day(self):
+        today = self.today()
+        if today != self._reset_day:
+            for index, account in enumerate(self.accounts):
+                account.remaining_views = account.daily_view_limit
+                account.remaining_tweets = account.daily_tweet_limit
+                if self.store is not None:
+                    # Başka bir süreç sıfırlamış olabilir; store sadece bir kez sıfırlar
+                    self.store.reset_quotas(
+                        self.account_key(index), account.daily_view_limit,
+                        account.daily_tweet_limit, today.isoformat()
+                    )
+            self._reset_day = today
+
+    def disable(self, index):
+        """Exclude an account, e.g. when its client could not be created"""
+        with self._lock:
+            self.disabled.add(index)
+
+    def _pick(self, endpoint, roles, remaining, cost, exclude=(), only=None):
+        candidates = [
+            (remaining(account), index)
+            for index, account in enumerate(self.accounts)
+            if index not in self.disabled
+            and index not in exclude
+            and (only is None or index in only)
+            and account.role in roles
+            and remaining(account) >= cost
+            and self._bucket(index, endpoint).available(cost)
+        ]
+        if not candidates:
+            raise QuotaExhaustedError(f"No account available for {endpoint}")
+        # En fazla kotası kalan hesap; eşitlikte düşük index
+        _, index = max(candidates, key=lambda candidate: (candidate[0], -candidate[1]))
+        self._bucket(index, endpoint).consume(cost)
+        return index
+
+    def pause(self, index, endpoint, seconds):
+        """Keep an account off an endpoint, e.g. until its rate limit window resets"""
+        with self._lock:
+            bucket = self._bucket(index, endpoint)
+            bucket._refill()
+            # Kova ancak ``seconds`` sonra tekrar bir token'a ulaşır
+            bucket.tokens = min(bucket.tokens, 1 - seconds * bucket.rate)
+
+    def acquire_reader(self, endpoint, cost=1):
+        """Pick a reading account for one request and charge its remaining_views"""
+        with self._lock:
+            self._reset_if_new_day()
+            if self.store is None:
+                index = self._pick(endpoint, READ_ROLES, lambda account: account.remaining_views, cost)
+                self.accounts[index].remaining_views -= cost
+                return index
+
+            # Paylaşılan kota: diğer süreçler aynı anda harcamış olabilir, başarısız olursa sıradakini dene
+            self._load_quotas()
+            tried = set()
+            while True:
+                index = self._pick(endpoint, READ_ROLES, lambda account: account.remaining_views, cost, tried)
+                if self.store.consume(self.account_key(index), 'remaining_views', cost):
+                    self.accounts[index].remaining_views -= cost
+                    return index
+                tried.add(index)
+
+    def refund_views(self, index, cost=1):
+        """Return the views charged by acquire_reader when the request was refused (e.g. 429)"""
+        with self._lock:
+            if self.store is None:
+                self.accounts[index].remaining_views += cost
+                return
+            self.store.refund(self.account_key(index), 'remaining_views', cost)
+            self._load_quotas()
+
+    def acquire_poster(self, endpoint='create_tweet', accounts=None):
+        """Pick a posting account, optionally among the given indexes; call charge_tweet once the post succeeded"""
+        with self._lock:
+            self._reset_if_new_day()
+            if self.store is not None:
+                self._load_quotas()
+            return self._pick(endpoint, POST_ROLES, lambda account: account.remaining_tweets, 1, only=accounts)
+
+    def posting_budget(self, accounts=None):
+        """Tweets the enabled posting accounts (optionally only the given indexes) may still send today"""
+        with self._lock:
+            self._reset_if_new_day()
+            if self.store is not None:
+                self._load_quotas()
+            return sum(
+                max(account.remaining_tweets, 0)
+                for index, account in enumerate(self.accounts)
+                if index not in self.disabled and account.role in POST_ROLES
+                and (accounts is None or index in accounts)
+            )
+
+    def charge_tweet(self, index):
+        with self._lock:
+            if self.store is None:
+                self.accounts[index].remaining_tweets -= 1
+                return
+            # Kaynak store'dur; diğer süreçlerin harcadıkları da yerel kopyaya yansır
+            self.store.consume(self.account_key(index), 'remaining_tweets')
+            self._load_quotas()
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    'account': index + 1,
+                    'role': account.role,
+                    'remaining_views': account.remaining_views,
+                    'remaining_tweets': account.remaining_tweets,
+                    'disabled': index in self.disabled,
+                }
+                for index, account in enumerate(self.accounts)
+            ]
@@ -0,0 +1,382 @@
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok, arşiv worker başına ayrı dizinde tutulur
+    fcntl = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    tweet_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tweets (
+    tweet_id INTEGER PRIMARY KEY,
+    batch_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    trend TEXT,
+    author_id INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trends (
+    batch_id INTEGER NOT NULL,
+    trend TEXT NOT NULL,
+    name TEXT NOT NULL,
+    regions TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    score REAL NOT NULL,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS batches_created ON batches (created_at);
+CREATE INDEX IF NOT EXISTS batches_segment ON batches (segment);
+CREATE INDEX IF NOT EXISTS tweets_trend ON tweets (trend, created_at);
+CREATE INDEX IF NOT EXISTS tweets_author ON tweets (author_id, created_at);
+CREATE INDEX IF NOT EXISTS tweets_created ON tweets (created_at);
+CREATE INDEX IF NOT EXISTS tweets_batch ON tweets (batch_id);
+CREATE INDEX IF NOT EXISTS trends_trend ON trends (trend, observed_at);
+CREATE INDEX IF NOT EXISTS trends_batch ON trends (batch_id);
+"""
+
+# Kayıt başlığı: sihirli değer, sıkıştırılmış uzunluk, CRC32
+RECORD_HEADER = struct.Struct('>4sII')
+RECORD_MAGIC = b'TWAB'
+
+
+def tweet_timestamp(payload, default):
+    """Epoch seconds of a tweet payload's created_at (ISO string or datetime)"""
+    created_at = payload.get('created_at')
+    if isinstance(created_at, datetime):
+        return created_at.timestamp()
+    if created_at:
+        try:
+            return datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class TweetArchive:
+    """Append-only local archive of the tweets and trends of every cycle.
+
+    Each cycle is written as one zlib-compressed JSON batch at the end of
+    the current segment file; segments roll over at ``segment_bytes``. A
+    SQLite index maps tweets to their batch by trend, author and time, so
+    range queries only memory-map and decompress the batches they need.
+    ``compact()`` drops batches older than the retention period and
+    rewrites segments that are mostly dead. Appends and compaction hold a
+    lock file in the directory, so processes sharing it never interleave
+    writes.
+    """
+
+    def __init__(self, path, retention_days=30, segment_bytes=64 * 1024 * 1024,
+                 compression_level=6, busy_timeout=5.0):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.path = path
+        self.retention = retention_days * 86400
+        self.segment_bytes = segment_bytes
+        self.compression_level = compression_level
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.archive_path,
+            retention_days=config.archive_retention_days,
+            segment_bytes=config.archive_segment_mb * 1024 * 1024
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                os.path.join(self.path, 'index.db'), timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def _exclusive(self):
+        """Write lock across threads and, via a lock file, across processes"""
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.path, 'write.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, f'segment-{segment:06d}.log')
+
+    def _segments(self):
+        return sorted(
+            int(name[8:14]) for name in os.listdir(self.path)
+            if name.startswith('segment-') and name.endswith('.log')
+        )
+
+    def _active_segment(self):
+        """Segment to append to; starts a new one when the last is full"""
+        segments = self._segments()
+        if not segments:
+            return 1
+        last = segments[-1]
+        if os.path.getsize(self._segment_path(last)) >= self.segment_bytes:
+            return last + 1
+        return last
+
+    def _write_record(self, segment, data):
+        """Append one framed record; returns (offset, length) of the whole record"""
+        compressed = zlib.compress(data, self.compression_level)
+        record = RECORD_HEADER.pack(RECORD_MAGIC, len(compressed), zlib.crc32(compressed)) + compressed
+        with open(self._segment_path(segment), 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset, len(record)
+
+    @staticmethod
+    def _read_record(view, offset, length):
+        magic, size, crc = RECORD_HEADER.unpack_from(view, offset)
+        compressed = view[offset + RECORD_HEADER.size:offset + length]
+        if magic != RECORD_MAGIC or len(compressed) != size or zlib.crc32(compressed) != crc:
+            raise ValueError(f"Corrupt archive record at offset {offset}")
+        return json.loads(zlib.decompress(compressed))
+
+    def append(self, tweets, tweet_trends=None, trends=(), now=None):
+        """Archive one cycle: tweet payload dicts, int tweet id -> trend key, and Trend objects.
+
+        Tweets already in the archive are skipped. Returns the number of
+        tweets written.
+        """
+        now = time.time() if now is None else now
+        tweet_trends = tweet_trends or {}
+        with self._exclusive():
+            ids = [int(payload['id']) for payload in tweets]
+            known = set()
+            conn = self._conn()
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                known.update(row[0] for row in conn.execute(
+                    f"SELECT tweet_id FROM tweets WHERE tweet_id IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            fresh = []
+            for payload in tweets:
+                tweet_id = int(payload['id'])
+                if tweet_id not in known:
+                    known.add(tweet_id)
+                    fresh.append(payload)
+            if not fresh and not trends:
+                return 0
+
+            batch = {
+                'created_at': now,
+                'tweets': fresh,
+                'trends': [
+                    {'key': trend.key, 'name': trend.name, 'regions': trend.regions,
+                     'rank': trend.rank, 'weight': trend.weight, 'score': trend.score}
+                    for trend in trends
+                ],
+            }
+            segment = self._active_segment()
+            # Önce veri diske yazılır, sonra indekslenir: yarım kalan kayıt hiç görünmez
+            offset, length = self._write_record(segment, json.dumps(batch, separators=(',', ':')).encode('utf-8'))
+            with self._transaction() as conn:
+                batch_id = conn.execute(
+                    "INSERT INTO batches (segment, offset, length, created_at, tweet_count) VALUES (?, ?, ?, ?, ?)",
+                    (segment, offset, length, now, len(fresh))
+                ).lastrowid
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tweets VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            int(payload['id']), batch_id, position,
+                            tweet_trends.get(int(payload['id'])),
+                            int(payload['author_id']) if payload.get('author_id') else None,
+                            tweet_timestamp(payload, now)
+                        )
+                        for position, payload in enumerate(fresh)
+                    ]
+                )
+                conn.executemany(
+                    "INSERT INTO trends VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (batch_id, item['key'], item['name'], json.dumps(item['regions']),
+                         item['rank'], item['weight'], item['score'], now)
+                        for item in batch['trends']
+                    ]
+                )
+        return len(fresh)
+
+    def _load(self, rows):
+        """Read (batch_id, position) rows, memory-mapping each segment and decoding each batch once"""
+        if not rows:
+            return []
+        conn = self._conn()
+        batch_ids = sorted({batch_id for batch_id, _ in rows})
+        locations = {}
+        for start in range(0, len(batch_ids), 500):
+            chunk = batch_ids[start:start + 500]
+            for batch_id, segment, offset, length in conn.execute(
+                f"SELECT id, segment, offset, length FROM batches WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                locations[batch_id] = (segment, offset, length)
+
+        by_segment = {}
+        for batch_id, location in locations.items():
+            by_segment.setdefault(location[0], []).append((batch_id, location[1], location[2]))
+        batches = {}
+        for segment, entries in by_segment.items():
+            try:
+                with open(self._segment_path(segment), 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    for batch_id, offset, length in entries:
+                        batches[batch_id] = self._read_record(view, offset, length)
+            except (OSError, ValueError) as e:
+                # Sıkıştırma sırasında segment taşınmış ya da bozuk olabilir; o batch'ler atlanır
+                logging.warning(f"Arşiv segmenti {segment} okunamadı: {str(e)}")
+        return [
+            batches[batch_id]['tweets'][position]
+            for batch_id, position in rows if batch_id in batches
+        ]
+
+    def query(self, trend=None, author_id=None, since=None, until=None, limit=None):
+        """Archived tweet payloads matching all given filters, newest first"""
+        clauses, params = [], []
+        if trend is not None:
+            clauses.append("trend = ?")
+            params.append(trend)
+        if author_id is not None:
+            clauses.append("author_id = ?")
+            params.append(int(author_id))
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        sql = "SELECT batch_id, position FROM tweets"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._load(self._conn().execute(sql, params).fetchall())
+
+    def recent(self, trend, hours, limit=None, now=None):
+        """Tweets of a trend from the last ``hours`` hours"""
+        now = time.time() if now is None else now
+        return self.query(trend=trend, since=now - hours * 3600, limit=limit)
+
+    def trend_history(self, trend, since=None):
+        """Per-cycle observations of a trend: (observed_at, rank, weight, score, regions), oldest first"""
+        sql = "SELECT observed_at, rank, weight, score, regions FROM trends WHERE trend = ?"
+        params = [trend]
+        if since is not None:
+            sql += " AND observed_at >= ?"
+            params.append(since)
+        rows = self._conn().execute(sql + " ORDER BY observed_at", params).fetchall()
+        return [(at, rank, weight, score, json.loads(regions)) for at, rank, weight, score, regions in rows]
+
+    def compact(self, now=None, min_live_ratio=0.5):
+        """Apply retention and rewrite sparse segments; returns (batches dropped, segments rewritten)"""
+        now = time.time() if now is None else now
+        with self._exclusive():
+            with self._transaction() as conn:
+                expired = conn.execute(
+                    "SELECT COUNT(*) FROM batches WHERE created_at < ?", (now - self.retention,)
+                ).fetchone()[0]
+                if expired:
+                    conn.execute(
+                        "DELETE FROM tweets WHERE batch_id IN (SELECT id FROM batches WHERE created_at < ?)",
+                        (now - self.retention,)
+                    )
+                    conn.execute(
+                        "DELETE FROM trends WHERE batch_id IN (SELECT id FROM batches WHERE created_at < ?)",
+                        (now - self.retention,)
+                    )
+                    conn.execute("DELETE FROM batches WHERE created_at < ?", (now - self.retention,))
+
+            live = dict(self._conn().execute(
+                "SELECT segment, SUM(length) FROM batches GROUP BY segment"
+            ).fetchall())
+            segments = self._segments()
+            active = self._active_segment()
+            rewritten = 0
+            for segment in segments:
+                if segment == active:
+                    continue
+                size = os.path.getsize(self._segment_path(segment))
+                live_bytes = live.get(segment, 0)
+                if live_bytes and size and live_bytes / size >= min_live_ratio:
+                    continue
+                if live_bytes:
+                    self._move_batches(segment, active)
+                    active = self._active_segment()
+                os.remove(self._segment_path(segment))
+                rewritten += 1
+        if expired or rewritten:
+            logging.info(f"Arşiv sıkıştırıldı: {expired} eski batch silindi, {rewritten} segment yeniden yazıldı")
+        return expired, rewritten
+
+    def _move_batches(self, source, target):
+        """Copy a segment's live records to the end of the target segment and repoint the index"""
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT id, offset, length FROM batches WHERE segment = ? ORDER BY id", (source,)
+        ).fetchall()
+        moves = []
+        with open(self._segment_path(source), 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view, \
+                open(self._segment_path(target), 'ab') as out:
+            for batch_id, offset, length in rows:
+                new_offset = out.seek(0, os.SEEK_END)
+                out.write(view[offset:offset + length])
+                moves.append((target, new_offset, batch_id))
+            out.flush()
+            os.fsync(out.fileno())
+        with self._transaction() as conn:
+            conn.executemany("UPDATE batches SET segment = ?, offset = ? WHERE id = ?", moves)
+
+    def stats(self):
+        conn = self._conn()
+        batches, tweets = conn.execute("SELECT COUNT(*), COALESCE(SUM(tweet_count), 0) FROM batches").fetchone()
+        size = sum(os.path.getsize(self._segment_path(segment)) for segment in self._segments())
+        return {'batches': batches, 'tweets': tweets, 'segments': len(self._segments()), 'bytes': size}
@@ -1,8 +1,66 @@
 from functools import wraps
-from flask import request, Response
+from flask import request, Response, session
+import hashlib
 import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from werkzeug.security import generate_password_hash, check_password_hash
 
+class SessionCache:
+    """Bounded in-memory table of authenticated session tokens.
+
+    A token is only valid while it is in this table, has not expired and
+    was issued for the current admin credentials, so revoking it (or
+    changing ADMIN_PASSWORD_HASH) takes effect on the next request.
+    """
+
+    def __init__(self, ttl=900, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._tokens = OrderedDict()  # token -> (username, credentials_version, expires_at)
+        self._lock = threading.Lock()
+
+    def issue(self, username, version):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._tokens[token] = (username, version, time.time() + self.ttl)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+        return token
+
+    def verify(self, token, version):
+        """Return the username for a live token, or None"""
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None:
+                return None
+            username, token_version, expires_at = entry
+            if token_version != version or expires_at <= time.time():
+                del self._tokens[token]
+                return None
+            self._tokens.move_to_end(token)
+            return username
+
+    def revoke(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def revoke_all(self):
+        with self._lock:
+            self._tokens.clear()
+
+sessions = SessionCache(
+    ttl=int(os.getenv('AUTH_SESSION_TTL', 900)),
+    max_entries=int(os.getenv('AUTH_SESSION_CACHE_SIZE', 1024))
+)
+
+def credentials_version():
+    """Fingerprint of the configured admin credentials; changes revoke all sessions"""
+    stored = f"{os.getenv('ADMIN_USERNAME')}:{os.getenv('ADMIN_PASSWORD_HASH')}"
+    return hashlib.sha256(stored.encode('utf-8')).hexdigest()
+
 def check_auth(username, password):
     """Kullanıcı adı ve şifreyi kontrol et"""
     stored_username = os.getenv('ADMIN_USERNAME')
@@ -16,11 +74,23 @@ def authenticate():
         {'WWW-Authenticate': 'Basic realm="Login Required"'}
     )
 
+def logout():
+    """Revoke the current session token"""
+    token = session.pop('auth_token', None)
+    if token:
+        sessions.revoke(token)
+
 def requires_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
+        # İmzalı oturum çerezi geçerliyse pahalı şifre hash kontrolü atlanır
+        token = session.get('auth_token')
+        if token and sessions.verify(token, credentials_version()):
+            return f(*args, **kwargs)
+
         auth = request.authorization
         if not auth or not check_auth(auth.username, auth.password):
             return authenticate()
+        session['auth_token'] = sessions.issue(auth.username, credentials_version())
         return f(*args, **kwargs)
-    return decorated 
\ No newline at end of file
+    return decorated
@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from twitter_bot.config import Config, TwitterAccount
+from twitter_bot.fakes import FakeOpenAI, FakeProfile, FakeTwitterClient
+from twitter_bot.bot import TwitterBot
+from twitter_bot.metrics import metrics
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+STAGES = ('fetch_trends', 'score', 'search', 'prompt', 'analysis', 'post')
+GENERATION_SUMMARIES = {'twitter_bot_generation_ttft_seconds': 'ttft', 'twitter_bot_generation_seconds': 'total'}
+MEMORY_CYCLES = 5  # tracemalloc yavaş olduğundan bellek ölçümü ayrı ve kısa bir turda yapılır
+
+
+def benchmark_config(accounts=2, regions=1, stream=True, generation_mode='single', max_trends=5):
+    """Config with fake credentials and limits high enough for long runs"""
+    return Config(
+        accounts=[
+            TwitterAccount(
+                bearer_token='fake', api_key='fake', api_secret='fake',
+                access_token=f'fake-{number}', access_token_secret='fake',
+                daily_tweet_limit=10 ** 9, daily_view_limit=10 ** 9,
+                remaining_tweets=10 ** 9, remaining_views=10 ** 9
+            )
+            for number in range(accounts)
+        ],
+        bot_name='@BenchmarkBot',
+        bot_personality='Witty and sarcastic',
+        bot_language='English',
+        trend_regions=[str(23424977 + i) for i in range(regions)],
+        stream_generation=stream,
+        retry_base_delay=0.05,  # Hata enjeksiyonunda yeniden denemeler ölçümü uzatmasın
+        retry_max_delay=0.5,
+        generation_mode=generation_mode,
+        max_trends=max_trends
+    )
+
+
+def build_bot(twitter_profile, openai_profile, config=None):
+    """TwitterBot wired to fake backends"""
+    return TwitterBot(
+        config=config or benchmark_config(),
+        twitter_client_factory=lambda account: FakeTwitterClient(twitter_profile),
+        openai_client_factory=lambda: FakeOpenAI(openai_profile)
+    )
+
+
+def run_benchmark(cycles, twitter_profile, openai_profile, regions=1, stream=True, generation_mode='single',
+                  max_trends=5):
+    """Drive run_bot for a number of cycles and collect throughput, latency and memory"""
+    def config():
+        return benchmark_config(
+            regions=regions, stream=stream, generation_mode=generation_mode, max_trends=max_trends
+        )
+
+    tracemalloc.start()
+    bot = build_bot(twitter_profile, openai_profile, config())
+    for _ in range(min(cycles, MEMORY_CYCLES)):
+        bot.run_bot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics.reset()
+    bot = build_bot(twitter_profile, openai_profile, config())
+    start = time.perf_counter()
+    for _ in range(cycles):
+        bot.run_bot()
+    elapsed = time.perf_counter() - start
+
+    summaries = metrics.snapshot()['summaries']
+    stages = {}
+    for stage in STAGES:
+        summary = summaries.get(('twitter_bot_stage_seconds', (('stage', stage),)))
+        if summary:
+            stages[stage] = {key: summary[key] for key in ('count', 'p50', 'p95', 'p99')}
+    generation = {}
+    for (name, _), summary in summaries.items():
+        label = GENERATION_SUMMARIES.get(name)
+        if label:
+            generation[label] = {key: summary[key] for key in ('count', 'p50', 'p95', 'p99')}
+
+    errors = sum(
+        value for (name, _), value in metrics.snapshot()['counters'].items()
+        if name == 'twitter_bot_api_call_errors_total'
+    )
+    return {
+        'cycles': cycles,
+        'seconds': elapsed,
+        'cycles_per_sec': cycles / elapsed if elapsed else float('inf'),
+        'peak_memory_bytes': peak,
+        'errors': errors,
+        'stages': stages,
+        'generation': generation,
+    }
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """Return regression messages for throughput or memory worse than the baseline"""
+    regressions = []
+    if result['cycles_per_sec'] < baseline['cycles_per_sec'] * (1 - tolerance):
+        regressions.append(
+            f"cycles/sec {result['cycles_per_sec']:.2f} < baseline {baseline['cycles_per_sec']:.2f}"
+        )
+    if result['peak_memory_bytes'] > baseline['peak_memory_bytes'] * (1 + tolerance):
+        regressions.append(
+            f"peak memory {result['peak_memory_bytes']} > baseline {baseline['peak_memory_bytes']}"
+        )
+    for stage, stats in result['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if base and stats['p95'] > base['p95'] * (1 + tolerance):
+            regressions.append(f"{stage} p95 {stats['p95']:.4f}s > baseline {base['p95']:.4f}s")
+    return regressions
+
+
+def print_report(result):
+    print(f"Cycles: {result['cycles']} in {result['seconds']:.2f}s ({result['cycles_per_sec']:.2f} cycles/sec)")
+    print(f"Peak memory: {result['peak_memory_bytes'] / 1024:.1f} KiB, errors: {result['errors']}")
+    rows = list(result['stages'].items()) + [
+        (f"gen_{name}", stats) for name, stats in result.get('generation', {}).items()
+    ]
+    for stage, stats in rows:
+        print(
+            f"  {stage:<13} n={stats['count']:<5} p50={stats['p50'] * 1000:8.2f}ms "
+            f"p95={stats['p95'] * 1000:8.2f}ms p99={stats['p99'] * 1000:8.2f}ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline TwitterBot benchmark with fake backends")
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--trends', type=int, default=50, help="Trends returned per get_trends call")
+    parser.add_argument('--regions', type=int, default=1, help="Number of trend regions (WOEIDs) to track")
+    parser.add_argument('--max-trends', type=int, default=5, help="Top scored trends searched per cycle")
+    parser.add_argument('--twitter-latency', type=float, default=0.05)
+    parser.add_argument('--openai-latency', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--tweet-words', type=int, default=25)
+    parser.add_argument('--completion-chars', type=int, default=240, help="Length of fake GPT answers")
+    parser.add_argument('--no-stream', action='store_true', help="Use non-streaming completions")
+    parser.add_argument('--generation-mode', choices=('single', 'per_trend'), default='single')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed regression ratio")
+    args = parser.parse_args(argv)
+
+    # Benchmark sırasında log yazımı ölçümleri bozmasın
+    logging.getLogger().setLevel(logging.WARNING)
+
+    twitter_profile = FakeProfile(
+        latency=args.twitter_latency, jitter=args.twitter_latency / 5,
+        error_rate=args.error_rate, trends=args.trends, tweet_words=args.tweet_words
+    )
+    openai_profile = FakeProfile(
+        latency=args.openai_latency, jitter=args.openai_latency / 5, error_rate=args.error_rate,
+        completion_chars=args.completion_chars
+    )
+    result = run_benchmark(
+        args.cycles, twitter_profile, openai_profile,
+        regions=args.regions, stream=not args.no_stream, generation_mode=args.generation_mode,
+        max_trends=args.max_trends
+    )
+    print_report(result)
+
+    if args.save_baseline:
+        directory = os.path.dirname(args.baseline)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(args.baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(result, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
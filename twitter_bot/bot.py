@@ -0,0 +1,714 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import tweepy
+from dotenv import load_dotenv
+
+from twitter_bot.accounts import AccountScheduler, QuotaExhaustedError
+from twitter_bot.archive import TweetArchive
+from twitter_bot.cache import ResponseCache
+from twitter_bot.completion_cache import CompletionCache, TrendSnapshot
+from twitter_bot.config import Config
+from twitter_bot.generation import (
+    TWEET_MAX_CHARS, Candidate, GenerationEngine, generate_tweet, select_candidate, trim_to_words, tweet_length
+)
+from twitter_bot.metrics import metrics
+from twitter_bot.outbox import Outbox
+from twitter_bot.prompt import build_tweet_content, engagement
+from twitter_bot.resilience import CircuitOpenError, Resilience, is_duplicate_post, is_retryable, retry_after
+from twitter_bot.scoring import TrendScorer
+from twitter_bot.seen import SeenTweetIndex
+from twitter_bot.state import StateStore
+from twitter_bot.transport import HttpTransport
+from twitter_bot.trends import merge_trends
+from twitter_bot.tweets import MISSING, TweetBatch
+
+
+def create_twitter_client(account, transport=None):
+    """Default factory: a tweepy client authenticated as the given account"""
+    client = tweepy.Client(
+        bearer_token=account.bearer_token,
+        consumer_key=account.api_key,
+        consumer_secret=account.api_secret,
+        access_token=account.access_token,
+        access_token_secret=account.access_token_secret
+    )
+    if transport is not None:
+        # Tüm hesaplar aynı bağlantı havuzunu kullanır
+        client.session = transport.session
+    return client
+
+
+def create_openai_client(transport=None):
+    """Default factory: an OpenAI client using OPENAI_API_KEY"""
+    # openai paketi ağır; sadece istemci gerçekten gerektiğinde yüklenir
+    from openai import OpenAI
+    http_client = transport.http_client if transport is not None else None
+    # Yeniden deneme yalnızca Resilience katmanında yapılır; SDK kendi denemesini yapmaz
+    return OpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=http_client, max_retries=0)
+
+
+class TwitterBot:
+    def __init__(self, config=None, twitter_client_factory=None, openai_client_factory=None):
+        if config is None:
+            load_dotenv()
+            config = Config.from_env()
+        self.config = config
+        # Trendler ve tweetler döngü başına bir kez toplanır, her persona aynı özetten üretir
+        self.personas = self.config.persona_profiles()
+        self.transport = HttpTransport.from_config(self.config)
+        # Benchmark ve testlerde sahte istemciler enjekte edilebilir
+        self.twitter_client_factory = twitter_client_factory or partial(create_twitter_client, transport=self.transport)
+        self.openai_client_factory = openai_client_factory or partial(create_openai_client, transport=self.transport)
+        self.cache = ResponseCache.from_config(self.config)
+        self.store = StateStore(self.config.state_path) if self.config.state_path else None
+        self.scheduler = AccountScheduler(self.config.accounts, store=self.store)
+        self.resilience = Resilience.from_config(self.config)
+        self.seen = SeenTweetIndex(max_ids=self.config.seen_index_size, store=self.store)
+        self.archive = TweetArchive.from_config(self.config) if self.config.archive_path else None
+        self.outbox = Outbox.from_config(self.config) if self.config.outbox_path else None
+        self.next_post_at = {}  # Persona -> paylaşımcının bir sonraki tweeti gönderebileceği zaman
+        self.starved_personas = set()  # Paylaşım bütçesi bitmiş (uyarısı yapılmış) personalar
+        self.cycle_started_at = None
+        self.trend_scorer = TrendScorer(
+            capacity=self.config.trend_score_capacity,
+            window=self.config.trend_score_window
+        )
+        self.trends = []  # Son döngüde aranan birleştirilmiş trendler; tweetlerin rank sütunu buna işaret eder
+        self.completion_cache = CompletionCache(
+            ttl=self.config.completion_cache_ttl,
+            max_entries=self.config.completion_cache_size,
+            similarity_threshold=self.config.completion_similarity
+        )
+        self.trend_snapshot = TrendSnapshot()  # Tamamlama önbelleğinin anahtarı
+        self.recent_posts = deque(maxlen=50)  # Aynı tweetin tekrar paylaşılmasını önler
+        self.last_run = None
+        if self.store is not None:
+            self.recent_posts.extend(self.store.recent_posts(50))
+        self.setup_clients()
+        
+    def setup_clients(self):
+        """Prepare client slots; each client is created on first use"""
+        self.clients = [None] * len(self.config.accounts)
+        self._openai_client = None
+        self._generation_engine = None
+        self._clients_lock = threading.Lock()
+
+    def twitter_client(self, index):
+        """Client of the given account, created on first use"""
+        client = self.clients[index]
+        if client is None:
+            with self._clients_lock:
+                client = self.clients[index]
+                if client is None:
+                    try:
+                        client = self.clients[index] = self.twitter_client_factory(self.config.accounts[index])
+                    except Exception as e:
+                        logging.error(f"Client oluşturulurken hata: {str(e)}", exc_info=True)
+                        # Hesap zamanlayıcıda devre dışı; sonraki istekler diğer hesaplara gider
+                        self.scheduler.disable(index)
+                        raise
+        return client
+
+    @property
+    def openai_client(self):
+        with self._clients_lock:
+            if self._openai_client is None:
+                self._openai_client = self.openai_client_factory()
+            return self._openai_client
+
+    @property
+    def generation_engine(self):
+        client = self.openai_client
+        with self._clients_lock:
+            if self._generation_engine is None:
+                self._generation_engine = GenerationEngine(
+                    client,
+                    self.config.openai_model,
+                    max_in_flight=self.config.generation_concurrency,
+                    tokens_per_minute=self.config.generation_tokens_per_minute,
+                    stream=self.config.stream_generation,
+                    retries=self.config.generation_retries,
+                    max_tokens=self.config.completion_max_tokens,
+                    resilience=self.resilience
+                )
+            return self._generation_engine
+
+    def call_twitter(self, endpoint, pick_account, request, refund=None, idempotent=True, max_attempts=None):
+        """Call a Twitter endpoint with retries; pick_account() chooses the account once per request.
+
+        Retries reuse the chosen account, so its quota is charged once; it is
+        only replaced when it is rate limited, and refund(index) then gives
+        back what the refused request was charged. With max_attempts=1 the
+        request is sent exactly once. Returns (account index, response).
+        """
+        index = None
+
+        def attempt():
+            nonlocal index
+            if index is None:
+                index = pick_account()
+            while True:
+                try:
+                    with metrics.timer('twitter_bot_api_call', endpoint=endpoint):
+                        return index, request(self.twitter_client(index))
+                except tweepy.TooManyRequests as e:
+                    # Pencere sıfırlanana kadar bu hesap dinlenir; uygun başka hesap varsa hemen onunla dene
+                    self.scheduler.pause(index, endpoint, retry_after(e) or self.config.retry_max_wait)
+                    if max_attempts == 1:
+                        raise
+                    try:
+                        replacement = pick_account()
+                    except QuotaExhaustedError:
+                        raise e from None
+                    if refund is not None:
+                        refund(index)
+                    index = replacement
+                    metrics.inc('twitter_bot_account_rotations_total', endpoint=endpoint)
+
+        return self.resilience.call(endpoint, attempt, idempotent=idempotent, max_attempts=max_attempts)
+
+    def fetch_trend_names(self, woeid):
+        """Fetch trend names for a WOEID, served from cache when fresh"""
+        def fetch():
+            _, trends = self.call_twitter(
+                'get_trends',
+                lambda: self.scheduler.acquire_reader('get_trends'),
+                lambda client: client.get_trends(id=woeid),
+                refund=self.scheduler.refund_views
+            )
+            names = [trend.name for trend in trends.data]
+            metrics.observe('twitter_bot_payload_bytes', len(json.dumps(names)), endpoint='get_trends')
+            return names
+
+        return self.cache.get_or_fetch('get_trends', {'id': woeid}, fetch)
+
+    def search_trend(self, trend_name, rank=MISSING):
+        """Search tweets newer than the trend's since_id as a TweetBatch, served from cache when fresh"""
+        cache_params = {
+            'query': trend_name,
+            'max_results': 10,
+            'tweet_fields': ['author_id', 'created_at', 'text', 'public_metrics']
+        }
+        params = dict(cache_params)
+        since_id = self.seen.since_id(trend_name)
+        if since_id is not None:
+            params['since_id'] = since_id
+
+        def fetch():
+            logging.info(f"'{trend_name}' trendi için tweetler aranıyor")
+            # Okuma yükü kotası en fazla kalan hesaba verilir
+            _, tweets = self.call_twitter(
+                'search_recent_tweets',
+                lambda: self.scheduler.acquire_reader('search_recent_tweets'),
+                lambda client: client.search_recent_tweets(**params),
+                refund=self.scheduler.refund_views
+            )
+            payloads = [tweet.data for tweet in tweets.data or []]
+            metrics.observe(
+                'twitter_bot_payload_bytes', len(json.dumps(payloads)), endpoint='search_recent_tweets'
+            )
+            # Önbellekte ham tweet sözlükleri yerine sütunlar tutulur
+            return TweetBatch.from_payloads(payloads).to_columns()
+
+        try:
+            # since_id her döngü ilerler; anahtara girseydi önbellek hiç isabet etmezdi
+            columns, hit = self.cache.get_or_fetch('search_recent_tweets', cache_params, fetch)
+        except Exception as e:
+            # Tek bir trendin hatası döngünün geri kalanını etkilemez
+            logging.warning(f"'{trend_name}' trendi atlandı: {str(e)}")
+            return TweetBatch()
+        if isinstance(columns, list):
+            # Önceki sürümün disk önbelleğindeki ham tweet listesi
+            tweets = TweetBatch.from_payloads(columns, rank)
+        else:
+            tweets = TweetBatch.from_columns(columns, rank)
+        if hit and since_id is not None:
+            # Önbellekteki sonuç daha eski bir since_id ile alınmış olabilir
+            tweets = tweets.select([index for index, tweet_id in enumerate(tweets.ids) if tweet_id > since_id])
+        self.seen.update_since_id(trend_name, tweets)
+        return tweets
+
+    def fetch_region(self, woeid):
+        """Fetch one region's trend names; a failing region only drops itself"""
+        try:
+            trend_names, _ = self.fetch_trend_names(woeid)
+            return woeid, trend_names
+        except Exception as e:
+            logging.warning(f"{woeid} bölgesinin trendleri alınamadı: {str(e)}")
+            return woeid, []
+
+    def get_trending_tweets(self):
+        """Fetch tweets for the merged trends of all configured regions"""
+        try:
+            regions = self.config.trend_regions
+            logging.info(f"{len(regions)} bölgenin trendleri alınıyor...")
+            
+            # Bölge trendleri paralel alınır, aynı trend tek sefer aransın diye birleştirilir
+            workers = max(1, min(self.config.fetch_concurrency, len(regions)))
+            with metrics.timer('twitter_bot_stage', stage='fetch_trends'), \
+                    ThreadPoolExecutor(max_workers=workers) as executor:
+                region_trends = list(executor.map(self.fetch_region, regions))
+            candidates = merge_trends(region_trends, self.config.trends_per_region)
+            metrics.inc('twitter_bot_trends_fetched_total', sum(
+                min(len(names), self.config.trends_per_region) for _, names in region_trends
+            ))
+            metrics.inc('twitter_bot_trends_unique_total', len(candidates))
+            
+            # API sırası yerine hızlanan/yeni trendler seçilir; bölge ağırlığı hacim gözlemi olarak kaydedilir
+            with metrics.timer('twitter_bot_stage', stage='score'):
+                self.trend_scorer.observe(
+                    [trend.key for trend in candidates], [trend.weight for trend in candidates]
+                )
+                self.trends = self.trend_scorer.top(candidates, self.config.max_trends)
+            metrics.set_gauge('twitter_bot_trends_tracked', len(self.trend_scorer))
+            
+            # Trend aramalarını paralel yap; map() sonuçları trend sırasıyla döndürür
+            batches = []
+            workers = max(1, min(self.config.fetch_concurrency, len(self.trends)))
+            with metrics.timer('twitter_bot_stage', stage='search'), \
+                    ThreadPoolExecutor(max_workers=workers) as executor:
+                searches = executor.map(
+                    self.search_trend, [trend.name for trend in self.trends], range(len(self.trends))
+                )
+                for rank, tweets in enumerate(searches):
+                    batches.append(tweets)
+                    self.trend_snapshot.observe(
+                        self.trends[rank].key, [(tweet.id, engagement(tweet), tweet.text) for tweet in tweets]
+                    )
+                    self.trend_scorer.observe_tweet_times(self.trends[rank].key, [
+                        timestamp for timestamp in tweets.timestamps if timestamp != MISSING
+                    ])
+            all_tweets = TweetBatch.concat(batches)
+            del batches
+            
+            # Daha önce analiz edilmiş tweetleri ele; birden çok trendde çıkan tweet ilk (en üst) trendinde kalır
+            collected = len(all_tweets)
+            all_tweets = self.seen.filter_new(all_tweets)
+            metrics.set_gauge('twitter_bot_tweet_batch_bytes', all_tweets.nbytes())
+            self.archive_cycle(all_tweets)
+            
+            metrics.inc('twitter_bot_tweets_collected_total', collected)
+            metrics.inc('twitter_bot_tweets_new_total', len(all_tweets))
+            
+            logging.info(
+                f"{len(self.trends)} benzersiz trendden toplam {collected} tweet toplandı, "
+                f"{len(all_tweets)} tanesi yeni "
+                f"(önbellek: {self.cache.stats()})"
+            )
+            return all_tweets
+            
+        except Exception as e:
+            logging.error(f"Tweet çekerken hata: {str(e)}", exc_info=True)
+            return None
+
+    def archive_cycle(self, tweets):
+        """Append this cycle's new tweets and searched trends to the local archive"""
+        if self.archive is None:
+            return
+        try:
+            with metrics.timer('twitter_bot_stage', stage='archive'):
+                written = self.archive.append(
+                    tweets.payloads(),
+                    {tweet.id: self.trends[tweet.rank].key for tweet in tweets},
+                    self.trends
+                )
+            metrics.inc('twitter_bot_archive_tweets_total', written)
+        except Exception as e:
+            # Arşiv hatası döngüyü durdurmaz
+            logging.warning(f"Tweetler arşivlenemedi: {str(e)}")
+
+    def with_history(self, tweets):
+        """Add archived tweets of this cycle's trends as extra prompt context"""
+        if self.archive is None or not self.config.archive_context_hours:
+            return tweets
+        present = set(tweets.ids)
+        # Bu döngünün tweetleri zaten arşivde; en yeniler onlar olduğundan limit onlar kadar artırılır
+        current = Counter(tweets.ranks)
+        history = []
+        for rank, trend in enumerate(self.trends):
+            try:
+                payloads = self.archive.recent(
+                    trend.key, self.config.archive_context_hours,
+                    limit=self.config.archive_context_tweets + current[rank]
+                )
+            except Exception as e:
+                logging.warning(f"'{trend.name}' trendinin arşivi okunamadı: {str(e)}")
+                continue
+            fresh = []
+            for payload in payloads:
+                tweet_id = int(payload['id'])
+                if tweet_id not in present:
+                    present.add(tweet_id)
+                    fresh.append(payload)
+            history.append(TweetBatch.from_payloads(fresh, rank))
+        added = sum(len(batch) for batch in history)
+        if added:
+            metrics.inc('twitter_bot_archive_context_tweets_total', added)
+            logging.info(f"Arşivden {added} eski tweet bağlam olarak eklendi")
+        return TweetBatch.concat([tweets] + history)
+
+    def build_prompt(self, tweet_content, trend_name=None, persona=None):
+        """GPT prompt for the trend snapshot in a persona's voice, optionally focused on a single trend"""
+        persona = persona or self.personas[0]
+        subject = f"the trend {trend_name}" if trend_name else "the following trends"
+        return f"""
+            You are a Twitter bot named {persona.bot_name}.
+            Personality: {persona.bot_personality}
+            
+            Create a witty comment about {subject}.
+            Language: {persona.bot_language}
+            Maximum 280 characters.
+            
+            Trends:
+            {tweet_content}
+            """
+
+    def completion_profile(self, persona):
+        """Everything besides the trend snapshot that shapes a persona's completion"""
+        return (persona.name, persona.bot_name, persona.bot_personality, persona.bot_language, self.config.openai_model)
+
+    def analyze_and_respond(self, tweets):
+        """Analyze tweets once and generate a response per persona; returns {persona name: response}"""
+        try:
+            with metrics.timer('twitter_bot_stage', stage='prompt'):
+                tweet_content, stats = build_tweet_content(tweets, self.config.prompt_token_budget)
+            logging.info(
+                f"Prompt built from {stats.used_tweets}/{stats.unique_tweets} unique tweets "
+                f"({stats.input_tweets} collected), ~{stats.prompt_tokens} tokens, "
+                f"~{stats.saved_tokens} tokens saved"
+            )
+        except Exception as e:
+            logging.error(f"Error during GPT analysis: {str(e)}", exc_info=True)
+            return {}
+        
+        # Aynı tweet özeti tüm personalara verilir; yanıtlar paralel üretilir
+        workers = max(1, min(self.config.generation_concurrency, len(self.personas)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = executor.map(partial(self.respond_as, tweet_content=tweet_content), self.personas)
+            return {persona.name: response for persona, response in zip(self.personas, responses)}
+
+    def respond_as(self, persona, tweet_content):
+        """Generate one persona's response to the tweet snapshot"""
+        try:
+            # Anahtar yeni tweetlerin özeti değil, trendlerin kararlı anlık görüntüsüdür
+            cache_args = (
+                self.trend_snapshot.content([trend.key for trend in self.trends]),
+                self.completion_profile(persona)
+            )
+            cached_response = self.completion_cache.get(*cache_args)
+            if cached_response is not None:
+                logging.info(
+                    f"[{persona.name}] Trend snapshot unchanged, reusing cached GPT response "
+                    f"({self.completion_cache.stats()})"
+                )
+                return cached_response
+            
+            logging.info(f"[{persona.name}] Starting GPT analysis")
+            
+            prompt = self.build_prompt(tweet_content, persona=persona)
+            
+            metrics.observe('twitter_bot_payload_bytes', len(prompt.encode('utf-8')), endpoint='chat.completions')
+            with metrics.timer('twitter_bot_stage', stage='analysis'), \
+                    metrics.timer('twitter_bot_api_call', endpoint='chat.completions'):
+                result = self.resilience.call('chat.completions', lambda: generate_tweet(
+                    self.openai_client,
+                    self.config.openai_model,
+                    prompt,
+                    stream=self.config.stream_generation,
+                    retries=self.config.generation_retries,
+                    max_tokens=self.config.completion_max_tokens
+                ))
+            
+            generated_response = result.text
+            if not generated_response:
+                logging.warning(f"[{persona.name}] GPT returned an empty response")
+                return None
+            if result.trimmed or result.attempts > 1:
+                logging.info(
+                    f"[{persona.name}] GPT response fitted to {TWEET_MAX_CHARS} characters "
+                    f"(attempts: {result.attempts}, trimmed: {result.trimmed})"
+                )
+            self.completion_cache.put(*cache_args, generated_response)
+            logging.info(f"[{persona.name}] GPT response generated: {generated_response}")
+            return generated_response
+        except Exception as e:
+            logging.error(f"[{persona.name}] Error during GPT analysis: {str(e)}", exc_info=True)
+            return None
+
+    def generate_per_trend(self, tweets):
+        """Generate candidates for each trend and persona concurrently; returns {persona name: best candidate}"""
+        try:
+            groups = {}
+            for index, rank in enumerate(tweets.ranks):
+                groups.setdefault(max(rank, 0), []).append(index)
+            
+            candidates = {persona.name: [] for persona in self.personas}
+            prompts = []
+            with metrics.timer('twitter_bot_stage', stage='prompt'):
+                for rank, indices in sorted(groups.items()):
+                    trend = self.trends[rank] if rank < len(self.trends) else None
+                    name = trend.name if trend else None
+                    # Trend özeti bir kez çıkarılır, her persona kendi prompt'unu alır
+                    content, _ = build_tweet_content(tweets.select(indices), self.config.trend_prompt_token_budget)
+                    snapshot = self.trend_snapshot.content([trend.key]) if trend else content
+                    for persona in self.personas:
+                        cache_args = (
+                            snapshot,
+                            self.completion_profile(persona)
+                        )
+                        cached_response = self.completion_cache.get(*cache_args)
+                        if cached_response is not None:
+                            candidates[persona.name].append(
+                                Candidate(name, cached_response, trend.score if trend else 0.0)
+                            )
+                            continue
+                        for _ in range(self.config.candidates_per_trend):
+                            prompts.append(((persona, trend, cache_args), self.build_prompt(content, name, persona)))
+            
+            logging.info(
+                f"Generating {len(prompts)} candidates for {len(groups)} trends and {len(self.personas)} personas "
+                f"({sum(map(len, candidates.values()))} served from cache)"
+            )
+            with metrics.timer('twitter_bot_stage', stage='analysis'):
+                results = self.generation_engine.generate_many(prompts)
+            for (persona, trend, cache_args), result in results:
+                if result is None or not result.text:
+                    continue
+                self.completion_cache.put(*cache_args, result.text)
+                candidates[persona.name].append(Candidate(
+                    trend.name if trend else None, result.text, trend.score if trend else 0.0, result.trimmed
+                ))
+            
+            responses = {}
+            for persona in self.personas:
+                found = candidates[persona.name]
+                metrics.inc('twitter_bot_generation_candidates_total', len(found))
+                best = select_candidate(found, self.recent_posts)
+                if best is None:
+                    logging.warning(f"[{persona.name}] No usable candidate was generated")
+                    continue
+                logging.info(f"[{persona.name}] Selected candidate for '{best.key}' out of {len(found)}: {best.text}")
+                responses[persona.name] = best.text
+            return responses
+        except Exception as e:
+            logging.error(f"Error during per-trend generation: {str(e)}", exc_info=True)
+            return {}
+
+    def prepare_post(self, response):
+        """Tweet text for a generated response, or None if it was already posted"""
+        if tweet_length(response) > TWEET_MAX_CHARS:
+            # Önbellekten gelen eski yanıtlar da sınırı aşmamalı
+            response = trim_to_words(response)
+        if response in self.recent_posts:
+            logging.info("Response was already posted, skipping duplicate tweet")
+            return None
+        return response
+
+    def send_tweet(self, text, persona=None, max_attempts=None):
+        """Post text from one of the persona's posting accounts and record it; returns (account index, tweet id)"""
+        persona = persona or self.personas[0]
+        metrics.observe('twitter_bot_payload_bytes', len(text.encode('utf-8')), endpoint='create_tweet')
+        with metrics.timer('twitter_bot_stage', stage='post'):
+            index, result = self.call_twitter(
+                'create_tweet',
+                lambda: self.scheduler.acquire_poster(accounts=persona.account_indexes),
+                lambda client: client.create_tweet(text=text),
+                idempotent=False,
+                max_attempts=max_attempts
+            )
+        self.scheduler.charge_tweet(index)
+        self.recent_posts.append(text)
+        if self.store is not None:
+            self.store.record_post(text, self.scheduler.account_key(index))
+        logging.info(f"[{persona.name}] Tweet successfully posted: {text}")
+        data = getattr(result, 'data', None) or {}
+        return index, data.get('id')
+
+    def post_tweet(self, response, persona=None):
+        """Post the generated response as a tweet from one of the persona's posting accounts"""
+        response = self.prepare_post(response)
+        if response is None:
+            return
+        
+        try:
+            self.send_tweet(response, persona)
+        except QuotaExhaustedError:
+            logging.error("Tweet limit reached for all posting accounts")
+        except Exception as e:
+            if is_duplicate_post(e):
+                self.recent_posts.append(response)
+                logging.info(f"Tweet was already posted: {response}")
+                return
+            logging.error(f"Error while posting tweet: {str(e)}", exc_info=True)
+
+    def enqueue_tweet(self, response, persona=None):
+        """Queue the generated response in the outbox for the poster"""
+        persona = persona or self.personas[0]
+        response = self.prepare_post(response)
+        if response is None:
+            return
+        try:
+            if self.outbox.enqueue(response, persona.name):
+                metrics.inc('twitter_bot_outbox_enqueued_total', persona=persona.name)
+                logging.info(f"[{persona.name}] Tweet queued for posting: {response}")
+            else:
+                logging.info(f"[{persona.name}] Response is already in the outbox, skipping duplicate tweet")
+        except Exception as e:
+            # Kuyruğa yazılamazsa üretilen yanıt kaybolmasın
+            logging.error(f"Could not queue tweet, posting it now: {str(e)}")
+            self.post_tweet(response, persona)
+
+    def deliver(self, responses):
+        """Queue or post each persona's response; personas post from their own accounts in parallel"""
+        personas = [persona for persona in self.personas if responses.get(persona.name)]
+        if not personas:
+            return
+        deliver = self.enqueue_tweet if self.outbox is not None else self.post_tweet
+        with ThreadPoolExecutor(max_workers=len(personas)) as executor:
+            list(executor.map(lambda persona: deliver(responses[persona.name], persona), personas))
+
+    def post_spacing(self, budget, pending, now):
+        """Seconds until the next post: spread over the cycle, never faster than the daily budget allows"""
+        midnight = datetime.fromtimestamp(now, timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        budget_spacing = (midnight.timestamp() - now) / budget if budget > 0 else 0
+        spread_spacing = 0
+        if pending and self.cycle_started_at is not None:
+            # Kuyruk bir sonraki döngüye kadar eşit aralıklarla boşaltılır
+            next_cycle = self.cycle_started_at + self.config.check_interval_hours * 3600
+            spread_spacing = max(next_cycle - now, 0) / (pending + 1)
+        return max(self.config.outbox_min_spacing, budget_spacing, spread_spacing)
+
+    def drain_outbox(self):
+        """Poster job: post each persona's next due outbox entry once its pacing allows it"""
+        now = time.time()
+        for persona in self.personas:
+            # Sadece bu botun personalarının kuyruğu; aynı outbox'taki diğer personalara dokunulmaz
+            expired = self.outbox.expire(self.config.outbox_max_age_hours * 3600, persona.name, now)
+            if expired:
+                metrics.inc('twitter_bot_outbox_expired_total', expired, persona=persona.name)
+                logging.warning(f"[{persona.name}] {expired} queued tweets expired before they could be posted")
+        metrics.set_gauge('twitter_bot_outbox_pending', self.outbox.pending())
+        for persona in self.personas:
+            if now >= self.next_post_at.get(persona.name, 0.0):
+                self.post_next(persona, now)
+
+    def post_next(self, persona, now):
+        """Post the persona's oldest due outbox entry within its accounts' budget"""
+        budget = self.scheduler.posting_budget(persona.account_indexes)
+        if budget <= 0:
+            pending = self.outbox.pending(persona.name)
+            # Her turda değil, bütçe tükendiğinde bir kez uyarılır
+            if persona.name not in self.starved_personas and pending:
+                self.starved_personas.add(persona.name)
+                logging.warning(
+                    f"[{persona.name}] No posting budget left on its accounts "
+                    f"({', '.join(str(n) for n in persona.accounts) or 'all posting accounts'}); "
+                    f"{pending} queued tweets are waiting"
+                )
+            return
+        self.starved_personas.discard(persona.name)
+        entry = self.outbox.claim(persona.name, now)
+        if entry is None:
+            return
+        
+        try:
+            # Tek deneme: yeniden denemeleri ve beklemeyi handle_post_failure üstlenir, paylaşımcı bloklanmaz
+            index, tweet_id = self.send_tweet(entry.text, persona, max_attempts=1)
+        except Exception as e:
+            self.handle_post_failure(entry, e, now)
+            return
+        self.outbox.mark_posted(entry.id, self.scheduler.account_key(index), tweet_id)
+        now = time.time()
+        metrics.inc('twitter_bot_outbox_posted_total', persona=persona.name)
+        metrics.observe('twitter_bot_outbox_wait_seconds', now - entry.created_at)
+        self.next_post_at[persona.name] = now + self.post_spacing(
+            budget - 1, self.outbox.pending(persona.name), now
+        )
+
+    def handle_post_failure(self, entry, error, now):
+        """Retry, give up on or settle an outbox entry whose post failed"""
+        message = str(error)
+        if isinstance(error, QuotaExhaustedError):
+            # Denenmedi: hesaplar müsait olunca tekrar sıraya girer
+            self.outbox.release(entry.id, now + self.config.outbox_poll_seconds)
+            return
+        if is_duplicate_post(error):
+            # Önceki deneme aslında paylaşılmış (örn. yanıt gelmeden bağlantı koptu); tekrar gönderilmez
+            self.outbox.mark_posted(entry.id)
+            self.recent_posts.append(entry.text)
+            metrics.inc('twitter_bot_outbox_duplicates_total')
+            logging.info(f"Queued tweet was already posted: {entry.text}")
+            return
+        retryable = isinstance(error, CircuitOpenError) or is_retryable(error)
+        if retryable and entry.attempts < self.config.outbox_max_attempts:
+            delay = retry_after(error) or self.config.outbox_retry_delay * 2 ** (entry.attempts - 1)
+            self.outbox.retry(entry.id, message, now + delay)
+            metrics.inc('twitter_bot_outbox_retries_total')
+            logging.warning(f"Posting failed, retrying in {delay:.0f}s (attempt {entry.attempts}): {message}")
+            return
+        self.outbox.fail(entry.id, message)
+        metrics.inc('twitter_bot_outbox_failed_total')
+        logging.error(f"Giving up on queued tweet after {entry.attempts} attempts: {message}")
+
+    def run_bot(self):
+        """Main bot function"""
+        try:
+            logging.info("Bot operation started")
+            
+            self.cycle_started_at = time.time()
+            with metrics.timer('twitter_bot_cycle'):
+                tweets = self.get_trending_tweets()
+                
+                if tweets:
+                    tweets = self.with_history(tweets)
+                    if self.config.generation_mode == 'per_trend':
+                        responses = self.generate_per_trend(tweets)
+                    else:
+                        responses = self.analyze_and_respond(tweets)
+                    self.deliver(responses)
+            self.update_cache_gauges()
+            self.last_run = datetime.now().isoformat()
+            if self.store is not None:
+                self.store.set_value('last_run', self.last_run)
+                self.store.prune()
+            if self.archive is not None:
+                self.archive.compact()
+            if self.outbox is not None:
+                self.outbox.prune()
+            logging.info("Bot operation completed")
+        except Exception as e:
+            logging.error(f"Unexpected error during bot operation: {str(e)}", exc_info=True)
+
+    def update_cache_gauges(self):
+        """Publish cache hit/miss counts, account quotas and connection pool usage as gauges"""
+        for cache_name, stats in (('response', self.cache.stats()), ('completion', self.completion_cache.stats())):
+            for key, value in stats.items():
+                metrics.set_gauge(f'twitter_bot_{cache_name}_cache_{key}', value)
+        for account in self.scheduler.stats():
+            for key in ('remaining_views', 'remaining_tweets'):
+                metrics.set_gauge(
+                    f'twitter_bot_account_{key}', account[key], account=account['account'], role=account['role']
+                )
+        if self.archive is not None:
+            for key, value in self.archive.stats().items():
+                metrics.set_gauge(f'twitter_bot_archive_{key}', value)
+        if self.outbox is not None:
+            for status, count in self.outbox.stats().items():
+                metrics.set_gauge('twitter_bot_outbox_entries', count, status=status)
+        for pool, stats in self.transport.stats().items():
+            for key in ('requests', 'connections_opened', 'reuse_ratio', 'peak_in_flight'):
+                metrics.set_gauge(f'twitter_bot_http_{key}', stats[key], pool=pool)
+
+    def close(self):
+        """Release pooled connections"""
+        self.transport.close()
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from twitter_bot.metrics import metrics
+
+# Endpoint bazlı varsayılan önbellek süreleri (saniye)
+DEFAULT_TTLS = {
+    'get_trends': 15 * 60,
+    'search_recent_tweets': 5 * 60,
+}
+
+
+class MemoryBackend:
+    """In-memory LRU store for cached responses"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, expires_at, value):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    """SQLite backed LRU store so cached responses survive restarts"""
+
+    def __init__(self, path, max_entries=1024):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, expires_at REAL, accessed_at REAL, value TEXT)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            return row[0], json.loads(row[1])
+
+    def set(self, key, expires_at, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, expires_at, time.time(), json.dumps(value))
+            )
+            # En uzun süredir kullanılmayan kayıtları sil
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE key NOT IN ("
+                "SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """TTL cache in front of Twitter client calls.
+
+    Values must be JSON serializable so that every backend can store them.
+    """
+
+    def __init__(self, backend=None, ttls=None, max_stale=6 * 3600):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_stale = max_stale
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the cache described by the bot configuration"""
+        if config.cache_backend == 'disk':
+            backend = DiskBackend(config.cache_path, max_entries=config.cache_max_entries)
+        else:
+            backend = MemoryBackend(max_entries=config.cache_max_entries)
+        return cls(backend, ttls={
+            'get_trends': config.trends_cache_ttl,
+            'search_recent_tweets': config.search_cache_ttl,
+        }, max_stale=config.cache_max_stale)
+
+    @staticmethod
+    def make_key(endpoint, params):
+        return f"{endpoint}:{json.dumps(params, sort_keys=True)}"
+
+    def get_or_fetch(self, endpoint, params, fetch):
+        """Return (value, hit); fetch() is only called on a miss or expired entry.
+
+        Expired entries stay in the backend until evicted, so when fetch()
+        fails an entry expired less than ``max_stale`` seconds ago is served
+        instead of the error.
+        """
+        key = self.make_key(endpoint, params)
+        entry = self.backend.get(key)
+        now = time.time()
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                with self._lock:
+                    self.hits += 1
+                return value, True
+            if expires_at + self.max_stale <= now:
+                self.backend.delete(key)
+                entry = None
+
+        with self._lock:
+            self.misses += 1
+        try:
+            value = fetch()
+        except Exception as e:
+            if entry is None:
+                raise
+            with self._lock:
+                self.stale_hits += 1
+            metrics.inc('twitter_bot_cache_fallbacks_total', endpoint=endpoint)
+            logging.warning(f"{endpoint} alınamadı ({str(e)}), önbellekteki eski yanıt kullanılıyor")
+            return entry[1], True
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl > 0:
+            self.backend.set(key, time.time() + ttl, value)
+        return value, False
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stale_hits": self.stale_hits, "entries": len(self.backend)}
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from twitter_bot.prompt import normalize_text
+
+
+def snapshot_features(content):
+    """Hash each normalized line of a trend/tweet snapshot into a feature set"""
+    features = set()
+    for line in content.splitlines():
+        line = normalize_text(line)
+        if line:
+            digest = hashlib.blake2b(line.encode('utf-8'), digest_size=8).digest()
+            features.add(int.from_bytes(digest, 'big'))
+    return frozenset(features)
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class TrendSnapshot:
+    """Stable description of the trends a completion was generated for.
+
+    Tweets are fetched incrementally (only those newer than each trend's
+    since_id), so the prompt of two cycles differs even when the trends did
+    not change. The snapshot instead lists the trend keys together with each
+    trend's ``sample_size`` most engaging tweets seen so far; it only
+    changes when the trends or their top tweets change.
+    """
+
+    def __init__(self, sample_size=5, max_trends=1000):
+        self.sample_size = sample_size
+        self.max_trends = max_trends
+        self._samples = OrderedDict()  # trend key -> [(engagement, tweet id, text)], en yüksekten
+        self._lock = threading.Lock()
+
+    def observe(self, trend_key, tweets):
+        """Merge newly fetched (tweet id, engagement, text) tuples into the trend's top sample"""
+        with self._lock:
+            sample = {tweet_id: (score, tweet_id, text) for score, tweet_id, text in self._samples.get(trend_key, [])}
+            for tweet_id, score, text in tweets:
+                sample.setdefault(int(tweet_id), (score, int(tweet_id), text))
+            # Eşit etkileşimde eski tweet kalır; örnek döngüden döngüye kararlı olur
+            top = sorted(sample.values(), key=lambda item: (-item[0], item[1]))[:self.sample_size]
+            self._samples[trend_key] = top
+            self._samples.move_to_end(trend_key)
+            while len(self._samples) > self.max_trends:
+                self._samples.popitem(last=False)
+
+    def content(self, trend_keys):
+        """Snapshot text of the given trends, one line per trend and per sampled tweet"""
+        lines = []
+        with self._lock:
+            for trend_key in trend_keys:
+                lines.append(f"trend: {trend_key}")
+                lines.extend(text for _, _, text in self._samples.get(trend_key, []))
+        return '\n'.join(lines)
+
+
+class CompletionCache:
+    """Bounded TTL cache of GPT completions keyed on a trend snapshot.
+
+    Entries only match when the profile (personality, language, model...)
+    is identical and the snapshot's Jaccard similarity reaches
+    ``similarity_threshold``.
+    """
+
+    def __init__(self, ttl=3600, max_entries=128, similarity_threshold=0.8):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (profile, features) -> (expires_at, completion)
+        self._lock = threading.Lock()
+
+    def get(self, content, profile):
+        """Return a cached completion for a similar snapshot with the same profile tuple, or None"""
+        features = snapshot_features(content)
+        profile = tuple(profile)
+        now = time.time()
+        with self._lock:
+            best_key, best_score = None, 0.0
+            for key, (expires_at, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                if key[0] != profile:
+                    continue
+                score = 1.0 if key[1] == features else jaccard(key[1], features)
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+
+    def put(self, content, profile, completion):
+        key = (tuple(profile), snapshot_features(content))
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, completion)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -1,7 +1,9 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
+from twitter_bot.accounts import POST_ROLES
+
 @dataclass
 class TwitterAccount:
     bearer_token: str
@@ -13,54 +15,193 @@ class TwitterAccount:
     daily_view_limit: int = 100
     remaining_tweets: int = 500
     remaining_views: int = 100
+    role: str = 'both'  # 'read', 'post' veya 'both'
+
+@dataclass
+class Persona:
+    name: str
+    bot_name: str
+    bot_personality: str
+    bot_language: str
+    accounts: List[int] = field(default_factory=list)  # Paylaşım yapacağı hesap numaraları (TWITTERn); boşsa tüm paylaşım hesapları
+
+    @property
+    def account_indexes(self):
+        """Scheduler indexes of the persona's posting accounts, None for any posting account"""
+        return {number - 1 for number in self.accounts} or None
 
 @dataclass
 class Config:
     accounts: List[TwitterAccount]
-    current_account_index: int = 0
     bot_name: str
     bot_personality: str
     bot_language: str
+    personas: List[Persona] = field(default_factory=list)  # Boşsa BOT_* ayarlarından tek persona
     check_interval_hours: int = 3
+    schedule_jitter: float = 0.0  # Her çalıştırmaya eklenen rastgele gecikme (saniye)
+    fetch_concurrency: int = 8  # Aynı anda yapılacak trend araması sayısı
+    trend_regions: List[str] = field(default_factory=lambda: ['23424977'])  # Trendleri alınacak WOEID'ler
+    trends_per_region: int = 50  # Skorlamaya aday olarak alınan bölge başına trend
+    max_trends: int = 5  # Skora göre seçilip aranacak trend sayısı (top K)
+    trend_score_window: int = 12  # Trend başına tutulan gözlem sayısı
+    trend_score_capacity: int = 5000  # Takip edilen en fazla trend
+    cache_backend: str = 'memory'  # 'memory' veya 'disk'
+    cache_path: str = 'cache/responses.db'
+    cache_max_entries: int = 1024
+    trends_cache_ttl: int = 900
+    search_cache_ttl: int = 300
+    seen_index_size: int = 50000  # Hafızada tutulacak en fazla tweet id'si
+    prompt_token_budget: int = 1500  # GPT prompt'undaki tweetler için token sınırı
+    openai_model: str = 'gpt-4'
+    stream_generation: bool = True  # Yanıt akış halinde alınır, 280 karakter aşılınca kesilir
+    generation_retries: int = 1  # Çok uzun yanıt için yeniden deneme sayısı
+    completion_max_tokens: int = 200
+    generation_mode: str = 'single'  # 'single': tek istek, 'per_trend': trend başına aday üret ve en iyisini seç
+    generation_concurrency: int = 4  # Aynı anda çalışan en fazla GPT isteği
+    generation_tokens_per_minute: int = 40000
+    candidates_per_trend: int = 1
+    trend_prompt_token_budget: int = 500
+    completion_cache_ttl: int = 3600
+    completion_cache_size: int = 128
+    completion_similarity: float = 0.8  # Önbellekteki yanıtı kullanmak için gereken benzerlik
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 1.0  # Üstel geri çekilmenin başlangıç süresi (saniye)
+    retry_max_delay: float = 30.0
+    retry_max_wait: float = 60.0  # Rate limit sıfırlanması bundan uzaksa beklenmez
+    breaker_failure_threshold: int = 5  # Devre kesicinin açılması için art arda hata sayısı
+    breaker_reset_timeout: int = 60
+    cache_max_stale: int = 6 * 3600  # Hata durumunda kullanılabilecek süresi dolmuş önbellek yaşı
+    http_pool_connections: int = 10  # Bağlantı havuzu tutulan farklı host sayısı
+    http_pool_maxsize: int = 16  # Host başına en fazla bağlantı
+    http_pool_block: bool = True  # Havuz doluysa yeni bağlantı açmak yerine boşalmasını bekle
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 60.0
+    http_keepalive_expiry: float = 30.0  # Boştaki bağlantının açık tutulma süresi (OpenAI)
+    archive_path: str = None  # Yerel tweet arşivi dizini; None ise arşiv kapalı (ARCHIVE_PATH boş verilerek)
+    archive_retention_days: int = 30
+    archive_segment_mb: int = 64
+    archive_context_hours: float = 0  # >0 ise trendlerin bu kadar saatlik arşivi prompt'a bağlam olarak eklenir
+    archive_context_tweets: int = 10  # Trend başına eklenecek en fazla arşiv tweeti
+    outbox_path: str = None  # Kalıcı paylaşım kuyruğu; boşsa tweet üretildiği döngüde paylaşılır
+    outbox_poll_seconds: float = 30.0  # Paylaşımcının kuyruğu kontrol aralığı
+    outbox_min_spacing: float = 60.0  # İki paylaşım arasındaki en kısa süre (saniye)
+    outbox_max_attempts: int = 5
+    outbox_retry_delay: float = 60.0  # Başarısız paylaşımın tekrar denenmesi için başlangıç bekleme süresi
+    outbox_max_age_hours: float = 6.0  # Bundan uzun bekleyen tweet artık güncel sayılmaz, paylaşılmaz
+    state_path: str = None  # Kalıcı durum veritabanı; boşsa durum sadece bellekte tutulur
+
+    def persona_profiles(self):
+        """Personas served by this bot; the BOT_* settings are the only one when none are configured"""
+        return self.personas or [Persona('default', self.bot_name, self.bot_personality, self.bot_language)]
+
+    @staticmethod
+    def personas_from_env(accounts):
+        """Personas listed in PERSONAS, each configured with PERSONA_<NAME>_* variables"""
+        personas = []
+        for name in [name.strip() for name in os.getenv('PERSONAS', '').split(',') if name.strip()]:
+            prefix = f"PERSONA_{name.upper()}_"
+            numbers = [int(number) for number in os.getenv(f'{prefix}ACCOUNTS', '').split(',') if number.strip()]
+            for number in numbers:
+                if not 1 <= number <= len(accounts):
+                    raise ValueError(f"Persona {name}: account {number} is not configured (TWITTER{number}_*)")
+                # Sadece okuyan bir hesapla persona hiç paylaşım yapamaz, kuyruğu sessizce dolardı
+                if accounts[number - 1].role not in POST_ROLES:
+                    raise ValueError(
+                        f"Persona {name}: account {number} cannot post "
+                        f"(TWITTER{number}_ROLE is '{accounts[number - 1].role}', set it to 'post' or 'both')"
+                    )
+            personas.append(Persona(
+                name=name,
+                bot_name=os.getenv(f'{prefix}BOT_NAME', os.getenv('BOT_NAME')),
+                bot_personality=os.getenv(f'{prefix}PERSONALITY', os.getenv('BOT_PERSONALITY')),
+                bot_language=os.getenv(f'{prefix}LANGUAGE', os.getenv('BOT_LANGUAGE')),
+                accounts=numbers
+            ))
+        return personas
 
     @classmethod
     def from_env(cls, env_file='.env'):
         accounts = []
-        for i in range(1, 3):  # 2 hesap için
+        i = 1
+        # TWITTER1_, TWITTER2_, ... tanımlı olduğu sürece hesap ekle
+        while os.getenv(f"TWITTER{i}_BEARER_TOKEN"):
             prefix = f"TWITTER{i}_"
+            tweet_limit = int(os.getenv(f'{prefix}DAILY_TWEET_LIMIT', 500))
+            view_limit = int(os.getenv(f'{prefix}DAILY_VIEW_LIMIT', 100))
             account = TwitterAccount(
                 bearer_token=os.getenv(f'{prefix}BEARER_TOKEN'),
                 api_key=os.getenv(f'{prefix}API_KEY'),
                 api_secret=os.getenv(f'{prefix}API_SECRET'),
                 access_token=os.getenv(f'{prefix}ACCESS_TOKEN'),
-                access_token_secret=os.getenv(f'{prefix}ACCESS_TOKEN_SECRET')
+                access_token_secret=os.getenv(f'{prefix}ACCESS_TOKEN_SECRET'),
+                daily_tweet_limit=tweet_limit,
+                daily_view_limit=view_limit,
+                remaining_tweets=tweet_limit,
+                remaining_views=view_limit,
+                # Varsayılan: ilk hesap hem okur hem paylaşır, diğerleri sadece okur
+                role=os.getenv(f'{prefix}ROLE', 'both' if i == 1 else 'read')
             )
             accounts.append(account)
+            i += 1
 
         return cls(
             accounts=accounts,
             bot_name=os.getenv('BOT_NAME'),
             bot_personality=os.getenv('BOT_PERSONALITY'),
-            bot_language=os.getenv('BOT_LANGUAGE')
+            bot_language=os.getenv('BOT_LANGUAGE'),
+            personas=cls.personas_from_env(accounts),
+            check_interval_hours=int(os.getenv('CHECK_INTERVAL', 3)),
+            schedule_jitter=float(os.getenv('SCHEDULE_JITTER', 0)),
+            fetch_concurrency=int(os.getenv('FETCH_CONCURRENCY', 8)),
+            trend_regions=[
+                woeid.strip() for woeid in os.getenv('TREND_REGIONS', '23424977').split(',') if woeid.strip()
+            ],
+            trends_per_region=int(os.getenv('TRENDS_PER_REGION', 50)),
+            max_trends=int(os.getenv('MAX_TRENDS', 5)),
+            trend_score_window=int(os.getenv('TREND_SCORE_WINDOW', 12)),
+            trend_score_capacity=int(os.getenv('TREND_SCORE_CAPACITY', 5000)),
+            cache_backend=os.getenv('CACHE_BACKEND', 'memory'),
+            cache_path=os.getenv('CACHE_PATH', 'cache/responses.db'),
+            cache_max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 1024)),
+            trends_cache_ttl=int(os.getenv('TRENDS_CACHE_TTL', 900)),
+            search_cache_ttl=int(os.getenv('SEARCH_CACHE_TTL', 300)),
+            seen_index_size=int(os.getenv('SEEN_INDEX_SIZE', 50000)),
+            prompt_token_budget=int(os.getenv('PROMPT_TOKEN_BUDGET', 1500)),
+            openai_model=os.getenv('OPENAI_MODEL', 'gpt-4'),
+            stream_generation=os.getenv('STREAM_GENERATION', 'true').lower() in ('1', 'true', 'yes'),
+            generation_retries=int(os.getenv('GENERATION_RETRIES', 1)),
+            completion_max_tokens=int(os.getenv('COMPLETION_MAX_TOKENS', 200)),
+            generation_mode=os.getenv('GENERATION_MODE', 'single'),
+            generation_concurrency=int(os.getenv('GENERATION_CONCURRENCY', 4)),
+            generation_tokens_per_minute=int(os.getenv('GENERATION_TOKENS_PER_MINUTE', 40000)),
+            candidates_per_trend=int(os.getenv('CANDIDATES_PER_TREND', 1)),
+            trend_prompt_token_budget=int(os.getenv('TREND_PROMPT_TOKEN_BUDGET', 500)),
+            completion_cache_ttl=int(os.getenv('COMPLETION_CACHE_TTL', 3600)),
+            completion_cache_size=int(os.getenv('COMPLETION_CACHE_SIZE', 128)),
+            completion_similarity=float(os.getenv('COMPLETION_SIMILARITY', 0.8)),
+            retry_max_attempts=int(os.getenv('RETRY_MAX_ATTEMPTS', 3)),
+            retry_base_delay=float(os.getenv('RETRY_BASE_DELAY', 1.0)),
+            retry_max_delay=float(os.getenv('RETRY_MAX_DELAY', 30.0)),
+            retry_max_wait=float(os.getenv('RETRY_MAX_WAIT', 60.0)),
+            breaker_failure_threshold=int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5)),
+            breaker_reset_timeout=int(os.getenv('BREAKER_RESET_TIMEOUT', 60)),
+            cache_max_stale=int(os.getenv('CACHE_MAX_STALE', 6 * 3600)),
+            http_pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 10)),
+            http_pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 16)),
+            http_pool_block=os.getenv('HTTP_POOL_BLOCK', 'true').lower() in ('1', 'true', 'yes'),
+            http_connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', 5.0)),
+            http_read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', 60.0)),
+            http_keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', 30.0)),
+            archive_path=os.getenv('ARCHIVE_PATH', 'archive') or None,
+            archive_retention_days=int(os.getenv('ARCHIVE_RETENTION_DAYS', 30)),
+            archive_segment_mb=int(os.getenv('ARCHIVE_SEGMENT_MB', 64)),
+            archive_context_hours=float(os.getenv('ARCHIVE_CONTEXT_HOURS', 0)),
+            archive_context_tweets=int(os.getenv('ARCHIVE_CONTEXT_TWEETS', 10)),
+            outbox_path=os.getenv('OUTBOX_PATH', 'state/outbox.db') or None,
+            outbox_poll_seconds=float(os.getenv('OUTBOX_POLL_SECONDS', 30)),
+            outbox_min_spacing=float(os.getenv('OUTBOX_MIN_SPACING', 60)),
+            outbox_max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5)),
+            outbox_retry_delay=float(os.getenv('OUTBOX_RETRY_DELAY', 60)),
+            outbox_max_age_hours=float(os.getenv('OUTBOX_MAX_AGE_HOURS', 6)),
+            state_path=os.getenv('STATE_PATH', 'state/bot_state.db') or None
         )
-
-    def get_current_account(self):
-        """Get current account for viewing or posting"""
-        if self.current_account_index == 0:
-            # Birinci hesap için tweet limiti dolmuşsa, sadece görüntüleme için ikinci hesaba geç
-            if self.accounts[0].remaining_views <= 0:
-                self.current_account_index = 1
-                return self.accounts[1]
-            return self.accounts[0]
-        return self.accounts[1]  # İkinci hesap sadece görüntüleme için
-
-    def get_posting_account(self):
-        """Her zaman birinci hesabı döndür"""
-        return self.accounts[0]
-
-    def switch_account(self):
-        """Sadece görüntüleme için hesap değiştir"""
-        if self.current_account_index == 0 and self.accounts[0].remaining_views <= 0:
-            self.current_account_index = 1
-            return self.accounts[1]
-        return self.accounts[0] 
\ No newline at end of file
@@ -0,0 +1,148 @@
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import requests
+import tweepy
+
+WORDS = (
+    "breaking news game tonight election vote market crypto music album release "
+    "storm weather team score trade deal launch update phone movie trailer award "
+    "fans crowd record season final match crash rally price rate policy debate"
+).split()
+
+FIRST_TOKEN_SHARE = 0.2  # Streaming'de gecikmenin ilk token'a kadar geçen kısmı
+
+
+@dataclass
+class FakeProfile:
+    """Latency, error and payload shape of a fake backend"""
+    latency: float = 0.05          # Ortalama gecikme (saniye)
+    jitter: float = 0.01           # Gecikmeye eklenen rastgele sapma
+    error_rate: float = 0.0        # Hata fırlatılan çağrıların oranı
+    trends: int = 50               # get_trends başına trend sayısı
+    shared_trends: float = 0.5     # Tüm bölgelerde (farklı yazımla) görülen trend oranı
+    tweet_words: int = 25          # Tweet başına kelime sayısı
+    duplicate_rate: float = 0.3    # Retweet/kopya olarak üretilen tweet oranı
+    completion_chars: int = 240    # GPT yanıt uzunluğu
+    seed: int = 0
+
+
+def http_error(status, headers=None):
+    """Build the tweepy exception Twitter would raise for a status code"""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = "Fake error"
+    response._content = b'{"title": "Fake error", "detail": "Injected by FakeProfile"}'
+    response.headers.update(headers or {})
+    if status == 429:
+        return tweepy.TooManyRequests(response)
+    return tweepy.TwitterServerError(response)
+
+
+class FakeBackend:
+    def __init__(self, profile):
+        self.profile = profile
+        self.calls = 0
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+
+    def _delay(self):
+        with self._lock:
+            return max(0.0, self.profile.latency + self._random.uniform(-1, 1) * self.profile.jitter)
+
+    def _roundtrip(self, share=1.0):
+        """Sleep ``share`` of one call's latency and maybe raise an injected error"""
+        delay = self._delay() * share
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.profile.error_rate
+        time.sleep(delay)
+        if failed:
+            raise http_error(503)
+
+    def _words(self, count):
+        with self._lock:
+            return ' '.join(self._random.choice(WORDS) for _ in range(count))
+
+
+class FakeTwitterClient(FakeBackend):
+    """Offline stand-in for the subset of tweepy.Client the bot uses"""
+
+    _ids = itertools.count(1_700_000_000_000_000_000)
+
+    def get_trends(self, id):
+        self._roundtrip()
+        shared = int(self.profile.trends * self.profile.shared_trends)
+        # Ortak trendler bölgeye göre farklı büyük/küçük harf ve hashtag ile döner
+        names = [f"#Trend{i}" if int(id) % 2 else f"trend{i}" for i in range(shared)]
+        names += [f"#Trend{id}_{i}" for i in range(shared, self.profile.trends)]
+        return SimpleNamespace(data=[SimpleNamespace(name=name) for name in names])
+
+    def search_recent_tweets(self, query, max_results=10, since_id=None, tweet_fields=None, **kwargs):
+        self._roundtrip()
+        tweets = []
+        for _ in range(max_results):
+            text = f"{query} {self._words(self.profile.tweet_words)}"
+            if tweets and self._random.random() < self.profile.duplicate_rate:
+                text = f"RT @fan: {tweets[-1].text}"
+            tweets.append(tweepy.Tweet({
+                'id': str(next(self._ids)),
+                'text': text,
+                'author_id': str(self._random.randrange(1, 10_000)),
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'edit_history_tweet_ids': [],
+                'public_metrics': {
+                    'like_count': self._random.randrange(0, 500),
+                    'retweet_count': self._random.randrange(0, 100),
+                    'reply_count': self._random.randrange(0, 50),
+                    'quote_count': self._random.randrange(0, 20),
+                },
+            }))
+        newest = tweets[-1].id if tweets else None
+        return tweepy.Response(data=tweets, includes={}, errors=[], meta={'newest_id': newest})
+
+    def create_tweet(self, text, **kwargs):
+        self._roundtrip()
+        return tweepy.Response(data={'id': str(next(self._ids)), 'text': text}, includes={}, errors=[], meta={})
+
+
+class FakeOpenAI(FakeBackend):
+    """Offline stand-in for OpenAI's client.chat.completions.create"""
+
+    def __init__(self, profile):
+        super().__init__(profile)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        if stream:
+            return self._stream(model)
+        self._roundtrip()
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason='stop', message=SimpleNamespace(role='assistant', content=self._content()))]
+        )
+
+    def _content(self):
+        return self._words(self.profile.completion_chars // 6)[:self.profile.completion_chars]
+
+    def _stream(self, model):
+        """Chunks like stream=True; the latency is split into first token and per-word delays"""
+        self._roundtrip(share=FIRST_TOKEN_SHARE)
+        words = self._content().split(' ')
+        word_delay = self._delay() * (1 - FIRST_TOKEN_SHARE) / len(words)
+
+        def chunks():
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(word_delay)
+                delta = SimpleNamespace(role='assistant' if i == 0 else None, content=word if i == 0 else f" {word}")
+                yield SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, finish_reason=None, delta=delta)])
+            delta = SimpleNamespace(role=None, content=None)
+            yield SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, finish_reason='stop', delta=delta)])
+
+        return chunks()
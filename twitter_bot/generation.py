@@ -0,0 +1,298 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from twitter_bot.accounts import TokenBucket
+from twitter_bot.completion_cache import jaccard
+from twitter_bot.metrics import metrics
+from twitter_bot.prompt import estimate_tokens, normalize_text
+
+TWEET_MAX_CHARS = 280
+SENTENCE_END_PATTERN = re.compile(r'[.!?…](?=\s|$)')
+WRAPPING_QUOTES = '"\'“”‘’'
+ELLIPSIS = '…'
+# Twitter sayımı (twitter-text v3): bu aralıklar 1, diğer karakterler (emoji, CJK...) 2, URL'ler 23 sayılır
+SINGLE_WEIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+URL_WEIGHT = 23
+URL_PATTERN = re.compile(r'(?:https?://)?(?:[\w-]+\.)+[a-zA-Z]{2,}(?:/\S*)?')
+
+
+@dataclass
+class GenerationResult:
+    text: str
+    attempts: int = 1
+    ttft: float = None       # İlk token'a kadar geçen süre (sadece streaming)
+    seconds: float = 0.0     # Tüm denemeler dahil toplam üretim süresi
+    early_stopped: bool = False
+    trimmed: bool = False
+
+
+def clean_completion(text):
+    """Strip whitespace and quotes the model sometimes wraps a tweet in"""
+    text = (text or '').strip()
+    if len(text) >= 2 and text[0] in WRAPPING_QUOTES and text[-1] in WRAPPING_QUOTES:
+        text = text[1:-1].strip()
+    return text
+
+
+def _char_weight(char):
+    code = ord(char)
+    return 1 if any(low <= code <= high for low, high in SINGLE_WEIGHT_RANGES) else 2
+
+
+def _segments(text):
+    """(start, end, weight) of every URL and every other character, in order"""
+    position = 0
+    for match in URL_PATTERN.finditer(text):
+        for index in range(position, match.start()):
+            yield index, index + 1, _char_weight(text[index])
+        yield match.start(), match.end(), URL_WEIGHT
+        position = match.end()
+    for index in range(position, len(text)):
+        yield index, index + 1, _char_weight(text[index])
+
+
+def tweet_length(text):
+    """Length of text as Twitter counts it against the 280 limit.
+
+    Emoji and CJK characters count as 2 and links as 23. Emoji sequences
+    are counted per code point, which can only overestimate.
+    """
+    return sum(weight for _, _, weight in _segments(unicodedata.normalize('NFC', text)))
+
+
+def _fit_index(text, limit):
+    """Length of the longest prefix of text that fits in ``limit``; links are never split"""
+    length = 0
+    for start, end, weight in _segments(text):
+        length += weight
+        if length > limit:
+            return start
+    return len(text)
+
+
+def trim_to_sentence(text, limit=TWEET_MAX_CHARS, min_ratio=0.5):
+    """Cut text at its last full sentence within limit, or None if that loses too much"""
+    text = unicodedata.normalize('NFC', text)
+    if tweet_length(text) <= limit:
+        return text
+    fits = _fit_index(text, limit)
+    ends = [match.end() for match in SENTENCE_END_PATTERN.finditer(text, 0, fits)]
+    if ends and ends[-1] >= fits * min_ratio:
+        return text[:ends[-1]].rstrip()
+    return None
+
+
+def trim_to_words(text, limit=TWEET_MAX_CHARS):
+    """Cut text at a word boundary within limit and mark the cut with an ellipsis"""
+    text = unicodedata.normalize('NFC', text)
+    if tweet_length(text) <= limit:
+        return text
+    cut = text[:_fit_index(text, limit - tweet_length(ELLIPSIS))]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:-') + ELLIPSIS
+
+
+def _close_stream(stream):
+    close = getattr(stream, 'close', None) or getattr(getattr(stream, 'response', None), 'close', None)
+    if close is not None:
+        close()
+
+
+def _stream_text(client, limit, **request):
+    """Collect a streamed completion, stopping once it cannot fit in a tweet.
+
+    Returns (text, ttft, early_stopped).
+    """
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    stream = client.chat.completions.create(stream=True, **request)
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            parts.append(content)
+            # Son kelime yarım olabilir (örn. henüz bitmemiş bir link); sadece tamamlanan kelimeler ölçülür
+            complete = re.sub(r'\S+$', '', ''.join(parts))
+            # Sınır aşıldıysa kalan token'ları beklemenin anlamı yok; kırpılır ya da yeniden denenir
+            if tweet_length(complete) > limit:
+                return ''.join(parts), ttft, True
+        return ''.join(parts), ttft, False
+    finally:
+        _close_stream(stream)
+
+
+def generate_tweet(client, model, prompt, limit=TWEET_MAX_CHARS, stream=True, retries=1, max_tokens=None):
+    """Generate a tweet of at most ``limit`` characters as Twitter counts them.
+
+    Over-long answers are cut at a sentence boundary when that keeps most of
+    the text; otherwise the model is asked again for a shorter version, up to
+    ``retries`` times, before falling back to a word-boundary cut.
+    """
+    messages = [{"role": "user", "content": prompt}]
+    request = {'model': model}
+    if max_tokens:
+        request['max_tokens'] = max_tokens
+
+    start = time.perf_counter()
+    result = GenerationResult(text='', attempts=0)
+    while True:
+        result.attempts += 1
+        if stream:
+            text, ttft, early_stopped = _stream_text(client, limit, messages=messages, **request)
+            if result.ttft is None and ttft is not None:
+                result.ttft = ttft
+                metrics.observe('twitter_bot_generation_ttft_seconds', ttft)
+            if early_stopped:
+                result.early_stopped = True
+                metrics.inc('twitter_bot_generation_early_stops_total')
+        else:
+            response = client.chat.completions.create(messages=messages, **request)
+            text = response.choices[0].message.content
+
+        text = clean_completion(text)
+        if not text:
+            break
+        fitted = trim_to_sentence(text, limit)
+        if fitted is not None:
+            result.trimmed = fitted != text
+            result.text = fitted
+            break
+        if result.attempts > retries:
+            result.trimmed = True
+            result.text = trim_to_words(text, limit)
+            break
+
+        metrics.inc('twitter_bot_generation_retries_total')
+        messages = messages + [
+            {"role": "assistant", "content": text},
+            {"role": "user", "content": (
+                f"Too long. Rewrite it as a single tweet of at most {limit} characters "
+                f"(emoji count as 2, links as {URL_WEIGHT})."
+            )}
+        ]
+
+    if result.trimmed:
+        metrics.inc('twitter_bot_generation_trimmed_total')
+    result.seconds = time.perf_counter() - start
+    metrics.observe('twitter_bot_generation_seconds', result.seconds, mode='stream' if stream else 'complete')
+    return result
+
+
+# Aday seçimindeki ağırlıklar
+SELECTION_WEIGHTS = {
+    'trend': 1.0,       # Trendin TrendScorer skoru
+    'trimmed': -0.5,    # Kırpılmış yanıtlar yarım kalmış olabilir
+    'repetition': -2.0, # Son paylaşılan tweetlere en yüksek kelime benzerliği
+}
+
+
+@dataclass
+class Candidate:
+    key: str                 # Adayın üretildiği trend
+    text: str
+    trend_score: float = 0.0
+    trimmed: bool = False
+    score: float = 0.0
+
+
+def select_candidate(candidates, recent_posts=(), weights=None):
+    """Pick the candidate to post: strong trend, complete text, unlike recent posts"""
+    weights = dict(SELECTION_WEIGHTS, **(weights or {}))
+    recent = [set(normalize_text(post).split()) for post in recent_posts]
+    best = None
+    for candidate in candidates:
+        if not candidate.text or candidate.text in recent_posts:
+            continue
+        words = set(normalize_text(candidate.text).split())
+        repetition = max((jaccard(words, post) for post in recent), default=0.0)
+        candidate.score = (
+            weights['trend'] * candidate.trend_score
+            + weights['trimmed'] * candidate.trimmed
+            + weights['repetition'] * repetition
+        )
+        if best is None or candidate.score > best.score:
+            best = candidate
+    return best
+
+
+class GenerationEngine:
+    """Runs many tweet generations concurrently.
+
+    At most ``max_in_flight`` requests run at once, and every request first
+    reserves its estimated prompt + completion tokens from a
+    tokens-per-minute bucket, waiting when the budget is spent.
+    """
+
+    def __init__(self, client, model, max_in_flight=4, tokens_per_minute=40000, stream=True,
+                 retries=1, max_tokens=200, resilience=None, clock=time.monotonic, sleep=time.sleep):
+        self.client = client
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.stream = stream
+        self.retries = retries
+        self.max_tokens = max_tokens
+        self.resilience = resilience
+        self.budget = TokenBucket(tokens_per_minute, 60, clock=clock)
+        self.sleep = sleep
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        tokens = min(tokens, self.budget.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                if self.budget.consume(tokens):
+                    break
+                wait = (tokens - self.budget.tokens) / self.budget.rate
+            self.sleep(wait)
+            waited += wait
+        if waited:
+            metrics.observe('twitter_bot_generation_budget_wait_seconds', waited)
+
+    def _generate(self, prompt):
+        self._reserve(estimate_tokens(prompt) + (self.max_tokens or 0))
+        with self._lock:
+            self.in_flight += 1
+            metrics.set_gauge('twitter_bot_generation_in_flight', self.in_flight)
+        try:
+            def generate():
+                return generate_tweet(
+                    self.client, self.model, prompt,
+                    stream=self.stream, retries=self.retries, max_tokens=self.max_tokens
+                )
+            if self.resilience is None:
+                return generate()
+            return self.resilience.call('chat.completions', generate)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                metrics.set_gauge('twitter_bot_generation_in_flight', self.in_flight)
+
+    def generate_many(self, prompts):
+        """Generate for (key, prompt) pairs; returns (key, GenerationResult or None) in input order"""
+        if not prompts:
+            return []
+        workers = max(1, min(self.max_in_flight, len(prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._generate, prompt) for _, prompt in prompts]
+        results = []
+        for (key, _), future in zip(prompts, futures):
+            try:
+                results.append((key, future.result()))
+            except Exception as e:
+                logging.warning(f"'{key}' için yanıt üretilemedi: {str(e)}")
+                results.append((key, None))
+        return results
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'import_baseline.json')
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ölçülen giriş noktaları: her biri ayrı bir yorumlayıcıda içe aktarılır
+TARGETS = {
+    'dashboard': 'twitter_bot.main',
+    'worker': 'twitter_bot.worker',
+    'gui': 'twitter_bot.interface',
+    'bot': 'twitter_bot.bot',  # Worker'ın ilk start komutunda ödenir
+}
+# Bir giriş noktasının yüklemesi beklenmeyen ağır paketler raporda ayrıca gösterilir
+HEAVY_MODULES = ('tweepy', 'openai', 'flask', 'numpy', 'requests', 'tkinter')
+
+
+def parse_importtime(output, module):
+    """Cumulative import time of module and of the heavy packages it pulled in, in seconds"""
+    total = None
+    heavy = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        try:
+            seconds = int(cumulative) / 1e6
+        except ValueError:
+            continue  # Başlık satırı
+        name = name.strip()
+        if name in HEAVY_MODULES:
+            heavy[name] = seconds
+        if name == module:
+            total = seconds
+    return total, heavy
+
+
+def measure(module, repeat=5):
+    """Import module ``repeat`` times in fresh interpreters and return its timings"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get('PYTHONPATH')]))
+    # Panel içe aktarılırken logs/ oluşturur ve anahtar dosyası yazar; geçici dizin ve sabit anahtar kullanılır
+    env.setdefault('WORKER_AUTHKEY', 'import-benchmark')
+    totals = []
+    heavy = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(repeat):
+            process = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                cwd=cwd, env=env, capture_output=True, text=True
+            )
+            if process.returncode != 0:
+                error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'failed'
+                return {'module': module, 'error': error}
+            total, heavy = parse_importtime(process.stderr, module)
+            totals.append(total)
+    return {
+        'module': module,
+        'median': statistics.median(totals),
+        'min': min(totals),
+        'max': max(totals),
+        'heavy': heavy,
+    }
+
+
+def run_benchmark(targets, repeat=5):
+    return {name: measure(TARGETS[name], repeat) for name in targets}
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """Return regression messages for slower imports or newly loaded heavy packages"""
+    regressions = []
+    for name, stats in result.items():
+        base = baseline.get(name)
+        if not base or 'error' in stats or 'error' in base:
+            continue
+        if stats['median'] > base['median'] * (1 + tolerance):
+            regressions.append(
+                f"{name} import {stats['median'] * 1000:.1f}ms > baseline {base['median'] * 1000:.1f}ms"
+            )
+        added = sorted(set(stats['heavy']) - set(base['heavy']))
+        if added:
+            regressions.append(f"{name} now imports {', '.join(added)}")
+    return regressions
+
+
+def print_report(result):
+    for name, stats in result.items():
+        if 'error' in stats:
+            print(f"  {name:<10} {stats['module']:<24} error: {stats['error']}")
+            continue
+        heavy = ', '.join(
+            f"{module} {seconds * 1000:.0f}ms" for module, seconds in sorted(stats['heavy'].items())
+        ) or '-'
+        print(
+            f"  {name:<10} {stats['module']:<24} median={stats['median'] * 1000:7.1f}ms "
+            f"min={stats['min'] * 1000:7.1f}ms max={stats['max'] * 1000:7.1f}ms  heavy: {heavy}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time benchmark of the bot's entry points")
+    parser.add_argument('targets', nargs='*', help=f"Entry points to measure: {', '.join(TARGETS)} (default: all)")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.3, help="Allowed regression ratio (imports are noisy)")
+    args = parser.parse_args(argv)
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown entry points: {', '.join(sorted(unknown))}")
+
+    result = run_benchmark(args.targets or list(TARGETS), args.repeat)
+    print_report(result)
+
+    if args.save_baseline:
+        directory = os.path.dirname(args.baseline)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(args.baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(result, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 import json
 import os
 from dotenv import load_dotenv
+from twitter_bot.supervisor import Supervisor
 
 class BotConfigInterface:
     def __init__(self, root):
@@ -166,14 +167,21 @@ class BotConfigInterface:
 
     def start_bot(self):
         try:
-            os.system('python -m twitter_bot.main &')
+            # Worker süreçleri paneldekilerle aynı; adresleri üzerinden bulunur
+            load_dotenv()
+            supervisor = Supervisor.from_env()
+            for name in supervisor.workers:
+                supervisor.start(name)
             messagebox.showinfo("Success", "Bot started successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start bot: {str(e)}")
 
     def stop_bot(self):
         try:
-            os.system('pkill -f "python -m twitter_bot.main"')
+            load_dotenv()
+            supervisor = Supervisor.from_env()
+            for name in supervisor.workers:
+                supervisor.shutdown(name)
             messagebox.showinfo("Success", "Bot stopped successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to stop bot: {str(e)}")
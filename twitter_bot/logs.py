@@ -0,0 +1,114 @@
+import atexit
+import logging
+import os
+import queue
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+TAIL_BLOCK_SIZE = 8192
+
+
+def setup_logging(log_path, level=logging.INFO, max_bytes=5 * 1024 * 1024, backup_count=5, when=None):
+    """Route log records through a queue to a rotating file handler.
+
+    Callers only enqueue records; a background QueueListener does the file
+    I/O. Rotation is time based when ``when`` is given (e.g. 'midnight'),
+    otherwise size based.
+    """
+    directory = os.path.dirname(log_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    if when:
+        file_handler = TimedRotatingFileHandler(log_path, when=when, backupCount=backup_count, encoding='utf-8')
+    else:
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    return listener
+
+
+@dataclass
+class LogTail:
+    """One read of a log file.
+
+    ``cursor`` is opaque to callers ("<inode>:<offset>"); pass it back to
+    continue from the same file. ``reset`` means the text replaces what the
+    caller has shown so far instead of extending it.
+    """
+    text: str
+    cursor: str
+    reset: bool
+    more: bool
+
+
+def _parse_cursor(cursor):
+    """(inode, offset) from a cursor string, None when missing or malformed"""
+    try:
+        inode, offset = cursor.split(':')
+        return int(inode), int(offset)
+    except (AttributeError, ValueError):
+        return None
+
+
+def tail_lines(path, limit=20, cursor=None):
+    """Read log lines without loading the whole file.
+
+    Without a cursor the last ``limit`` lines are returned by seeking back
+    from the end. With a cursor from a previous call up to ``limit``
+    complete lines written after it are returned, oldest first, and the new
+    cursor points just past the last line returned, so the next call
+    continues where this one stopped. The cursor records the file's inode:
+    once the file has been rotated (or truncated below the offset) the
+    cursor no longer applies and a plain tail is returned with ``reset``.
+    """
+    position = _parse_cursor(cursor)
+    with open(path, 'rb') as f:
+        inode = os.fstat(f.fileno()).st_ino
+        size = f.seek(0, os.SEEK_END)
+        if position is not None and position[0] == inode and 0 <= position[1] <= size:
+            text, offset = _read_forward(f, position[1], size, limit)
+            return LogTail(text, f'{inode}:{offset}', False, offset < size)
+
+        # Sondan geriye doğru blok blok oku, yeterli satır bulunana kadar
+        data = b''
+        position = size
+        while position > 0 and data.count(b'\n') <= limit:
+            read_from = max(position - TAIL_BLOCK_SIZE, 0)
+            f.seek(read_from)
+            data = f.read(position - read_from) + data
+            position = read_from
+
+    lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)
+    if position > 0 and lines:
+        lines = lines[1:]  # Blok sınırında bölünmüş ilk satırı at
+    return LogTail(''.join(lines[-limit:]), f'{inode}:{size}', True, False)
+
+
+def _read_forward(f, cursor, size, limit):
+    """Up to ``limit`` complete lines starting at ``cursor``; returns (text, offset after the last line)"""
+    f.seek(cursor)
+    data = b''
+    end = 0
+    count = 0
+    position = cursor
+    while position < size and count < limit:
+        data += f.read(min(TAIL_BLOCK_SIZE, size - position))
+        position = cursor + len(data)
+        # Sadece tamamlanmış satırlar gönderilir; yarım satır bir sonraki okumaya kalır
+        while count < limit:
+            newline = data.find(b'\n', end)
+            if newline < 0:
+                break
+            end = newline + 1
+            count += 1
+    return data[:end].decode('utf-8', errors='replace'), cursor + end
@@ -1,240 +1,149 @@
-import tweepy
-import schedule
-import time
-from openai import OpenAI
-from datetime import datetime
-import json
 import os
 import logging
+from flask import Flask, request, jsonify, render_template, redirect, Response, abort
+from twitter_bot.auth import requires_auth, authenticate, logout
+from twitter_bot.logs import setup_logging, tail_lines
+from twitter_bot.metrics import metrics
+from twitter_bot.ratelimit import RateLimiter
+from twitter_bot.supervisor import Supervisor, WorkerError
 from dotenv import load_dotenv
-from twitter_bot.config import Config, TwitterAccount
-from flask import Flask, request, jsonify, render_template, redirect
-from auth import requires_auth
 import secrets
-from werkzeug.security import generate_password_hash
-import threading
 from functools import wraps
 
-# Create logs directory if it doesn't exist
-log_directory = "logs"
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
+load_dotenv()
 
-# Logging settings
-logging.basicConfig(
-    filename=os.path.join(log_directory, 'twitter_bot.log'),
+# Logging settings: kayıtlar kuyruk üzerinden dönen (rotating) log dosyasına yazılır
+log_directory = "logs"
+log_path = os.path.join(log_directory, 'twitter_bot.log')
+setup_logging(
+    log_path,
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    max_bytes=int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024)),
+    backup_count=int(os.getenv('LOG_BACKUP_COUNT', 5)),
+    when=os.getenv('LOG_ROTATE_WHEN')
 )
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(16))
+# Oturum çerezi sadece HTTPS üzerinden ve JS'e kapalı gönderilir
+app.config['SESSION_COOKIE_HTTPONLY'] = True
+app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') != 'development'
+app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
-# Define global variables
-bot_thread = None
-is_bot_running = False
-bot = None
-
-class TwitterBot:
-    def __init__(self):
-        load_dotenv()
-        self.config = Config.from_env()
-        self.setup_clients()
-        
-    def setup_clients(self):
-        """Create separate client for each account"""
-        self.clients = []
-        for account in self.config.accounts:
-            try:
-                client = tweepy.Client(
-                    bearer_token=account.bearer_token,
-                    consumer_key=account.api_key,
-                    consumer_secret=account.api_secret,
-                    access_token=account.access_token,
-                    access_token_secret=account.access_token_secret
-                )
-                self.clients.append(client)
-            except Exception as e:
-                logging.error(f"Client oluşturulurken hata: {str(e)}", exc_info=True)
-        
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-    def get_trending_tweets(self):
-        """Fetch trending tweets from USA"""
-        current_account = self.config.get_current_account()
-        
-        if current_account.remaining_views <= 0:
-            logging.info("Görüntüleme limiti doldu, hesap değiştiriliyor...")
-            current_account = self.config.switch_account()
-            
-        try:
-            client = self.clients[self.config.current_account_index]
-            logging.info("ABD trendleri alınıyor...")
-            
-            # Sadece ABD trendlerini al
-            trends = client.get_trends(id="23424977")  # ABD WOEID
-            
-            all_tweets = []
-            for trend in trends.data[:5]:  # İlk 5 trend ile sınırla
-                logging.info(f"'{trend.name}' trendi için tweetler aranıyor")
-                tweets = client.search_recent_tweets(
-                    query=trend.name,
-                    max_results=10,
-                    tweet_fields=['author_id', 'created_at', 'text']
-                )
-                if tweets.data:
-                    all_tweets.extend(tweets.data)
-            
-            # Limit güncelle
-            current_account.remaining_views -= 1
-            
-            logging.info(f"Toplam {len(all_tweets)} tweet toplandı")
-            return all_tweets
-            
-        except Exception as e:
-            logging.error(f"Tweet çekerken hata: {str(e)}", exc_info=True)
-            return None
-
-    def analyze_and_respond(self, tweets):
-        """Analyze tweets and generate response"""
-        try:
-            tweet_content = "\n".join([tweet.text for tweet in tweets])
-            logging.info("Starting GPT analysis")
-            
-            prompt = f"""
-            You are a Twitter bot named {self.config.bot_name}.
-            Personality: {self.config.bot_personality}
-            
-            Create a witty comment about the following trends.
-            Language: {self.config.bot_language}
-            Maximum 280 characters.
-            
-            Trends:
-            {tweet_content}
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            generated_response = response.choices[0].message.content
-            logging.info(f"GPT response generated: {generated_response}")
-            return generated_response
-        except Exception as e:
-            logging.error(f"Error during GPT analysis: {str(e)}", exc_info=True)
-            return None
-
-    def post_tweet(self, response):
-        """Post the generated response as a tweet (always from first account)"""
-        posting_account = self.config.get_posting_account()
-        
-        if posting_account.remaining_tweets <= 0:
-            logging.error("Tweet limit reached for main account")
-            return
-        
-        try:
-            client = self.clients[0]  # Her zaman ilk hesabın client'ını kullan
-            client.create_tweet(text=response)
-            posting_account.remaining_tweets -= 1
-            logging.info(f"Tweet successfully posted: {response}")
-        except Exception as e:
-            logging.error(f"Error while posting tweet: {str(e)}", exc_info=True)
+# Bot'lar ayrı worker süreçlerinde çalışır; panel onları soket üzerinden yönetir
+supervisor = Supervisor.from_env()
 
-    def run_bot(self):
-        """Main bot function"""
-        try:
-            logging.info("Bot operation started")
-            tweets = self.get_trending_tweets()
-            
-            if tweets:
-                response = self.analyze_and_respond(tweets)
-                if response:
-                    self.post_tweet(response)
-            logging.info("Bot operation completed")
-        except Exception as e:
-            logging.error(f"Unexpected error during bot operation: {str(e)}", exc_info=True)
+def is_bot_running(name=None):
+    return supervisor.status(name or supervisor.default_worker).get('running', False)
 
-def start_bot():
-    """Function to start the bot"""
-    global is_bot_running, bot
-    
-    logging.info("Bot başlatıldı")
-    try:
-        if bot is None:
-            bot = TwitterBot()
-            
-        # Çalışma aralığını ayarla
-        schedule.every(int(os.getenv('CHECK_INTERVAL', 3))).hours.do(bot.run_bot)
-        
-        # İlk çalıştırma
-        bot.run_bot()
-        
-        # Zamanlayıcı döngüsü
-        while is_bot_running:
-            try:
-                schedule.run_pending()
-                time.sleep(60)
-            except Exception as e:
-                logging.error(f"Zamanlayıcı döngüsünde hata: {str(e)}", exc_info=True)
-                time.sleep(300)  # Hata durumunda 5 dakika bekle
-    except Exception as e:
-        logging.error(f"Kritik hata: {str(e)}", exc_info=True)
-        is_bot_running = False
+# Rate limiting: RATE_LIMIT_BACKEND=sqlite ile tüm worker süreçleri aynı limiti paylaşır
+limiter = RateLimiter.from_env()
 
-# Simple decorator for rate limiting
-def rate_limit(func):
-    last_requests = {}
+def rate_limit(func=None, limit=1, window=1.0):
+    """Rate limit per client IP and route (default: 1 request per second)"""
+    if func is None:
+        return lambda f: rate_limit(f, limit=limit, window=window)
     
     @wraps(func)
     def wrapper(*args, **kwargs):
-        ip = request.remote_addr
-        current_time = time.time()
-        
-        if ip in last_requests:
-            time_passed = current_time - last_requests[ip]
-            if time_passed < 1:  # 1 saniye bekleme süresi
-                return jsonify({"error": "Too many requests"}), 429
-        
-        last_requests[ip] = current_time
+        key = f"{func.__name__}:{request.remote_addr}"
+        allowed, retry_after = limiter.hit(key, limit, window)
+        if not allowed:
+            response = jsonify({"error": "Too many requests"})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
         return func(*args, **kwargs)
     
     return wrapper
 
+def worker_name():
+    """Worker selected by the ?worker= argument, the first configured one by default"""
+    name = request.args.get('worker') or supervisor.default_worker
+    if name not in supervisor.workers:
+        abort(404)
+    return name
+
 # Protect all routes with auth
 @app.route('/')
 @requires_auth
 def index():
-    return render_template('index.html', is_running=is_bot_running)
+    return render_template(
+        'index.html',
+        is_running=is_bot_running(),
+        worker=supervisor.default_worker,
+        workers=list(supervisor.workers)
+    )
 
 @app.route('/toggle_bot')
 @requires_auth
 @rate_limit
 def toggle_bot():
-    global bot_thread, is_bot_running
-    
-    if not is_bot_running:
-        is_bot_running = True
-        bot_thread = threading.Thread(target=start_bot)
-        bot_thread.start()
-        return jsonify({"status": "started"})
-    else:
-        is_bot_running = False
-        if bot_thread and bot_thread.is_alive():
-            bot_thread.join(timeout=1)  # Thread'in düzgün kapanmasını bekle
-        return jsonify({"status": "stopped"})
+    name = worker_name()
+    try:
+        if not is_bot_running(name):
+            return jsonify({"status": supervisor.start(name), "worker": name})
+        # Döngü çalışıyorsa bitmesini en fazla BOT_STOP_TIMEOUT saniye bekle
+        return jsonify({"status": supervisor.stop(name), "worker": name})
+    except WorkerError as e:
+        logging.error(f"Kritik hata: {str(e)}", exc_info=True)
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/workers')
+@requires_auth
+def workers_status():
+    """Status and live stats of every configured worker"""
+    return jsonify({"workers": supervisor.status_all()})
+
+@app.route('/workers/<name>/<action>', methods=['POST'])
+@requires_auth
+@rate_limit
+def worker_action(name, action):
+    actions = {
+        'start': supervisor.start,
+        'stop': supervisor.stop,
+        'run_now': supervisor.run_now,
+        'shutdown': supervisor.shutdown,
+    }
+    if name not in supervisor.workers or action not in actions:
+        abort(404)
+    try:
+        return jsonify({"status": actions[action](name), "worker": name})
+    except WorkerError as e:
+        logging.error(f"'{name}' worker'ında '{action}' başarısız: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
 
 @app.route('/get_logs')
 @requires_auth
 @rate_limit
 def get_logs():
     try:
-        with open(os.path.join(log_directory, 'twitter_bot.log'), 'r') as f:
-            logs = f.readlines()[-20:]
-            return jsonify({"logs": "".join(logs)})
+        # cursor: önceki yanıttaki dosya kimliği ve konumu; sadece yeni satırlar döner
+        cursor = request.args.get('cursor')
+        tail = tail_lines(supervisor.log_path(worker_name()), limit=20, cursor=cursor)
+        return jsonify({
+            "logs": tail.text,
+            "cursor": tail.cursor,
+            # Dosya döndürüldüyse panel içeriği baştan yazar
+            "reset": tail.reset,
+            # Birikmiş satırlar varsa panel beklemeden tekrar ister
+            "more": tail.more
+        })
     except Exception as e:
         return jsonify({"logs": f"Loglar okunamadı: {str(e)}"})
 
+@app.route('/metrics')
+@requires_auth
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(supervisor.render_metrics(metrics.snapshot()), mimetype='text/plain; version=0.0.4')
+
+@app.route('/logout')
+def logout_endpoint():
+    """Revoke the session token and ask the browser for credentials again"""
+    logout()
+    return authenticate()
+
 # HTTPS redirect
 @app.before_request
 def before_request():
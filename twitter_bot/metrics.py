@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 1024  # Yüzdelik hesapları için tutulan son gözlem sayısı
+
+
+class Summary:
+    """Count, sum and a window of recent observations for quantiles"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        if not self.recent:
+            return float('nan')
+        values = sorted(self.recent)
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class Metrics:
+    """Thread-safe metric registry rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._summaries = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._summaries.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block as ``<name>_seconds``; failures also count in ``<name>_errors_total``"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """Plain dict view of the collected metrics, e.g. for benchmarks"""
+        with self._lock:
+            summaries = {
+                key: {
+                    "count": summary.count,
+                    "sum": summary.total,
+                    **{f"p{int(q * 100)}": summary.quantile(q) for q in QUANTILES}
+                }
+                for key, summary in self._summaries.items()
+            }
+            return {"summaries": summaries, "counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def render(self):
+        """Prometheus text exposition format"""
+        return render_snapshots([({}, self.snapshot())])
+
+
+def render_snapshots(snapshots):
+    """Render (labels, snapshot) pairs as one Prometheus page.
+
+    Used to merge the registries of several processes; each snapshot's
+    series get its labels (e.g. ``worker``) so they stay distinct.
+    """
+    def fmt(labels, **extra):
+        pairs = list(labels) + list(extra.items())
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    # Aynı metrik tüm süreçlerde tek TYPE bloğu altında toplanır
+    series = {'summary': [], 'counter': [], 'gauge': []}
+    for extra, snapshot in snapshots:
+        extra = tuple(sorted(extra.items()))
+        for kind, section in (('summary', 'summaries'), ('counter', 'counters'), ('gauge', 'gauges')):
+            for (name, labels), value in snapshot[section].items():
+                series[kind].append((name, tuple(labels) + extra, value))
+
+    lines = []
+    typed = set()
+    for kind, entries in series.items():
+        for name, labels, value in sorted(entries, key=lambda entry: entry[:2]):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            if kind == 'summary':
+                for q in QUANTILES:
+                    lines.append(f"{name}{fmt(labels, quantile=q)} {value[f'p{int(q * 100)}']}")
+                lines.append(f"{name}_sum{fmt(labels)} {value['sum']}")
+                lines.append(f"{name}_count{fmt(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{fmt(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Uygulama genelinde paylaşılan kayıt
+metrics = Metrics()
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    persona TEXT NOT NULL DEFAULT 'default',
+    text TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    not_before REAL NOT NULL,
+    claimed_at REAL,
+    updated_at REAL NOT NULL,
+    account TEXT,
+    tweet_id TEXT,
+    last_error TEXT
+);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (persona, status, not_before);
+"""
+
+PENDING, POSTING, POSTED, FAILED, EXPIRED = 'pending', 'posting', 'posted', 'failed', 'expired'
+STATUSES = (PENDING, POSTING, POSTED, FAILED, EXPIRED)
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    key: str
+    persona: str
+    text: str
+    attempts: int
+    created_at: float
+
+
+def idempotency_key(text, persona='default'):
+    """Key of a persona's generated tweet; whitespace-only differences map to the same key"""
+    normalized = ' '.join(text.split())
+    # Varsayılan persona, persona desteğinden önceki anahtarları korur
+    if persona != 'default':
+        normalized = f"{persona}\n{normalized}"
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class Outbox:
+    """Durable queue of generated tweets waiting to be posted (SQLite in WAL mode).
+
+    Every entry has a unique idempotency key, so the same tweet is never
+    queued twice. A poster claims one due entry at a time inside a write
+    transaction, which keeps two posters (threads or processes) from
+    sending the same entry. An entry left in ``posting`` by a crashed
+    poster is handed out again after ``lease_seconds``.
+    """
+
+    def __init__(self, path, lease_seconds=600, busy_timeout=5.0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+        if 'persona' not in columns:
+            # Persona desteğinden önce oluşturulmuş kuyruk
+            conn.execute("ALTER TABLE outbox ADD COLUMN persona TEXT NOT NULL DEFAULT 'default'")
+            conn.execute("DROP INDEX IF EXISTS outbox_due")
+        conn.executescript(INDEXES)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.outbox_path)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            # Kuyruktaki tweet ücreti ödenmiş bir GPT yanıtı; her commit diske yazılır
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Immediate (write-locking) transaction on this thread's connection"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def enqueue(self, text, persona='default', key=None, not_before=None, now=None):
+        """Queue a persona's tweet; False if an entry with the same idempotency key already exists"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, persona, text, status, created_at, not_before, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key or idempotency_key(text, persona), persona, text, PENDING,
+                    now, now if not_before is None else not_before, now
+                )
+            ).rowcount
+        return inserted == 1
+
+    def claim(self, persona='default', now=None):
+        """Take the persona's oldest due entry for posting, or None"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, key, persona, text, attempts, created_at FROM outbox "
+                "WHERE persona = ? AND ((status = ? AND not_before <= ?) OR (status = ? AND claimed_at < ?)) "
+                "ORDER BY id LIMIT 1",
+                (persona, PENDING, now, POSTING, now - self.lease_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, claimed_at = ?, updated_at = ? WHERE id = ?",
+                (POSTING, now, now, row[0])
+            )
+        entry_id, key, persona, text, attempts, created_at = row
+        return OutboxEntry(entry_id, key, persona, text, attempts + 1, created_at)
+
+    def _finish(self, entry_id, status, now=None, **fields):
+        now = time.time() if now is None else now
+        assignments = ''.join(f", {name} = ?" for name in fields)
+        with self._transaction() as conn:
+            conn.execute(
+                f"UPDATE outbox SET status = ?, updated_at = ?{assignments} WHERE id = ?",
+                (status, now, *fields.values(), entry_id)
+            )
+
+    def mark_posted(self, entry_id, account=None, tweet_id=None, now=None):
+        self._finish(entry_id, POSTED, now, account=account, tweet_id=tweet_id)
+
+    def retry(self, entry_id, error, at, now=None):
+        """Put a claimed entry back in the queue, due again at ``at``"""
+        self._finish(entry_id, PENDING, now, not_before=at, last_error=error)
+
+    def release(self, entry_id, at, now=None):
+        """Return a claimed entry that was not attempted (e.g. no posting budget)"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = MAX(attempts - 1, 0), not_before = ?, updated_at = ? "
+                "WHERE id = ?",
+                (PENDING, at, now, entry_id)
+            )
+
+    def fail(self, entry_id, error, now=None):
+        self._finish(entry_id, FAILED, now, last_error=error)
+
+    def expire(self, max_age, persona=None, now=None):
+        """Give up on entries (of one persona, or all) queued longer than ``max_age`` seconds; returns how many"""
+        now = time.time() if now is None else now
+        sql = "UPDATE outbox SET status = ?, updated_at = ? WHERE status = ? AND created_at < ?"
+        params = [EXPIRED, now, PENDING, now - max_age]
+        if persona is not None:
+            sql += " AND persona = ?"
+            params.append(persona)
+        with self._transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def pending(self, persona=None):
+        """Entries (of one persona, or all) waiting to be posted, including ones being posted right now"""
+        sql = "SELECT COUNT(*) FROM outbox WHERE status IN (?, ?)"
+        params = [PENDING, POSTING]
+        if persona is not None:
+            sql += " AND persona = ?"
+            params.append(persona)
+        return self._conn().execute(sql, params).fetchone()[0]
+
+    def prune(self, keep_days=7, now=None):
+        """Drop finished entries; their keys keep blocking duplicates for ``keep_days``"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM outbox WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (POSTED, FAILED, EXPIRED, now - keep_days * 86400)
+            )
+
+    def stats(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._conn().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return counts
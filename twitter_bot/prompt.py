@@ -0,0 +1,139 @@
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+
+RETWEET_PREFIX = re.compile(r'^RT @\w+:\s*')
+URL_PATTERN = re.compile(r'https?://\S+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s#@]')
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+SIMHASH_BITS = 64
+# 64 bit'i 4 banda böl: hamming mesafesi <= 3 olan iki hash en az bir bantta birebir aynıdır
+SIMHASH_BANDS = 4
+SIMHASH_MAX_DISTANCE = 3
+
+
+@dataclass
+class PromptStats:
+    input_tweets: int
+    unique_tweets: int
+    used_tweets: int
+    naive_tokens: int
+    prompt_tokens: int
+
+    @property
+    def saved_tokens(self):
+        return self.naive_tokens - self.prompt_tokens
+
+
+def estimate_tokens(text):
+    """Rough local estimate of GPT tokens: one per ~4 characters of each word or symbol"""
+    return sum(math.ceil(len(piece) / 4) for piece in TOKEN_PATTERN.findall(text))
+
+
+def normalize_text(text):
+    """Strip retweet prefixes, links, punctuation and casing so copies hash the same"""
+    text = RETWEET_PREFIX.sub('', text)
+    text = URL_PATTERN.sub('', text)
+    text = PUNCTUATION_PATTERN.sub(' ', text)
+    return ' '.join(text.lower().split())
+
+
+def simhash(text):
+    """64-bit SimHash over word 3-shingles of the normalized text"""
+    words = normalize_text(text).split()
+    if len(words) >= 3:
+        shingles = [' '.join(words[i:i + 3]) for i in range(len(words) - 2)]
+    else:
+        shingles = [' '.join(words)]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def collapse_near_duplicates(tweets):
+    """Group near-identical tweets; returns [(representative, copies)] in input order"""
+    band_bits = SIMHASH_BITS // SIMHASH_BANDS
+    band_mask = (1 << band_bits) - 1
+    buckets = {}
+    groups = []
+
+    for tweet in tweets:
+        fingerprint = simhash(tweet.text)
+        bands = [(band, fingerprint >> (band * band_bits) & band_mask) for band in range(SIMHASH_BANDS)]
+
+        match = None
+        for key in bands:
+            for index in buckets.get(key, ()):
+                if bin(groups[index][0] ^ fingerprint).count('1') <= SIMHASH_MAX_DISTANCE:
+                    match = index
+                    break
+            if match is not None:
+                break
+
+        if match is not None:
+            groups[match][2] += 1
+            continue
+
+        groups.append([fingerprint, tweet, 1])
+        for key in bands:
+            buckets.setdefault(key, []).append(len(groups) - 1)
+
+    return [(tweet, copies) for _, tweet, copies in groups]
+
+
+def engagement(tweet):
+    """Weighted public engagement of a tweet (0 when metrics were not requested)"""
+    metrics = tweet.public_metrics
+    return (
+        metrics.get('like_count', 0)
+        + 2 * metrics.get('retweet_count', 0)
+        + metrics.get('reply_count', 0)
+        + metrics.get('quote_count', 0)
+    )
+
+
+def build_tweet_content(tweets, token_budget):
+    """Assemble the tweet block of the GPT prompt from a TweetBatch within a token budget.
+
+    Near-duplicates are collapsed, the remaining tweets are ranked by trend
+    position and engagement (copies count as engagement), and the prompt is
+    filled greedily until the budget is used. Returns (content, PromptStats).
+    """
+    groups = collapse_near_duplicates(tweets)
+
+    def score(group):
+        tweet, copies = group
+        rank = tweet.rank
+        trend_weight = 1 / (1 + rank) if rank is not None else 0
+        return math.log1p(engagement(tweet) + copies - 1) + trend_weight
+
+    lines = []
+    used_tokens = 0
+    for tweet, _ in sorted(groups, key=score, reverse=True):
+        line = ' '.join(tweet.text.split())
+        tokens = estimate_tokens(line) + 1  # satır sonu
+        if used_tokens + tokens > token_budget:
+            continue
+        lines.append(line)
+        used_tokens += tokens
+
+    stats = PromptStats(
+        input_tweets=len(tweets),
+        unique_tweets=len(groups),
+        used_tweets=len(lines),
+        naive_tokens=sum(estimate_tokens(tweet.text) for tweet in tweets) + len(tweets),
+        prompt_tokens=used_tokens
+    )
+    return "\n".join(lines), stats
@@ -0,0 +1,108 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def gcra(tat, now, window, limit):
+    """Generic cell rate algorithm check (a token bucket kept as one timestamp).
+
+    Requests are spaced ``window / limit`` seconds apart on average, with
+    bursts of up to ``limit`` requests. ``tat`` is the theoretical arrival
+    time stored for the key (None for a new key). Returns
+    (allowed, retry_after_seconds, new_tat).
+    """
+    interval = window / limit
+    tat = now if tat is None else max(tat, now)
+    # Boşta geçen süre kadar birikmiş hak: en fazla ``limit - 1`` ek istek
+    tolerance = window - interval
+    if tat - now > tolerance:
+        return False, tat - now - tolerance, tat
+    return True, 0.0, tat + interval
+
+
+class MemoryBackend:
+    """Per-process state with LRU eviction of the least recently seen keys"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._tats = OrderedDict()  # key -> theoretical arrival time
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now):
+        with self._lock:
+            allowed, retry_after, tat = gcra(self._tats.get(key), now, window, limit)
+            self._tats[key] = tat
+            self._tats.move_to_end(key)
+            while len(self._tats) > self.max_keys:
+                self._tats.popitem(last=False)
+            return allowed, retry_after
+
+    def __len__(self):
+        return len(self._tats)
+
+
+class SQLiteBackend:
+    """State in a SQLite file so every worker process enforces one limit"""
+
+    def __init__(self, path, max_keys=10000):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.max_keys = max_keys
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL, seen_at REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS rate_limits_seen ON rate_limits (seen_at)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, limit, window, now):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            allowed, retry_after, tat = gcra(row[0] if row else None, now, window, limit)
+            conn.execute("INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?)", (key, tat, now))
+            # Sınırlı boyut: en uzun süredir görülmeyen anahtarları sil
+            conn.execute(
+                "DELETE FROM rate_limits WHERE seen_at < ("
+                "SELECT seen_at FROM rate_limits ORDER BY seen_at DESC LIMIT 1 OFFSET ?)",
+                (self.max_keys - 1,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+
+class RateLimiter:
+    """GCRA limiter over a pluggable state backend"""
+
+    def __init__(self, backend=None, clock=time.time):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.clock = clock
+
+    @classmethod
+    def from_env(cls):
+        max_keys = int(os.getenv('RATE_LIMIT_MAX_KEYS', 10000))
+        if os.getenv('RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+            backend = SQLiteBackend(os.getenv('RATE_LIMIT_PATH', 'state/rate_limits.db'), max_keys=max_keys)
+        else:
+            backend = MemoryBackend(max_keys=max_keys)
+        return cls(backend)
+
+    def hit(self, key, limit, window):
+        """Count a request; returns (allowed, retry_after) with retry_after in whole seconds"""
+        allowed, retry_after = self.backend.hit(key, limit, window, self.clock())
+        return allowed, 0 if allowed else max(1, math.ceil(retry_after))
@@ -0,0 +1,226 @@
+import logging
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from twitter_bot.metrics import metrics
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+CONNECTION_ERRORS = (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout)
+
+# Devre kesici durumları; metriklerde sayısal değer olarak yayınlanır
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's circuit breaker is open; the call was not attempted"""
+
+
+def status_code(exc):
+    """HTTP status of a tweepy or OpenAI exception, or None"""
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status
+
+
+def connection_errors():
+    """CONNECTION_ERRORS plus openai's, once openai is loaded (importing it here would slow startup)"""
+    openai = sys.modules.get('openai')
+    if openai is None:
+        return CONNECTION_ERRORS
+    return CONNECTION_ERRORS + (openai.APIConnectionError,)
+
+
+def is_retryable(exc):
+    return isinstance(exc, connection_errors()) or status_code(exc) in RETRYABLE_STATUS
+
+
+def is_duplicate_post(exc):
+    """Twitter's 403 for a tweet identical to one already posted"""
+    return status_code(exc) == 403 and 'duplicate' in str(exc).lower()
+
+
+def was_not_processed(exc):
+    """True when the server certainly did not act on the request (rate limited or never connected)"""
+    return status_code(exc) == 429 or isinstance(exc, (ConnectionRefusedError, requests.ConnectTimeout))
+
+
+def retry_after(exc, now=None):
+    """Seconds the server asked us to wait, from Retry-After or x-rate-limit-reset"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    now = time.time() if now is None else now
+    value = headers.get('retry-after')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = headers.get('x-rate-limit-reset')
+    if reset:
+        try:
+            return max(0.0, float(reset) - now)
+        except ValueError:
+            pass
+    return None
+
+
+class CircuitBreaker:
+    """Stops calling an endpoint after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens for
+    ``reset_timeout`` seconds; then a single trial call is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        self.state = state
+        metrics.set_gauge('twitter_bot_circuit_state', state, endpoint=self.name)
+
+    def allow(self):
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() < self.opened_until:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                # Yarı açıkken aynı anda tek deneme çağrısı
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            if self.state != CLOSED:
+                logging.info(f"'{self.name}' devre kesicisi kapandı")
+                self._set_state(CLOSED)
+
+    def release(self):
+        """End a call that says nothing about the endpoint's health"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self, open_for=None):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open(max(self.reset_timeout, open_for or 0))
+
+    def _open(self, seconds):
+        self.opened_until = self.clock() + seconds
+        if self.state != OPEN:
+            metrics.inc('twitter_bot_circuit_trips_total', endpoint=self.name)
+            logging.warning(f"'{self.name}' devre kesicisi {seconds:.0f} saniyeliğine açıldı")
+        self._set_state(OPEN)
+
+
+class Resilience:
+    """Retries with jittered exponential backoff behind per-endpoint circuit breakers"""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, max_wait=60.0,
+                 failure_threshold=5, reset_timeout=60, clock=time.monotonic, sleep=time.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait  # Sunucunun istediği bundan uzun beklemeler yapılmaz
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+            max_wait=config.retry_max_wait,
+            failure_threshold=config.breaker_failure_threshold,
+            reset_timeout=config.breaker_reset_timeout
+        )
+
+    def breaker(self, endpoint):
+        with self._lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = CircuitBreaker(
+                    endpoint, self.failure_threshold, self.reset_timeout, clock=self.clock
+                )
+            return breaker
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given (1-based) attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, endpoint, func, idempotent=True, max_attempts=None):
+        """Call func(), retrying transient failures; raises CircuitOpenError when the breaker is open.
+
+        A non-idempotent call (e.g. posting a tweet) is only retried when the
+        server certainly did not process it; a timeout or a 5xx may mean the
+        request already took effect.
+        """
+        breaker = self.breaker(endpoint)
+        max_attempts = max_attempts or self.max_attempts
+        attempt = 0
+        while True:
+            attempt += 1
+            if not breaker.allow():
+                metrics.inc('twitter_bot_circuit_rejections_total', endpoint=endpoint)
+                raise CircuitOpenError(f"Circuit open for {endpoint}")
+            try:
+                result = func()
+            except Exception as e:
+                if not is_retryable(e):
+                    # 4xx yanıtı uç noktanın ayakta olduğunu gösterir; diğer hatalar (ör. kota) nötr
+                    if status_code(e) is not None:
+                        breaker.record_success()
+                    else:
+                        breaker.release()
+                    raise
+                wait = retry_after(e)
+                breaker.record_failure(open_for=wait)
+                delay = wait if wait is not None else self.backoff(attempt)
+                # Devre açıldıysa beklemeden vazgeç
+                if attempt >= max_attempts or delay > self.max_wait or breaker.state == OPEN:
+                    metrics.inc('twitter_bot_retries_exhausted_total', endpoint=endpoint)
+                    raise
+                if not idempotent and not was_not_processed(e):
+                    # İstek sunucuya ulaşmış olabilir; tekrar göndermek mükerrer kayıt yaratır
+                    metrics.inc('twitter_bot_retries_skipped_total', endpoint=endpoint)
+                    raise
+                metrics.inc('twitter_bot_retries_total', endpoint=endpoint)
+                metrics.observe('twitter_bot_retry_wait_seconds', delay, endpoint=endpoint)
+                logging.warning(
+                    f"{endpoint} çağrısı başarısız ({str(e)}), {delay:.1f} sn sonra tekrar denenecek "
+                    f"({attempt}/{max_attempts})"
+                )
+                self.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
@@ -0,0 +1,143 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+
+class Job:
+    def __init__(self, name, func, interval, jitter):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.next_run = None
+        self.running = threading.Lock()  # Aynı işin üst üste çalışmasını engeller
+        self.runs = 0
+        self.skipped = 0
+
+
+class Scheduler:
+    """Timer-heap scheduler that sleeps exactly until the next job is due.
+
+    The loop waits on a threading.Event, so stop() wakes it immediately
+    instead of after a polling interval. Runs missed while a job was busy
+    or the host was suspended are coalesced into a single run, and a job
+    that is still running is never started a second time.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.jobs = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def every(self, interval, func, name=None, jitter=0.0, run_now=False):
+        """Run func every ``interval`` seconds, plus up to ``jitter`` random seconds"""
+        job = Job(name or func.__name__, func, interval, jitter)
+        with self._lock:
+            if job.name in self.jobs:
+                raise ValueError(f"Job already scheduled: {job.name}")
+            self.jobs[job.name] = job
+            self._push(job, self.clock() if run_now else self._next_due(job, self.clock()))
+        self._wakeup.set()
+        return job
+
+    def cancel(self, name):
+        """Unschedule a job; a run already in progress finishes, no further run starts. False if unknown"""
+        with self._lock:
+            job = self.jobs.pop(name, None)
+            if job is None:
+                return False
+            self._heap = [entry for entry in self._heap if entry[2] is not job]
+            heapq.heapify(self._heap)
+        self._wakeup.set()
+        return True
+
+    def _next_due(self, job, after):
+        return after + job.interval + (random.uniform(0, job.jitter) if job.jitter else 0)
+
+    def _push(self, job, due):
+        job.next_run = due
+        heapq.heappush(self._heap, (due, next(self._counter), job))
+
+    def trigger(self, name):
+        """Run a job right now in the caller's thread; False if it is already running"""
+        return self._run_job(self.jobs[name])
+
+    def _run_job(self, job):
+        if not job.running.acquire(blocking=False):
+            job.skipped += 1
+            logging.warning(f"'{job.name}' işi hâlâ çalışıyor, bu çalıştırma atlandı")
+            return False
+        try:
+            job.func()
+            job.runs += 1
+        except Exception as e:
+            logging.error(f"'{job.name}' işinde hata: {str(e)}", exc_info=True)
+        finally:
+            job.running.release()
+        return True
+
+    def run(self):
+        """Scheduler loop; returns as soon as stop() is called"""
+        while not self._stop_event.is_set():
+            with self._lock:
+                due, _, job = self._heap[0] if self._heap else (None, None, None)
+                delay = None if job is None else due - self.clock()
+                # Bakılan ve çıkarılan kayıt aynı kilit altında: arada eklenen/iptal edilen iş kaybolmaz
+                if job is not None and delay <= 0:
+                    heapq.heappop(self._heap)
+            if job is None:
+                self._wait(None)
+                continue
+            if delay > 0:
+                self._wait(delay)
+                continue
+
+            self._run_job(job)
+
+            # Kaçırılan çalıştırmalar birleştirilir: bir sonraki zaman şimdiden sonraki ilk aralık
+            now = self.clock()
+            next_due = self._next_due(job, due)
+            if next_due <= now:
+                missed = int((now - due) // job.interval)
+                if missed:
+                    logging.info(f"'{job.name}' için {missed} kaçırılmış çalıştırma birleştirildi")
+                next_due = self._next_due(job, now)
+            with self._lock:
+                if self.jobs.get(job.name) is job:
+                    self._push(job, next_due)
+
+    def _wait(self, timeout):
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def start(self):
+        """Run the loop in a background thread"""
+        if self.is_running():
+            return self._thread
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name='bot-scheduler', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        """Signal the loop to stop and wait for it; True once the thread has exited"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        return not self.is_running()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def stopping(self):
+        return self._stop_event.is_set()
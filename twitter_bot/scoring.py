@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+# Skor bileşenlerinin ağırlıkları
+DEFAULT_WEIGHTS = {
+    'velocity': 1.0,      # Log-hacmin saatlik eğimi
+    'acceleration': 0.5,  # Pencerenin yeni yarısındaki eğimin eski yarıya göre artışı
+    'novelty': 0.5,       # Trendin ilk görülmesinden bu yana geçen süre
+    'volume': 1.0,        # Son gözlemlenen hacim
+    'tweet_rate': 0.5,    # Arama sonuçlarındaki tweet zaman damgalarından dakikalık hız
+}
+
+
+def _slopes(x, y):
+    """Row-wise least-squares slope of y over x, ignoring NaN cells; 0 for fewer than two points"""
+    counts = np.sum(~np.isnan(y), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.nansum(x, axis=1, keepdims=True) / counts[:, None]
+        y_mean = np.nansum(y, axis=1, keepdims=True) / counts[:, None]
+        covariance = np.nansum((x - x_mean) * (y - y_mean), axis=1)
+        variance = np.nansum((x - x_mean) ** 2, axis=1)
+        slopes = covariance / variance
+    return np.where((counts >= 2) & (variance > 0), slopes, 0.0)
+
+
+class TrendScorer:
+    """Scores trends from their recent history in one vectorized pass.
+
+    Every tracked trend owns a row of fixed-size ring buffers holding its
+    last ``window`` volume observations and their times, so memory is
+    bounded by ``capacity * window``. When all rows are taken the trend
+    that was seen least recently is evicted.
+    """
+
+    def __init__(self, capacity=5000, window=12, novelty_half_life=6 * 3600, weights=None, clock=time.time):
+        if window < 3:
+            raise ValueError("window must hold at least 3 observations")
+        self.capacity = capacity
+        self.window = window
+        self.novelty_half_life = novelty_half_life
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        self.clock = clock
+        self.volumes = np.zeros((capacity, window), dtype=np.float64)
+        self.times = np.zeros((capacity, window), dtype=np.float64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.heads = np.zeros(capacity, dtype=np.int64)  # Bir sonraki yazılacak sütun
+        self.first_seen = np.zeros(capacity, dtype=np.float64)
+        self.last_seen = np.full(capacity, -np.inf)
+        self.tweet_rates = np.zeros(capacity, dtype=np.float64)
+        self._rows = {}  # trend key -> satır
+        self._keys = [None] * capacity
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _assign_rows(self, keys, now):
+        """Return rows for keys, allocating (and evicting) rows for new ones"""
+        rows = np.empty(len(keys), dtype=np.int64)
+        is_new = np.zeros(len(keys), dtype=bool)
+        for i, key in enumerate(keys):
+            row = self._rows.get(key)
+            if row is None:
+                is_new[i] = True
+            else:
+                rows[i] = row
+        self.last_seen[rows[~is_new]] = now
+
+        new = np.flatnonzero(is_new)
+        if len(new):
+            if len(new) > self.capacity - (len(keys) - len(new)):
+                raise ValueError(f"Cannot track {len(keys)} trends with capacity {self.capacity}")
+            # Boş satırlar (-inf) önce, sonra en uzun süredir görülmeyen trendler
+            free = np.argpartition(self.last_seen, len(new) - 1)[:len(new)]
+            for i, row in zip(new, free):
+                old_key = self._keys[row]
+                if old_key is not None:
+                    del self._rows[old_key]
+                self._rows[keys[i]] = row
+                self._keys[row] = keys[i]
+            rows[new] = free
+            self.counts[free] = 0
+            self.heads[free] = 0
+            self.tweet_rates[free] = 0
+            self.first_seen[free] = now
+            self.last_seen[free] = now
+        return rows
+
+    def observe(self, keys, volumes, now=None):
+        """Append one volume observation per trend key"""
+        if not keys:
+            return
+        now = self.clock() if now is None else now
+        with self._lock:
+            rows = self._assign_rows(keys, now)
+            heads = self.heads[rows]
+            self.volumes[rows, heads] = np.asarray(volumes, dtype=np.float64)
+            self.times[rows, heads] = now
+            self.heads[rows] = (heads + 1) % self.window
+            self.counts[rows] = np.minimum(self.counts[rows] + 1, self.window)
+
+    def observe_tweet_times(self, key, timestamps, smoothing=0.5):
+        """Fold the tweets-per-minute rate seen in one search into the trend's rate"""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None or len(timestamps) < 2:
+                return
+            stamps = np.asarray(timestamps, dtype=np.float64)
+            span = (stamps.max() - stamps.min()) / 60
+            rate = (len(stamps) - 1) / max(span, 1 / 60)
+            self.tweet_rates[row] = smoothing * rate + (1 - smoothing) * self.tweet_rates[row]
+
+    def score(self, keys, now=None):
+        """Score tracked trends; unknown keys score 0"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            known = [i for i, key in enumerate(keys) if key in self._rows]
+            scores = np.zeros(len(keys), dtype=np.float64)
+            if not known:
+                return scores
+            rows = np.array([self._rows[keys[i]] for i in known], dtype=np.int64)
+            counts = self.counts[rows]
+
+            # Halka tamponları eskiden yeniye sırala; gözlemlenmemiş hücreler NaN
+            order = (self.heads[rows, None] + np.arange(self.window)) % self.window
+            valid = np.arange(self.window) >= (self.window - counts[:, None])
+            volumes = np.where(valid, np.take_along_axis(self.volumes[rows], order, axis=1), np.nan)
+            times = np.where(valid, np.take_along_axis(self.times[rows], order, axis=1), np.nan)
+            first_seen = self.first_seen[rows]
+            tweet_rates = self.tweet_rates[rows]
+
+        # Log-hacmin zamana göre eğimi: kalıcı büyüme yüksek, gürültü sıfıra yakın skor alır
+        hours = (times - times[:, -1:]) / 3600
+        levels = np.log1p(np.maximum(volumes, 0))
+        half = self.window // 2
+        velocity = np.tanh(_slopes(hours, levels))
+        acceleration = np.tanh(
+            _slopes(hours[:, half:], levels[:, half:]) - _slopes(hours[:, :half], levels[:, :half])
+        )
+
+        latest = levels[:, -1]
+        rates = np.log1p(tweet_rates)
+        novelty = np.exp(-(now - first_seen) * math.log(2) / self.novelty_half_life)
+        weights = self.weights
+        scores[known] = (
+            weights['velocity'] * velocity
+            + weights['acceleration'] * acceleration
+            + weights['novelty'] * novelty
+            + weights['volume'] * latest / max(latest.max(), 1e-9)
+            + weights['tweet_rate'] * rates / max(rates.max(), 1e-9)
+        )
+        return scores
+
+    def top(self, trends, k, now=None):
+        """Return the k best scoring trends, best first"""
+        if not trends:
+            return []
+        scores = self.score([trend.key for trend in trends], now)
+        k = min(k, len(trends))
+        best = np.argpartition(-scores, k - 1)[:k]
+        # Eşit skorda birleştirme sırası korunur
+        best = sorted(best, key=lambda i: (-scores[i], i))
+        for i in best:
+            trends[i].score = float(scores[i])
+        return [trends[i] for i in best]
@@ -0,0 +1,73 @@
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+
+class SeenTweetIndex:
+    """Bounded record of already analyzed tweets.
+
+    Tweet ids are stored in a sorted int64 array. Twitter ids grow with time,
+    so when the index is full the smallest (oldest) ids are dropped first.
+    Per-trend ``since_id`` high-water marks are kept in an LRU map and, when
+    a StateStore is given, persisted so they survive restarts.
+    """
+
+    def __init__(self, max_ids=50000, max_trends=1000, store=None):
+        self.max_ids = max_ids
+        self.max_trends = max_trends
+        self.store = store
+        self._ids = array('q')
+        self._since_ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def since_id(self, trend_name):
+        """Return the newest tweet id fetched for a trend, or None"""
+        with self._lock:
+            since_id = self._since_ids.get(trend_name)
+            if since_id is not None:
+                self._since_ids.move_to_end(trend_name)
+                return since_id
+        if self.store is not None:
+            return self.store.get_cursor(trend_name)
+        return None
+
+    def update_since_id(self, trend_name, tweets):
+        """Advance the trend's high-water mark to the newest tweet of a fetched TweetBatch"""
+        if not tweets:
+            return
+        newest = max(tweets.ids)
+        with self._lock:
+            if newest > self._since_ids.get(trend_name, 0):
+                self._since_ids[trend_name] = newest
+            self._since_ids.move_to_end(trend_name)
+            while len(self._since_ids) > self.max_trends:
+                self._since_ids.popitem(last=False)
+        if self.store is not None:
+            self.store.set_cursor(trend_name, newest)
+
+    def __contains__(self, tweet_id):
+        with self._lock:
+            i = bisect_left(self._ids, tweet_id)
+            return i < len(self._ids) and self._ids[i] == tweet_id
+
+    def filter_new(self, tweets):
+        """Return a TweetBatch of the unseen tweets in their original order and mark them as seen"""
+        new_indices = []
+        with self._lock:
+            for index, tweet_id in enumerate(tweets.ids):
+                i = bisect_left(self._ids, tweet_id)
+                if i < len(self._ids) and self._ids[i] == tweet_id:
+                    continue
+                # Index dolu ve tweet tutulan en eski id'den de eskiyse zaten görülmüş say
+                if len(self._ids) >= self.max_ids and i == 0:
+                    continue
+                insort(self._ids, tweet_id)
+                new_indices.append(index)
+            overflow = len(self._ids) - self.max_ids
+            if overflow > 0:
+                del self._ids[:overflow]
+        return tweets.select(new_indices)
+
+    def __len__(self):
+        return len(self._ids)
@@ -0,0 +1,203 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotas (
+    account TEXT PRIMARY KEY,
+    remaining_views INTEGER NOT NULL,
+    remaining_tweets INTEGER NOT NULL,
+    reset_day TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    trend TEXT PRIMARY KEY,
+    since_id INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text TEXT NOT NULL,
+    account TEXT,
+    posted_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at REAL NOT NULL,
+    pid INTEGER NOT NULL,
+    entity TEXT NOT NULL,
+    key TEXT NOT NULL,
+    change TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_at ON audit (at);
+"""
+
+QUOTA_FIELDS = ('remaining_views', 'remaining_tweets')
+
+
+class StateStore:
+    """Durable bot state shared between processes (SQLite in WAL mode).
+
+    Every thread gets its own connection; WAL lets readers run alongside a
+    writer without blocking. Quota changes are single conditional UPDATE
+    statements, so concurrent decrements never overdraw an account. Quota,
+    value and post changes are written to the ``audit`` table in the same
+    transaction.
+    """
+
+    def __init__(self, path, busy_timeout=5.0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Immediate (write-locking) transaction on this thread's connection"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _audit(conn, entity, key, change):
+        conn.execute(
+            "INSERT INTO audit (at, pid, entity, key, change) VALUES (?, ?, ?, ?, ?)",
+            (time.time(), os.getpid(), entity, key, json.dumps(change))
+        )
+
+    # Kotalar
+
+    def ensure_account(self, account, remaining_views, remaining_tweets, day):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO quotas VALUES (?, ?, ?, ?)",
+                (account, remaining_views, remaining_tweets, day)
+            )
+
+    def get_quotas(self):
+        rows = self._conn().execute(
+            "SELECT account, remaining_views, remaining_tweets, reset_day FROM quotas"
+        ).fetchall()
+        return {
+            account: {'remaining_views': views, 'remaining_tweets': tweets, 'reset_day': day}
+            for account, views, tweets, day in rows
+        }
+
+    def consume(self, account, field, amount=1):
+        """Atomically take ``amount`` from a quota; False if not enough was left"""
+        if field not in QUOTA_FIELDS:
+            raise ValueError(f"Unknown quota field: {field}")
+        with self._transaction() as conn:
+            updated = conn.execute(
+                f"UPDATE quotas SET {field} = {field} - ? WHERE account = ? AND {field} >= ?",
+                (amount, account, amount)
+            ).rowcount
+            if updated:
+                self._audit(conn, 'quota', account, {'field': field, 'delta': -amount})
+        return updated == 1
+
+    def refund(self, account, field, amount=1):
+        """Give back quota taken for a request the API never served"""
+        if field not in QUOTA_FIELDS:
+            raise ValueError(f"Unknown quota field: {field}")
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE quotas SET {field} = {field} + ? WHERE account = ?", (amount, account))
+            self._audit(conn, 'quota', account, {'field': field, 'delta': amount})
+
+    def reset_quotas(self, account, remaining_views, remaining_tweets, day):
+        """Refill an account once per day; True if this call did the reset"""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE quotas SET remaining_views = ?, remaining_tweets = ?, reset_day = ? "
+                "WHERE account = ? AND reset_day != ?",
+                (remaining_views, remaining_tweets, day, account, day)
+            ).rowcount
+            if updated:
+                self._audit(conn, 'quota', account, {'reset': day})
+        return updated == 1
+
+    # Genel değerler (örn. son çalışma zamanı)
+
+    def set_value(self, key, value):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?)", (key, json.dumps(value)))
+            self._audit(conn, 'kv', key, {'value': value})
+
+    def get_value(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    # Trend imleçleri (since_id)
+
+    def get_cursor(self, trend):
+        row = self._conn().execute("SELECT since_id FROM cursors WHERE trend = ?", (trend,)).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, trend, since_id):
+        """Advance a trend's since_id; never moves it backwards"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO cursors VALUES (?, ?, ?) ON CONFLICT(trend) DO UPDATE SET "
+                "since_id = MAX(since_id, excluded.since_id), updated_at = excluded.updated_at",
+                (trend, since_id, time.time())
+            )
+
+    # Paylaşılan tweetler
+
+    def record_post(self, text, account=None):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO posts (text, account, posted_at) VALUES (?, ?, ?)", (text, account, time.time())
+            )
+            self._audit(conn, 'post', account or '', {'text': text})
+
+    def recent_posts(self, limit=50):
+        rows = self._conn().execute(
+            "SELECT text FROM posts ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [text for (text,) in reversed(rows)]
+
+    # Denetim kaydı
+
+    def audit_log(self, limit=100):
+        rows = self._conn().execute(
+            "SELECT at, pid, entity, key, change FROM audit ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [
+            {'at': at, 'pid': pid, 'entity': entity, 'key': key, 'change': json.loads(change)}
+            for at, pid, entity, key, change in rows
+        ]
+
+    def prune(self, audit_days=30, cursor_days=7, keep_posts=1000):
+        """Drop old audit rows, stale cursors and all but the newest posts"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM audit WHERE at < ?", (now - audit_days * 86400,))
+            conn.execute("DELETE FROM cursors WHERE updated_at < ?", (now - cursor_days * 86400,))
+            conn.execute(
+                "DELETE FROM posts WHERE id NOT IN (SELECT id FROM posts ORDER BY id DESC LIMIT ?)", (keep_posts,)
+            )
@@ -0,0 +1,191 @@
+import logging
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+from twitter_bot.metrics import render_snapshots
+from twitter_bot.worker import EXCLUSIVE_PATHS, RUN_DIR, load_authkey, worker_address, worker_log_path, worker_paths
+
+
+class WorkerError(Exception):
+    """A worker could not be reached or rejected a command"""
+
+
+def parse_workers(value):
+    """Parse WORKERS=name[:env_file],... into an ordered {name: env_file} dict"""
+    workers = {}
+    for item in (value or '').split(','):
+        name, _, env_file = item.strip().partition(':')
+        name = name.strip()
+        if name:
+            if not name.replace('-', '').replace('_', '').isalnum():
+                raise ValueError(f"Invalid worker name: {name}")
+            workers[name] = env_file.strip() or None
+    return workers or {'default': None}
+
+
+def check_worker_paths(workers):
+    """Fail fast when two workers would write to the same archive or outbox"""
+    owners = {}
+    for name, env_file in workers.items():
+        paths = worker_paths(name, env_file)
+        for var in EXCLUSIVE_PATHS:
+            if not paths[var]:
+                continue
+            path = os.path.abspath(paths[var])
+            other = owners.setdefault((var, path), name)
+            if other != name:
+                raise ValueError(f"Workers '{other}' and '{name}' share {var}={paths[var]}; give each its own path")
+
+
+class Supervisor:
+    """Spawns bot worker processes and controls them over their sockets.
+
+    Workers are found by name at a well-known address, so any number of
+    dashboards or GUIs can attach to the same workers without sharing
+    process handles; a supervisor restart does not stop running bots.
+    """
+
+    def __init__(self, workers=None, run_dir=RUN_DIR, timeout=5.0, stop_timeout=30.0):
+        self.workers = dict(workers or {'default': None})  # isim -> env dosyası
+        check_worker_paths(self.workers)
+        self.run_dir = run_dir
+        self.timeout = timeout
+        self.stop_timeout = stop_timeout
+        self.authkey = load_authkey(run_dir)
+        self.processes = {}  # Bu süreçten başlatılan worker'lar
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            workers=parse_workers(os.getenv('WORKERS')),
+            run_dir=os.getenv('WORKER_RUN_DIR', RUN_DIR),
+            timeout=float(os.getenv('WORKER_TIMEOUT', 5)),
+            stop_timeout=float(os.getenv('BOT_STOP_TIMEOUT', 30))
+        )
+
+    @property
+    def default_worker(self):
+        return next(iter(self.workers))
+
+    def _check(self, name):
+        if name not in self.workers:
+            raise WorkerError(f"Unknown worker: {name}")
+
+    def log_path(self, name):
+        self._check(name)
+        return worker_log_path(name)
+
+    def request(self, name, command, reply_timeout=None, **params):
+        """Send one command to a worker and return its reply"""
+        self._check(name)
+        try:
+            conn = Client(worker_address(name, self.run_dir), authkey=self.authkey)
+        except (OSError, EOFError) as e:
+            raise WorkerError(f"Worker '{name}' is not running") from e
+        except AuthenticationError as e:
+            raise WorkerError(f"Worker '{name}' rejected the auth key") from e
+        with conn:
+            try:
+                conn.send({'command': command, **params})
+                if not conn.poll(self.timeout if reply_timeout is None else reply_timeout):
+                    raise WorkerError(f"Worker '{name}' did not answer '{command}' in time")
+                reply = conn.recv()
+            except (OSError, EOFError) as e:
+                raise WorkerError(f"Worker '{name}' closed the connection") from e
+        if not reply.get('ok'):
+            raise WorkerError(reply.get('error') or f"Worker '{name}' failed '{command}'")
+        return reply
+
+    def is_alive(self, name):
+        try:
+            self.request(name, 'ping')
+            return True
+        except WorkerError:
+            return False
+
+    def spawn(self, name):
+        """Launch the worker process unless it is already up; returns once it answers ping"""
+        self._check(name)
+        if self.is_alive(name):
+            return
+        command = [sys.executable, '-m', 'twitter_bot.worker', '--name', name, '--run-dir', self.run_dir]
+        if self.workers[name]:
+            command += ['--env-file', self.workers[name]]
+        env = dict(os.environ, WORKER_AUTHKEY=self.authkey.decode())
+        # Ayrı oturum: panel kapansa da worker çalışmaya devam eder
+        process = subprocess.Popen(
+            command, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, start_new_session=True
+        )
+        self.processes[name] = process
+        deadline = time.monotonic() + self.timeout * 2
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise WorkerError(
+                    f"Worker '{name}' exited with code {process.returncode}, see {worker_log_path(name)}"
+                )
+            if self.is_alive(name):
+                logging.info(f"'{name}' worker süreci başlatıldı (pid {process.pid})")
+                return
+            time.sleep(0.1)
+        raise WorkerError(f"Worker '{name}' did not come up in time")
+
+    def start(self, name):
+        self.spawn(name)
+        return self.request(name, 'start', reply_timeout=self.timeout + self.stop_timeout)['status']
+
+    def stop(self, name, timeout=None):
+        """Stop the worker's bot; the process stays up for later commands"""
+        timeout = self.stop_timeout if timeout is None else timeout
+        try:
+            return self.request(name, 'stop', reply_timeout=self.timeout + timeout, timeout=timeout)['status']
+        except WorkerError:
+            if self.is_alive(name):
+                raise
+            return 'stopped'
+
+    def run_now(self, name):
+        self.spawn(name)
+        return self.request(name, 'run_now')['status']
+
+    def shutdown(self, name, timeout=None):
+        """Stop the bot and exit the worker process"""
+        timeout = self.stop_timeout if timeout is None else timeout
+        try:
+            status = self.request(name, 'shutdown', reply_timeout=self.timeout + timeout, timeout=timeout)['status']
+        except WorkerError:
+            if self.is_alive(name):
+                raise
+            return 'stopped'
+        process = self.processes.pop(name, None)
+        if process is not None:
+            try:
+                process.wait(self.timeout)
+            except subprocess.TimeoutExpired:
+                logging.warning(f"'{name}' worker süreci zamanında kapanmadı")
+        return status
+
+    def status(self, name):
+        try:
+            return self.request(name, 'status')
+        except WorkerError as e:
+            if name not in self.workers:
+                raise
+            return {'name': name, 'alive': False, 'running': False, 'error': str(e)}
+
+    def status_all(self):
+        return [self.status(name) for name in self.workers]
+
+    def render_metrics(self, local_snapshot=None):
+        """Prometheus page with every live worker's metrics, labelled by worker"""
+        snapshots = [({'process': 'dashboard'}, local_snapshot)] if local_snapshot else []
+        for name in self.workers:
+            try:
+                snapshots.append(({'worker': name}, self.request(name, 'metrics')['metrics']))
+            except WorkerError:
+                continue
+        return render_snapshots(snapshots)
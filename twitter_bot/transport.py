@@ -0,0 +1,205 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from twitter_bot.metrics import metrics
+
+
+class PoolStats:
+    """Request, connection and concurrency counts of one connection pool"""
+
+    def __init__(self, name, max_per_host):
+        self.name = name
+        self.max_per_host = max_per_host
+        self.requests = 0
+        self.connections_opened = 0
+        self.saturated = 0      # Tüm bağlantılar meşgulken başlayan istekler (bekler ya da fazladan bağlantı açar)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._in_flight_by_host = {}
+        self._lock = threading.Lock()
+
+    def begin(self, host):
+        with self._lock:
+            busy = self._in_flight_by_host.get(host, 0)
+            if busy >= self.max_per_host:
+                self.saturated += 1
+                metrics.inc('twitter_bot_http_pool_saturated_total', pool=self.name)
+            self._in_flight_by_host[host] = busy + 1
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            metrics.set_gauge('twitter_bot_http_in_flight', self.in_flight, pool=self.name)
+
+    def end(self, host):
+        with self._lock:
+            self._in_flight_by_host[host] -= 1
+            self.in_flight -= 1
+            metrics.set_gauge('twitter_bot_http_in_flight', self.in_flight, pool=self.name)
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def set_connections_opened(self, count):
+        """For pools that count their own connections (urllib3)"""
+        with self._lock:
+            self.connections_opened = count
+
+    def stats(self):
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'reused': reused,
+                'reuse_ratio': reused / self.requests if self.requests else 0.0,
+                'saturated': self.saturated,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+            }
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with a default timeout and pool accounting"""
+
+    def __init__(self, stats, timeout=None, **kwargs):
+        self.stats = stats
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        host = urlparse(request.url).netloc
+        self.stats.begin(host)
+        try:
+            # tweepy zaman aşımı vermez; verilmezse havuzun varsayılanı kullanılır
+            return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+        finally:
+            self.stats.end(host)
+
+    def connections_opened(self):
+        """New connections made by the urllib3 pools still held by this adapter"""
+        pools = self.poolmanager.pools
+        # RecentlyUsedContainer üzerinde doğrudan gezinmek thread-safe değil; anahtarlar kilitle kopyalanır
+        return sum(pool.num_connections for pool in map(pools.get, pools.keys()) if pool is not None)
+
+
+class HttpTransport:
+    """Connection pools shared by every Twitter account client and the OpenAI client.
+
+    Twitter clients share one ``requests.Session`` (tweepy sends auth
+    headers per request, so accounts can share connections); OpenAI gets
+    an ``httpx.Client`` created on first use. Both keep connections alive,
+    cap connections per host and apply default timeouts.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=16, pool_block=True,
+                 connect_timeout=5.0, read_timeout=60.0, keepalive_expiry=30.0):
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self.twitter_stats = PoolStats('twitter', pool_maxsize)
+        self.openai_stats = PoolStats('openai', pool_maxsize)
+
+        self.adapter = PooledAdapter(
+            self.twitter_stats,
+            timeout=(connect_timeout, read_timeout),
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        # Oturum hesaplar arasında paylaşılıyor; bir hesabın çerezi diğerinin isteğine gitmesin
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        self._http_client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            pool_connections=config.http_pool_connections,
+            pool_maxsize=config.http_pool_maxsize,
+            pool_block=config.http_pool_block,
+            connect_timeout=config.http_connect_timeout,
+            read_timeout=config.http_read_timeout,
+            keepalive_expiry=config.http_keepalive_expiry
+        )
+
+    @property
+    def http_client(self):
+        """httpx client for OpenAI, created on first use"""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = self._create_http_client()
+            return self._http_client
+
+    def _create_http_client(self):
+        import httpx
+
+        stats = self.openai_stats
+
+        def trace(event, info):
+            # httpcore sadece yeni bağlantıda TCP bağlantı olayı yayınlar
+            if event == 'connection.connect_tcp.complete':
+                stats.connection_opened()
+
+        class TrackedStream(httpx.SyncByteStream):
+            """Counts the request as in flight until the (possibly streamed) body is closed"""
+
+            def __init__(self, stream, host):
+                self.stream = stream
+                self.host = host
+                self.closed = False
+
+            def __iter__(self):
+                yield from self.stream
+
+            def close(self):
+                try:
+                    self.stream.close()
+                finally:
+                    if not self.closed:
+                        self.closed = True
+                        stats.end(self.host)
+
+        class TrackedTransport(httpx.HTTPTransport):
+            def handle_request(self, request):
+                host = request.url.host
+                request.extensions['trace'] = trace
+                stats.begin(host)
+                try:
+                    response = super().handle_request(request)
+                except BaseException:
+                    stats.end(host)
+                    raise
+                response.stream = TrackedStream(response.stream, host)
+                return response
+
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        return httpx.Client(
+            transport=TrackedTransport(limits=limits),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        )
+
+    def stats(self):
+        """Reuse and saturation per pool"""
+        self.twitter_stats.set_connections_opened(self.adapter.connections_opened())
+        return {'twitter': self.twitter_stats.stats(), 'openai': self.openai_stats.stats()}
+
+    def close(self):
+        self.session.close()
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
@@ -0,0 +1,51 @@
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+@dataclass
+class Trend:
+    """A trend merged across regions"""
+    name: str                                          # Aramada kullanılan ilk görülen yazım
+    key: str                                           # normalize_trend(name)
+    regions: List[str] = field(default_factory=list)   # Trendin görüldüğü WOEID'ler
+    rank: int = 0                                      # Bölgelerdeki en iyi sıra
+    weight: float = 0.0                                # Bölge sıralarından gelen ağırlık: toplam 1 / (1 + sıra)
+    score: float = 0.0                                 # TrendScorer skoru
+
+
+def normalize_trend(name):
+    """Fold case, leading hashtags, accents and whitespace so variants compare equal"""
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().lstrip('#＃').strip()
+    return WHITESPACE_PATTERN.sub(' ', text)
+
+
+def merge_trends(region_trends, per_region=5, limit=None):
+    """Merge per-region trend lists into unique trends.
+
+    ``region_trends`` is a list of (woeid, names) pairs in region order.
+    The top ``per_region`` names of each region are merged by normalized
+    name; trends seen in more regions come first, then by best rank.
+    """
+    merged = {}
+    for woeid, names in region_trends:
+        for rank, name in enumerate(names[:per_region]):
+            key = normalize_trend(name)
+            if not key:
+                continue
+            trend = merged.get(key)
+            if trend is None:
+                trend = merged[key] = Trend(name=name, key=key, rank=rank)
+            elif rank < trend.rank:
+                trend.rank = rank
+            if woeid not in trend.regions:
+                trend.regions.append(woeid)
+                trend.weight += 1 / (1 + rank)
+
+    trends = sorted(merged.values(), key=lambda trend: (-len(trend.regions), trend.rank))
+    return trends[:limit] if limit else trends
@@ -0,0 +1,203 @@
+from array import array
+from datetime import datetime, timezone
+
+METRIC_FIELDS = ('like_count', 'retweet_count', 'reply_count', 'quote_count')
+MISSING = -1  # Sayısal sütunlarda eksik değer (yazar, zaman, trend sırası)
+
+
+def parse_timestamp(value):
+    """Epoch seconds of an ISO 8601 created_at string or datetime, MISSING when absent"""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if value:
+        try:
+            return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())
+        except ValueError:
+            pass
+    return MISSING
+
+
+class TweetRecord:
+    """Read-only view of one tweet of a TweetBatch"""
+
+    __slots__ = ('batch', 'index')
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    @property
+    def id(self):
+        return self.batch.ids[self.index]
+
+    @property
+    def text(self):
+        return self.batch.text(self.index)
+
+    @property
+    def author_id(self):
+        author_id = self.batch.author_ids[self.index]
+        return None if author_id == MISSING else author_id
+
+    @property
+    def timestamp(self):
+        timestamp = self.batch.timestamps[self.index]
+        return None if timestamp == MISSING else timestamp
+
+    @property
+    def rank(self):
+        rank = self.batch.ranks[self.index]
+        return None if rank == MISSING else rank
+
+    @property
+    def public_metrics(self):
+        start = self.index * len(METRIC_FIELDS)
+        return dict(zip(METRIC_FIELDS, self.batch.metrics[start:start + len(METRIC_FIELDS)]))
+
+    @property
+    def data(self):
+        return self.batch.payload(self.index)
+
+
+class TweetBatch:
+    """Column-oriented batch of the tweets handled in one cycle.
+
+    Ids, author ids, creation times (epoch seconds), public metrics and the
+    rank of the trend a tweet was found for are kept in typed arrays; all
+    texts share one UTF-8 buffer addressed by offsets. Indexing and
+    iteration return TweetRecord views, so no per-tweet dict or object
+    outlives the loop that uses it. Batches are immutable: ``select`` and
+    ``concat`` build new ones.
+    """
+
+    __slots__ = ('ids', 'author_ids', 'timestamps', 'ranks', 'metrics', 'offsets', 'buffer')
+
+    def __init__(self):
+        self.ids = array('q')
+        self.author_ids = array('q')
+        self.timestamps = array('q')
+        self.ranks = array('h')
+        self.metrics = array('q')
+        self.offsets = array('q', [0])
+        self.buffer = b''
+
+    @classmethod
+    def from_payloads(cls, payloads, rank=MISSING):
+        """Build a batch from Twitter API v2 tweet dicts, all found for the trend at ``rank``"""
+        batch = cls()
+        texts = []
+        end = 0
+        for payload in payloads:
+            text = payload.get('text', '').encode('utf-8')
+            texts.append(text)
+            end += len(text)
+            batch.offsets.append(end)
+            batch.ids.append(int(payload['id']))
+            author_id = payload.get('author_id')
+            batch.author_ids.append(int(author_id) if author_id else MISSING)
+            batch.timestamps.append(parse_timestamp(payload.get('created_at')))
+            batch.ranks.append(rank)
+            public_metrics = payload.get('public_metrics') or {}
+            batch.metrics.extend(public_metrics.get(field, 0) for field in METRIC_FIELDS)
+        batch.buffer = b''.join(texts)
+        return batch
+
+    @classmethod
+    def from_columns(cls, columns, rank=MISSING):
+        """Rebuild a batch from ``to_columns()`` output, all found for the trend at ``rank``"""
+        batch = cls()
+        texts = [text.encode('utf-8') for text in columns['texts']]
+        end = 0
+        for text in texts:
+            end += len(text)
+            batch.offsets.append(end)
+        batch.buffer = b''.join(texts)
+        batch.ids.extend(columns['ids'])
+        batch.author_ids.extend(columns['author_ids'])
+        batch.timestamps.extend(columns['timestamps'])
+        batch.metrics.extend(columns['metrics'])
+        batch.ranks.extend([rank] * len(batch.ids))
+        return batch
+
+    def to_columns(self):
+        """JSON serializable columns, e.g. for the response cache (trend ranks are not kept)"""
+        return {
+            'ids': self.ids.tolist(),
+            'author_ids': self.author_ids.tolist(),
+            'timestamps': self.timestamps.tolist(),
+            'metrics': self.metrics.tolist(),
+            'texts': [self.text(i) for i in range(len(self))],
+        }
+
+    @classmethod
+    def concat(cls, batches):
+        """One batch holding the tweets of ``batches`` in order"""
+        batch = cls()
+        buffers = []
+        end = 0
+        for part in batches:
+            batch.ids.extend(part.ids)
+            batch.author_ids.extend(part.author_ids)
+            batch.timestamps.extend(part.timestamps)
+            batch.ranks.extend(part.ranks)
+            batch.metrics.extend(part.metrics)
+            batch.offsets.extend(end + offset for offset in part.offsets[1:])
+            end += len(part.buffer)
+            buffers.append(part.buffer)
+        batch.buffer = b''.join(buffers)
+        return batch
+
+    def select(self, indices):
+        """New batch with the tweets at ``indices``, in that order"""
+        batch = TweetBatch()
+        texts = []
+        end = 0
+        width = len(METRIC_FIELDS)
+        for i in indices:
+            text = self.buffer[self.offsets[i]:self.offsets[i + 1]]
+            texts.append(text)
+            end += len(text)
+            batch.offsets.append(end)
+            batch.ids.append(self.ids[i])
+            batch.author_ids.append(self.author_ids[i])
+            batch.timestamps.append(self.timestamps[i])
+            batch.ranks.append(self.ranks[i])
+            batch.metrics.extend(self.metrics[i * width:(i + 1) * width])
+        batch.buffer = b''.join(texts)
+        return batch
+
+    def text(self, index):
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def payload(self, index):
+        """The tweet as an API v2 style dict (only the fields the batch keeps)"""
+        payload = {'id': str(self.ids[index]), 'text': self.text(index)}
+        record = self[index]
+        if record.author_id is not None:
+            payload['author_id'] = str(record.author_id)
+        if record.timestamp is not None:
+            payload['created_at'] = datetime.fromtimestamp(record.timestamp, timezone.utc).isoformat()
+        payload['public_metrics'] = record.public_metrics
+        return payload
+
+    def payloads(self):
+        return [self.payload(i) for i in range(len(self))]
+
+    def nbytes(self):
+        """Bytes held by the columns and the text buffer"""
+        columns = (self.ids, self.author_ids, self.timestamps, self.ranks, self.metrics, self.offsets)
+        return sum(column.itemsize * len(column) for column in columns) + len(self.buffer)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tweet index out of range')
+        return TweetRecord(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TweetRecord(self, index)
@@ -0,0 +1,317 @@
+import argparse
+import logging
+import os
+import secrets
+import signal
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from dotenv import dotenv_values, load_dotenv
+
+from twitter_bot.logs import setup_logging
+from twitter_bot.metrics import metrics
+from twitter_bot.scheduler import Scheduler
+
+RUN_DIR = 'run'
+LOG_DIRECTORY = 'logs'
+DEFAULT_WORKER = 'default'
+# Worker başına ayrılan yollar: değişken -> (varsayılan, dizin mi)
+WORKER_PATHS = {
+    'STATE_PATH': ('state/bot_state.db', False),
+    'ARCHIVE_PATH': ('archive', True),
+    'OUTBOX_PATH': ('state/outbox.db', False),
+}
+# İki worker'ın asla paylaşamayacağı yollar; durum veritabanı bilerek paylaşılabilir
+EXCLUSIVE_PATHS = ('ARCHIVE_PATH', 'OUTBOX_PATH')
+
+
+def worker_address(name, run_dir=RUN_DIR):
+    """Control socket of a worker: a named pipe on Windows, a Unix socket elsewhere"""
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\twitter-bot-{name}'
+    return os.path.join(run_dir, f'worker-{name}.sock')
+
+
+def worker_log_path(name):
+    return os.path.join(LOG_DIRECTORY, f'worker-{name}.log')
+
+
+def worker_paths(name, env_file=None):
+    """STATE_PATH, ARCHIVE_PATH and OUTBOX_PATH of a worker.
+
+    A path set in the worker's own env file is used as is. Otherwise the
+    shared value (environment, .env or built-in default) gets a
+    subdirectory named after the worker, so workers never share an archive
+    or outbox by accident; the 'default' worker keeps the shared paths. An
+    empty value still turns the feature off.
+    """
+    own = dotenv_values(env_file) if env_file else {}
+    paths = {}
+    for var, (default, is_dir) in WORKER_PATHS.items():
+        if var in own:
+            paths[var] = own[var] or ''
+            continue
+        path = os.getenv(var, default)
+        if path and name != DEFAULT_WORKER:
+            if is_dir:
+                path = os.path.join(path, name)
+            else:
+                path = os.path.join(os.path.dirname(path), name, os.path.basename(path))
+        paths[var] = path
+    return paths
+
+
+def create_bot():
+    """Default bot factory; the bot's heavy imports are paid on the first start, not at spawn"""
+    from twitter_bot.bot import TwitterBot
+    return TwitterBot()
+
+
+def load_authkey(run_dir=RUN_DIR):
+    """Shared secret of the control sockets: WORKER_AUTHKEY, else a key file created once in run_dir"""
+    key = os.getenv('WORKER_AUTHKEY')
+    if key:
+        return key.encode()
+    os.makedirs(run_dir, exist_ok=True)
+    path = os.path.join(run_dir, 'authkey')
+    if not os.path.exists(path):
+        # Anahtar geçici dosyaya yazılıp bağlanır; aynı anda başlayan süreçler tek anahtarda buluşur
+        temp_path = f'{path}.{os.getpid()}'
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temp_path)
+    with open(path, 'rb') as f:
+        return f.read().strip()
+
+
+class BotWorker:
+    """Runs one TwitterBot on its own scheduler and serves control commands.
+
+    Commands arrive as dicts (``{'command': 'status'}``) over a
+    multiprocessing connection; every reply is a dict with ``ok`` set.
+    """
+
+    def __init__(self, name, address, authkey, bot_factory, stop_timeout=30):
+        self.name = name
+        self.address = address
+        self.authkey = authkey
+        self.bot_factory = bot_factory
+        self.stop_timeout = stop_timeout
+        self.bot = None
+        self.job_scheduler = None
+        self.post_scheduler = None  # Outbox paylaşımcısı; döngü sürerken de ayrı thread'de çalışır
+        self.started_at = time.time()
+        self._shutdown = threading.Event()
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        return self.job_scheduler is not None and self.job_scheduler.is_running()
+
+    def start(self):
+        """Create the bot if needed and start its job scheduler"""
+        with self._lock:
+            if self.is_running():
+                return 'running'
+            if self.bot is None:
+                self.bot = self.bot_factory()
+            # Her başlatmada yeni zamanlayıcı: işler üst üste eklenmez
+            self.job_scheduler = Scheduler()
+            self.job_scheduler.every(
+                self.bot.config.check_interval_hours * 3600,
+                self.bot.run_bot,
+                name='run_bot',
+                jitter=self.bot.config.schedule_jitter,
+                run_now=True  # İlk çalıştırma
+            )
+            self.job_scheduler.start()
+            if self.bot.outbox is not None:
+                self.post_scheduler = Scheduler()
+                self.post_scheduler.every(
+                    self.bot.config.outbox_poll_seconds,
+                    self.bot.drain_outbox,
+                    name='post_outbox',
+                    run_now=True  # Önceki çalışmadan kalan kuyruk hemen işlenir
+                )
+                self.post_scheduler.start()
+        logging.info(f"'{self.name}' botu başlatıldı")
+        return 'started'
+
+    def stop(self, timeout=None):
+        """Stop the scheduler; waits for a running cycle up to timeout seconds"""
+        if self.job_scheduler is None:
+            return 'stopped'
+        timeout = self.stop_timeout if timeout is None else timeout
+        if self.post_scheduler is not None:
+            # Paylaşımcı en fazla bir create_tweet çağrısı bekletir
+            self.post_scheduler.stop(timeout)
+        stopped = self.job_scheduler.stop(timeout)
+        logging.info(f"'{self.name}' botu durduruldu" if stopped else f"'{self.name}' botu durduruluyor, devam eden döngü bekleniyor")
+        return 'stopped' if stopped else 'stopping'
+
+    def run_now(self):
+        """Run one cycle in the background, outside the schedule"""
+        if self.bot is None:
+            self.bot = self.bot_factory()
+        if self.job_scheduler is not None and 'run_bot' in self.job_scheduler.jobs:
+            target = lambda: self.job_scheduler.trigger('run_bot')
+        else:
+            target = self.bot.run_bot
+        threading.Thread(target=target, name='bot-run-now', daemon=True).start()
+        return 'triggered'
+
+    def status(self):
+        job = self.job_scheduler.jobs.get('run_bot') if self.job_scheduler is not None else None
+        status = {
+            'name': self.name,
+            'pid': os.getpid(),
+            'alive': True,
+            'running': self.is_running(),
+            'busy': job is not None and job.running.locked(),
+            'uptime': time.time() - self.started_at,
+            'cycles': job.runs if job else 0,
+            'skipped': job.skipped if job else 0,
+            'next_run': job.next_run if job and self.is_running() else None,
+        }
+        if self.bot is not None:
+            status.update({
+                'last_run': self.bot.last_run,
+                'accounts': self.bot.scheduler.stats(),
+                'cache': self.bot.cache.stats(),
+                'completion_cache': self.bot.completion_cache.stats(),
+                'outbox': self.bot.outbox.stats() if self.bot.outbox is not None else None,
+            })
+        return status
+
+    def handle(self, message):
+        """Execute one command message and return the reply fields"""
+        command = message.get('command')
+        if command == 'ping':
+            return {'pid': os.getpid()}
+        if command == 'start':
+            return {'status': self.start()}
+        if command == 'stop':
+            return {'status': self.stop(message.get('timeout'))}
+        if command == 'run_now':
+            return {'status': self.run_now()}
+        if command == 'status':
+            return self.status()
+        if command == 'metrics':
+            return {'metrics': metrics.snapshot()}
+        if command == 'shutdown':
+            status = self.stop(message.get('timeout'))
+            self.shutdown()
+            return {'status': status}
+        raise ValueError(f"Unknown command: {command}")
+
+    def _serve_connection(self, conn):
+        with conn:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                reply = {'ok': True, **self.handle(message)}
+            except Exception as e:
+                logging.error(f"'{message.get('command')}' komutu başarısız: {str(e)}", exc_info=True)
+                reply = {'ok': False, 'error': str(e)}
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                pass
+
+    def _claim_address(self):
+        """Remove a socket file left behind by a crashed worker; fail if a live one owns it"""
+        if sys.platform == 'win32' or not os.path.exists(self.address):
+            return
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError):
+            os.remove(self.address)
+            return
+        raise RuntimeError(f"Worker '{self.name}' is already running at {self.address}")
+
+    def serve(self):
+        """Accept control connections until shutdown; each command runs in its own thread"""
+        directory = os.path.dirname(self.address)
+        if directory and sys.platform != 'win32':
+            os.makedirs(directory, exist_ok=True)
+        self._claim_address()
+        listener = Listener(self.address, authkey=self.authkey)
+        logging.info(f"'{self.name}' worker süreci {self.address} adresinde dinliyor (pid {os.getpid()})")
+        try:
+            while not self._shutdown.is_set():
+                try:
+                    conn = listener.accept()
+                except AuthenticationError:
+                    logging.warning(f"'{self.name}' worker'ına yetkisiz bağlantı denemesi reddedildi")
+                    continue
+                except (OSError, EOFError):
+                    if self._shutdown.is_set():
+                        break
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+            self.stop()
+            if self.bot is not None:
+                self.bot.close()
+            logging.info(f"'{self.name}' worker süreci kapandı")
+
+    def shutdown(self):
+        """Ask the serve loop to exit; safe to call from signal handlers"""
+        self._shutdown.set()
+        # accept() bloklu; kendi soketimize bağlanarak uyandırılır
+        threading.Thread(target=self._wake, daemon=True).start()
+
+    def _wake(self):
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError, AuthenticationError):
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one bot worker process")
+    parser.add_argument('--name', default=DEFAULT_WORKER, help="Worker name; also names its socket and log file")
+    parser.add_argument('--env-file', help="Environment file with this worker's accounts and settings")
+    parser.add_argument('--run-dir', default=os.getenv('WORKER_RUN_DIR', RUN_DIR))
+    parser.add_argument('--start', action='store_true', help="Start the bot right away")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.env_file:
+        load_dotenv(args.env_file, override=True)
+    os.environ.update(worker_paths(args.name, args.env_file))
+    setup_logging(
+        worker_log_path(args.name),
+        level=logging.INFO,
+        max_bytes=int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024)),
+        backup_count=int(os.getenv('LOG_BACKUP_COUNT', 5)),
+        when=os.getenv('LOG_ROTATE_WHEN')
+    )
+
+    worker = BotWorker(
+        args.name,
+        worker_address(args.name, args.run_dir),
+        load_authkey(args.run_dir),
+        create_bot,
+        stop_timeout=float(os.getenv('BOT_STOP_TIMEOUT', 30))
+    )
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: worker.shutdown())
+    if args.start:
+        worker.start()
+    worker.serve()
+
+
+if __name__ == '__main__':
+    main()